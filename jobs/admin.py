@@ -0,0 +1,19 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """
+    Admin panel configuration for the Job model.
+
+    Attributes:
+        list_display (tuple): The fields displayed in the list view.
+        list_filter (tuple): The fields the list view can be filtered by.
+        readonly_fields (tuple): The fields that cannot be edited.
+
+    """
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'worker', 'result', 'error')
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    """
+    Management command that reports the state of the job queue.
+
+    Without arguments it prints the number of jobs per name and status and the most recent
+    failures. With job ids it prints the details of those jobs, and with --retry it queues
+    failed jobs again.
+
+    Example Usage:
+        python manage.py job_status
+        python manage.py job_status 42 --retry
+
+    """
+    help = 'Show the state of the background job queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int, help='Show the details of these jobs.')
+        parser.add_argument('--retry', action='store_true', help='Queue the given failed jobs again.')
+        parser.add_argument('--failures', type=int, default=5, help='The number of recent failures to show.')
+
+    def handle(self, *args, **options):
+        if options['ids']:
+            jobs = Job.objects.in_bulk(options['ids'])
+            missing = set(options['ids']) - set(jobs)
+            if missing:
+                raise CommandError(f"No jobs with the ids {', '.join(map(str, sorted(missing)))}.")
+            for job in jobs.values():
+                if options['retry'] and job.status == Job.FAILED:
+                    job.status, job.attempts, job.run_at = Job.QUEUED, 0, timezone.now()
+                    job.save(update_fields=['status', 'attempts', 'run_at'])
+                self.print_job(job)
+            return
+
+        rows = Job.objects.values('name', 'status').annotate(count=Count('id')).order_by('name', 'status')
+        for row in rows:
+            self.stdout.write(f"{row['name']:<30} {row['status']:<10} {row['count']}")
+        failures = Job.objects.filter(status=Job.FAILED).order_by('-finished_at')[:options['failures']]
+        for job in failures:
+            last_line = job.error.strip().splitlines()[-1] if job.error else ''
+            self.stdout.write(self.style.ERROR(f'#{job.pk} {job.name} failed at {job.finished_at}: {last_line}'))
+
+    def print_job(self, job):
+        self.stdout.write(f'#{job.pk} {job.name} {job.status}')
+        self.stdout.write(f'  kwargs: {job.kwargs}')
+        self.stdout.write(f'  attempts: {job.attempts}/{job.max_attempts}, run at: {job.run_at}')
+        self.stdout.write(f'  started: {job.started_at}, finished: {job.finished_at}, worker: {job.worker}')
+        if job.result is not None:
+            self.stdout.write(f'  result: {job.result}')
+        if job.error:
+            self.stdout.write(f'  error:\n{job.error}')
@@ -0,0 +1,35 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    """
+    Management command that runs the background job worker.
+
+    The worker runs queued jobs on --threads threads until it receives SIGINT or SIGTERM, after
+    which it finishes the running jobs and exits. With --burst it exits as soon as the queue is
+    empty, e.g. when run from cron.
+
+    Example Usage:
+        python manage.py run_jobs --threads 4
+
+    """
+    help = 'Run queued background jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='The number of jobs run at the same time.')
+        parser.add_argument('--poll-interval', type=float, help='The seconds to wait when the queue is empty.')
+        parser.add_argument('--burst', action='store_true', help='Exit when the queue is empty.')
+
+    def handle(self, *args, **options):
+        worker = Worker(threads=options['threads'], poll_interval=options['poll_interval'])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(f"Worker {worker.name} running with {options['threads']} threads.")
+        counters = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker stopped: {counters['succeeded']} jobs succeeded, {counters['failed']} attempts failed."
+        ))
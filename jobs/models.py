@@ -0,0 +1,230 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+
+class JobQuerySet(models.QuerySet):
+    """
+    QuerySet with the operations of the job queue.
+
+    Methods:
+        due(): Returns the queued jobs that may run now, in the order they should run.
+        claim(worker, limit): Marks up to limit due jobs as running for a worker and returns them.
+        heartbeat(worker, pks): Records that a worker is still running jobs.
+        requeue_stale(timeout): Requeues or fails running jobs whose worker seems to have died.
+
+    """
+
+    def due(self):
+        return self.filter(status=Job.QUEUED, run_at__lte=timezone.now()).order_by('run_at', 'id')
+
+    def claim(self, worker, limit=1):
+        """
+        Mark up to limit due jobs as running for a worker.
+
+        Each job is claimed with a conditional UPDATE, so two workers polling at the same
+        time never run the same job.
+
+        Args:
+            worker (str): The name of the worker.
+            limit (int): The maximum number of jobs to claim.
+
+        Returns:
+            list: The claimed jobs.
+
+        """
+        self._for_write = True
+        claimed = []
+        for pk in self.due().values_list('pk', flat=True)[:limit]:
+            with transaction.atomic(using=self.db):
+                now = timezone.now()
+                rows = self.filter(pk=pk, status=Job.QUEUED).update(
+                    status=Job.RUNNING,
+                    worker=worker,
+                    started_at=now,
+                    heartbeat_at=now,
+                    attempts=F('attempts') + 1,
+                )
+            if rows:
+                claimed.append(self.get(pk=pk))
+        return claimed
+
+    def heartbeat(self, worker, pks):
+        """
+        Record that a worker is still running the given jobs.
+
+        Args:
+            worker (str): The name of the worker.
+            pks (iterable): The primary keys of the jobs it is running.
+
+        Returns:
+            int: The number of jobs updated.
+
+        """
+        return self.filter(pk__in=list(pks), status=Job.RUNNING, worker=worker).update(
+            heartbeat_at=timezone.now(),
+        )
+
+    def requeue_stale(self, timeout):
+        """
+        Requeue the running jobs whose worker has not sent a heartbeat for timeout seconds.
+
+        Workers renew the heartbeat of their jobs every settings.JOBS['HEARTBEAT_INTERVAL']
+        seconds, so long jobs are never requeued while their worker is alive. A stale job that
+        has used up its attempts is failed instead, in the same UPDATE, so that a job which
+        keeps killing its worker is not run forever.
+
+        Args:
+            timeout (int): The number of seconds without heartbeat after which a job is considered lost.
+
+        Returns:
+            int: The number of requeued or failed jobs.
+
+        """
+        now = timezone.now()
+        exhausted = Q(attempts__gte=F('max_attempts'))
+        return self.filter(
+            status=Job.RUNNING,
+            heartbeat_at__lt=now - timedelta(seconds=timeout),
+        ).update(
+            status=Case(When(exhausted, then=Value(Job.FAILED)), default=Value(Job.QUEUED)),
+            error=Case(
+                When(exhausted, then=Value(Job.STALE_ERROR)),
+                default=F('error'),
+                output_field=models.TextField(),
+            ),
+            finished_at=Case(When(exhausted, then=Value(now)), default=None),
+            worker='',
+            run_at=now,
+        )
+
+
+class Job(models.Model):
+    """
+    Model representing a unit of background work.
+
+    A job names a function registered with jobs.registry.job and the keyword arguments to call
+    it with. Workers (the run_jobs command) claim queued jobs whose run_at has passed and run
+    them. A job that raises is retried with exponential backoff until max_attempts is reached.
+
+    Attributes:
+        name (CharField): The registered name of the function to run.
+        kwargs (JSONField): The keyword arguments of the function.
+        status (CharField): 'queued', 'running', 'succeeded' or 'failed'.
+        attempts (PositiveIntegerField): The number of times the job has been started.
+        max_attempts (PositiveIntegerField): The number of attempts before the job fails.
+        run_at (DateTimeField): The earliest time the job may run.
+        created_at (DateTimeField): When the job was enqueued.
+        started_at (DateTimeField): When the last attempt started.
+        heartbeat_at (DateTimeField): When the worker last reported that the attempt is running.
+        finished_at (DateTimeField): When the job succeeded or failed.
+        worker (CharField): The worker running or that last ran the job.
+        result (JSONField): The return value of the function.
+        error (TextField): The traceback of the last failed attempt.
+
+    Methods:
+        get_backoff(): Returns the delay before the next attempt.
+        succeed(result): Records the success of the job.
+        fail(error): Schedules a retry or records the failure of the job.
+
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    )
+    STALE_ERROR = 'The worker stopped sending heartbeats during the last attempt.'
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at', 'id'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+    def get_backoff(self):
+        """
+        Return the delay before the next attempt.
+
+        The delay doubles with every attempt, up to settings.JOBS['BACKOFF_MAX'] seconds, and
+        is randomised by up to 10% so that jobs failing together do not retry together.
+
+        Returns:
+            timedelta: The delay.
+
+        """
+        options = settings.JOBS
+        delay = min(options['BACKOFF_BASE'] * 2 ** max(self.attempts - 1, 0), options['BACKOFF_MAX'])
+        return timedelta(seconds=delay * random.uniform(1, 1.1))
+
+    def succeed(self, result=None):
+        """
+        Record the success of the job.
+
+        The job is only updated while it is still running on the same worker, so a worker
+        whose job was requeued as stale cannot overwrite the outcome of the new attempt.
+
+        Args:
+            result: The JSON-serializable return value of the function.
+
+        Returns:
+            bool: Whether the outcome was recorded.
+
+        """
+        self.status = self.SUCCEEDED
+        self.result = result
+        self.finished_at = timezone.now()
+        return self._finish(status=self.status, result=self.result, finished_at=self.finished_at)
+
+    def fail(self, error):
+        """
+        Schedule another attempt of the job, or record its failure after the last attempt.
+
+        As with succeed(), nothing is updated if the job no longer runs on this worker.
+
+        Args:
+            error (str): The traceback of the attempt.
+
+        Returns:
+            bool: Whether the outcome was recorded.
+
+        """
+        self.error = error
+        if self.attempts < self.max_attempts:
+            self.status = self.QUEUED
+            self.run_at = timezone.now() + self.get_backoff()
+        else:
+            self.status = self.FAILED
+            self.finished_at = timezone.now()
+        return self._finish(status=self.status, error=self.error, run_at=self.run_at, finished_at=self.finished_at)
+
+    def _finish(self, **fields):
+        rows = Job.objects.filter(pk=self.pk, status=self.RUNNING, worker=self.worker).update(**fields)
+        return bool(rows)
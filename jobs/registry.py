@@ -0,0 +1,103 @@
+"""
+Registration and enqueuing of job functions.
+
+Apps register the functions that may run in the background in their jobs.py module, which
+is imported when the project starts:
+
+    from jobs.registry import job
+
+    @job('tasks.rebuild_counters')
+    def rebuild_counters():
+        ...
+
+and enqueue them from anywhere, e.g. a view:
+
+    from jobs.registry import enqueue
+
+    enqueue('tasks.rebuild_counters')
+
+A job is a row in the database, so enqueuing inside a transaction only makes the job
+visible to the workers when the transaction commits, and no external broker is needed.
+"""
+import json
+import traceback
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Job
+
+registry = {}
+
+
+def job(name, max_attempts=3):
+    """
+    Register a function that can be run as a job.
+
+    The function is called with the keyword arguments given to enqueue(), which must be
+    JSON-serializable. Its return value, if JSON-serializable, is stored as the job result.
+
+    Args:
+        name (str): The unique name of the job, e.g. '<app>.<action>'.
+        max_attempts (int): The default number of attempts before the job fails.
+
+    Returns:
+        callable: The decorator, which returns the function unchanged.
+
+    """
+    def decorator(func):
+        if name in registry and registry[name][0] is not func:
+            raise ValueError(f'A job named {name!r} is already registered.')
+        registry[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def enqueue(name, run_at=None, max_attempts=None, **kwargs):
+    """
+    Queue a job.
+
+    Args:
+        name (str): The name of a registered job.
+        run_at (datetime): The earliest time the job may run. Defaults to now.
+        max_attempts (int): The number of attempts before the job fails, by default the one
+                            given when the job was registered.
+        **kwargs: The keyword arguments of the job function.
+
+    Returns:
+        Job: The queued job.
+
+    Raises:
+        KeyError: If no job with this name is registered.
+
+    """
+    if name not in registry:
+        raise KeyError(f'No job named {name!r} is registered.')
+    fields = {'name': name, 'kwargs': kwargs, 'max_attempts': max_attempts or registry[name][1]}
+    if run_at is not None:
+        fields['run_at'] = run_at
+    return Job.objects.create(**fields)
+
+
+def run(job):
+    """
+    Run a claimed job and record its outcome.
+
+    Args:
+        job (Job): A job claimed with Job.objects.claim().
+
+    Returns:
+        bool: Whether the job succeeded.
+
+    """
+    try:
+        func, _ = registry[job.name]
+        result = func(**job.kwargs)
+    except Exception:
+        job.fail(traceback.format_exc())
+        return False
+    try:
+        json.dumps(result, cls=DjangoJSONEncoder)
+    except (TypeError, ValueError):
+        result = repr(result)
+    job.succeed(result)
+    return True
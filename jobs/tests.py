@@ -0,0 +1,140 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import registry
+from .models import Job
+from .worker import Worker
+
+JOBS = {'BACKOFF_BASE': 5, 'BACKOFF_MAX': 60, 'HEARTBEAT_INTERVAL': 1, 'STALE_TIMEOUT': 60, 'POLL_INTERVAL': 0.01}
+
+calls = []
+
+
+@registry.job('jobs.tests.add')
+def add(a, b):
+    calls.append((a, b))
+    return a + b
+
+
+@registry.job('jobs.tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS=JOBS)
+class JobTests(TestCase):
+    """Tests of enqueuing, claiming, retrying and requeuing jobs."""
+
+    def run_due(self):
+        return [registry.run(job) for job in Job.objects.claim('test', limit=10)]
+
+    def test_enqueue_requires_a_registered_job(self):
+        with self.assertRaises(KeyError):
+            registry.enqueue('jobs.tests.unknown')
+        with self.assertRaises(ValueError):
+            registry.job('jobs.tests.add')(lambda: None)
+
+    def test_success(self):
+        job = registry.enqueue('jobs.tests.add', a=1, b=2)
+        self.assertEqual(self.run_due(), [True])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.attempts), (Job.SUCCEEDED, 3, 1))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_jobs_are_claimed_once(self):
+        registry.enqueue('jobs.tests.add', a=1, b=2)
+        registry.enqueue('jobs.tests.add', a=1, b=2, run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(len(Job.objects.claim('first', limit=10)), 1)
+        self.assertEqual(Job.objects.claim('second', limit=10), [])
+
+    def test_failure_is_retried_with_backoff(self):
+        job = registry.enqueue('jobs.tests.fail')
+        with mock.patch('jobs.models.random.uniform', return_value=1):
+            self.assertEqual(self.run_due(), [False])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('RuntimeError: boom', job.error)
+        self.assertAlmostEqual((job.run_at - timezone.now()).total_seconds(), 5, delta=1)
+
+        # Not due yet; once it is, the last attempt fails the job.
+        self.assertEqual(self.run_due(), [])
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(self.run_due(), [False])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_backoff_doubles_up_to_the_maximum(self):
+        job = Job(name='jobs.tests.fail')
+        with mock.patch('jobs.models.random.uniform', return_value=1):
+            delays = []
+            for attempts in (1, 2, 3, 10):
+                job.attempts = attempts
+                delays.append(job.get_backoff().total_seconds())
+        self.assertEqual(delays, [5, 10, 20, 60])
+
+    def test_stale_jobs_are_requeued_by_heartbeat(self):
+        registry.enqueue('jobs.tests.add', a=1, b=2)
+        job = Job.objects.claim('dead')[0]
+        long_ago = timezone.now() - timedelta(minutes=5)
+        # Started long ago but still beating: not stale.
+        Job.objects.filter(pk=job.pk).update(started_at=long_ago)
+        self.assertEqual(Job.objects.heartbeat('dead', [job.pk]), 1)
+        self.assertEqual(Job.objects.requeue_stale(60), 0)
+
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)
+        self.assertEqual(Job.objects.requeue_stale(60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (Job.QUEUED, ''))
+        # The heartbeat of a worker that lost the job does not touch it.
+        self.assertEqual(Job.objects.heartbeat('dead', [job.pk]), 0)
+
+    def test_stale_job_on_its_last_attempt_fails(self):
+        registry.enqueue('jobs.tests.add', a=1, b=2, max_attempts=1)
+        job = Job.objects.claim('dead')[0]
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(Job.objects.requeue_stale(60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Job.FAILED, Job.STALE_ERROR))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.run_due(), [])
+
+    def test_lost_job_keeps_the_outcome_of_the_new_attempt(self):
+        registry.enqueue('jobs.tests.add', a=1, b=2)
+        lost = Job.objects.claim('dead')[0]
+        Job.objects.filter(pk=lost.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+        Job.objects.requeue_stale(60)
+        job = Job.objects.claim('alive')[0]
+
+        self.assertFalse(lost.succeed(4))
+        self.assertFalse(lost.fail('Traceback'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.result, job.error), (Job.RUNNING, 'alive', None, ''))
+        self.assertTrue(job.succeed(3))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.SUCCEEDED, 3))
+
+
+@override_settings(JOBS=JOBS)
+class WorkerTests(TransactionTestCase):
+    """Tests of the worker, whose threads use their own database connections."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_burst_run(self):
+        for index in range(3):
+            registry.enqueue('jobs.tests.add', a=index, b=1)
+        registry.enqueue('jobs.tests.fail', max_attempts=1)
+        counters = Worker(threads=2).run(burst=True)
+        self.assertEqual(counters, {'succeeded': 3, 'failed': 1})
+        self.assertEqual(sorted(calls), [(0, 1), (1, 1), (2, 1)])
+        self.assertFalse(Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING]).exists())
+
+    @override_settings(JOBS={**JOBS, 'HEARTBEAT_INTERVAL': 60})
+    def test_heartbeat_must_be_shorter_than_the_stale_timeout(self):
+        with self.assertRaises(ImproperlyConfigured):
+            Worker()
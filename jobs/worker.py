@@ -0,0 +1,140 @@
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connections
+
+from . import registry
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Runs queued jobs on a pool of threads.
+
+    The worker polls the queue, claims as many due jobs as it has idle threads and runs them.
+    Every thread uses its own database connection, closed when its job finishes. While jobs
+    run, a heartbeat thread renews their heartbeat_at every heartbeat_interval seconds. Jobs
+    without a heartbeat for stale_timeout seconds, e.g. because their worker was killed, are
+    requeued when the worker starts and then every poll.
+
+    Attributes:
+        threads (int): The number of jobs run at the same time.
+        poll_interval (float): The number of seconds to wait when the queue is empty.
+        heartbeat_interval (float): The number of seconds between two heartbeats.
+        stale_timeout (int): The number of seconds without heartbeat after which a job is considered lost.
+        name (str): The name of the worker, recorded on the jobs it claims.
+
+    Methods:
+        run(burst=False): Runs jobs until stop() is called, or until the queue is empty in burst mode.
+        stop(): Stops claiming jobs; running jobs are finished.
+
+    """
+
+    def __init__(self, threads=4, poll_interval=None, stale_timeout=None):
+        options = settings.JOBS
+        self.threads = threads
+        self.poll_interval = poll_interval or options['POLL_INTERVAL']
+        self.heartbeat_interval = options['HEARTBEAT_INTERVAL']
+        self.stale_timeout = stale_timeout or options['STALE_TIMEOUT']
+        if self.heartbeat_interval >= self.stale_timeout:
+            raise ImproperlyConfigured("JOBS['HEARTBEAT_INTERVAL'] must be shorter than the stale timeout.")
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.counters = {'succeeded': 0, 'failed': 0}
+        self._stopping = threading.Event()
+        self._idle = threading.Semaphore(threads)
+        self._lock = threading.Lock()
+        self._running = set()
+
+    def stop(self):
+        self._stopping.set()
+
+    def execute(self, job):
+        with self._lock:
+            self._running.add(job.pk)
+        try:
+            ok = registry.run(job)
+            logger.info('Job %s %s.', job, 'succeeded' if ok else 'failed')
+            with self._lock:
+                self.counters['succeeded' if ok else 'failed'] += 1
+        finally:
+            with self._lock:
+                self._running.discard(job.pk)
+            connections.close_all()
+            self._idle.release()
+
+    def beat(self, finished):
+        """
+        Renew the heartbeat of the running jobs until finished is set.
+
+        Args:
+            finished (Event): Set when the worker has finished its last job.
+
+        """
+        try:
+            while not finished.wait(self.heartbeat_interval):
+                with self._lock:
+                    running = set(self._running)
+                if running:
+                    Job.objects.heartbeat(self.name, running)
+        finally:
+            connections.close_all()
+
+    def run(self, burst=False):
+        """
+        Run jobs until stop() is called.
+
+        Args:
+            burst (bool): Return as soon as no job is due and none is running.
+
+        Returns:
+            dict: The number of jobs that succeeded and failed, retries included.
+
+        """
+        finished = threading.Event()
+        heart = threading.Thread(target=self.beat, args=(finished,), name='job-heartbeat', daemon=True)
+        heart.start()
+        try:
+            self._run(burst)
+        finally:
+            finished.set()
+            heart.join()
+        return self.counters
+
+    def _run(self, burst):
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='job') as pool:
+            while not self._stopping.is_set():
+                close_old_connections()
+                stale = Job.objects.requeue_stale(self.stale_timeout)
+                if stale:
+                    logger.warning('Requeued or failed %d stale jobs.', stale)
+
+                # Only claim as many jobs as there are idle threads, so claimed jobs never wait.
+                self._idle.acquire()
+                idle = 1
+                while idle < self.threads and self._idle.acquire(blocking=False):
+                    idle += 1
+                jobs = Job.objects.claim(self.name, limit=idle)
+                for _ in range(idle - len(jobs)):
+                    self._idle.release()
+                for job in jobs:
+                    pool.submit(self.execute, job)
+
+                if not jobs:
+                    if burst and self._all_idle():
+                        break
+                    self._stopping.wait(self.poll_interval)
+
+    def _all_idle(self):
+        acquired = 0
+        while self._idle.acquire(blocking=False):
+            acquired += 1
+        for _ in range(acquired):
+            self._idle.release()
+        return acquired == self.threads
@@ -0,0 +1,46 @@
+(function () {
+    const container = document.getElementById('task-list');
+    if (!container || !window.EventSource) {
+        return;
+    }
+
+    // Changes pushed by the server are coalesced for a short while and the current page is
+    // then fetched once, replacing the list and the task count. The browser reconnects on its
+    // own when the stream is closed.
+    const delay = 500;
+    let timer = null;
+
+    function refresh() {
+        timer = null;
+        fetch(window.location.href, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                const page = new DOMParser().parseFromString(html, 'text/html');
+                const list = page.getElementById('task-list');
+                const total = page.getElementById('task-total');
+                if (list) {
+                    container.innerHTML = list.innerHTML;
+                }
+                if (total) {
+                    document.getElementById('task-total').textContent = total.textContent;
+                }
+            })
+            .catch(function () {});
+    }
+
+    function schedule() {
+        if (timer === null) {
+            timer = setTimeout(refresh, delay);
+        }
+    }
+
+    const source = new EventSource(container.dataset.eventsUrl);
+    ['created', 'updated', 'deleted', 'resync'].forEach(function (type) {
+        source.addEventListener(type, schedule);
+    });
+})();
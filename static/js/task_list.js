@@ -0,0 +1,68 @@
+(function () {
+    // The list may be replaced by live updates (see task_events.js), so it is looked up on use
+    // and checkbox changes are handled on the document.
+    function taskList() {
+        return document.querySelector('[data-toggle-url]');
+    }
+
+    if (!taskList()) {
+        return;
+    }
+
+    // Checkbox clicks are collected for a short while and sent to the toggle endpoint in one
+    // request. Clicking the same checkbox twice within the window cancels the toggle.
+    const delay = 300;
+    const pending = new Set();
+    let timer = null;
+
+    function csrfToken() {
+        const input = document.querySelector('input[name="csrfmiddlewaretoken"]');
+        return input ? input.value : '';
+    }
+
+    function flush() {
+        timer = null;
+        const ids = Array.from(pending);
+        pending.clear();
+        if (!ids.length) {
+            return;
+        }
+        fetch(taskList().dataset.toggleUrl, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken()},
+            body: JSON.stringify({ids: ids}),
+        })
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.json();
+            })
+            .then(function (data) {
+                const list = taskList();
+                data.tasks.forEach(function (task) {
+                    const checkbox = list.querySelector('[data-task-id="' + task.id + '"]');
+                    if (checkbox) {
+                        checkbox.checked = task.status;
+                    }
+                });
+            })
+            .catch(function () {
+                window.location.reload();
+            });
+    }
+
+    document.addEventListener('change', function (event) {
+        const id = event.target.dataset.taskId;
+        if (!id || !event.target.closest('[data-toggle-url]')) {
+            return;
+        }
+        if (pending.has(id)) {
+            pending.delete(id);
+        } else {
+            pending.add(id);
+        }
+        clearTimeout(timer);
+        timer = setTimeout(flush, delay);
+    });
+})();
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Task
+from .models import ArchivedTask, Task
 
 
 @admin.register(Task)
@@ -13,6 +13,22 @@ class TaskAdmin(admin.ModelAdmin):
 
     Attributes:
         list_display (tuple): A tuple containing the names of fields to be displayed in the list view.
+        list_select_related (tuple): Related objects fetched together with the tasks in the list view.
 
     """
-    list_display = ('id', 'title', 'status',)
+    list_display = ('id', 'title', 'status', 'owner',)
+    list_select_related = ('owner',)
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    """
+    Admin panel configuration for the ArchivedTask model.
+
+    Attributes:
+        list_display (tuple): A tuple containing the names of fields to be displayed in the list view.
+        list_select_related (tuple): Related objects fetched together with the tasks in the list view.
+
+    """
+    list_display = ('id', 'title', 'owner', 'archived_at',)
+    list_select_related = ('owner',)
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
+        from .cache import check_task_list_cache
+        from todo.templating import check_cached_template_loaders
+
+        checks.register(check_cached_template_loaders, checks.Tags.templates)
+        checks.register(check_task_list_cache, checks.Tags.caches, deploy=True)
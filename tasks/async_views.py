@@ -0,0 +1,511 @@
+"""
+Async (ASGI-native) versions of the task views.
+
+Under ASGI every synchronous view occupies a thread for the whole request. The views in this
+module are coroutines that only leave the event loop for the ORM calls Django does not run
+natively asynchronously yet (model saves, deletes and updates, which go through the task
+counter bookkeeping in Task and TaskQuerySet). The task list is read with async iteration and
+acount(), so a single worker can serve many slow clients concurrently.
+
+The views render the same templates as their synchronous counterparts and keep their
+optimizations: the task list answers conditional GETs with 304, reuses the cached list
+fragment and offers to undo the last deletion.
+"""
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import Paginator
+from django.db.models import Case, Value, When
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import View
+
+from .cache import task_list_cache
+from .conditional import task_list_etag
+from .events import task_event_hub
+from .forms import TaskCreateForm, TaskFilterForm, TaskUpdateForm
+from .models import Task, TaskCounter
+from .pagination import (
+    KeysetPaginator,
+    get_page_range,
+    get_pagination_query,
+    get_per_page,
+    parse_cursor,
+)
+from .views import TaskDeleteView, TaskStatusToggleView, is_asgi_request
+
+
+class AsyncOwnedTaskView(View):
+    """Base class of the async views, restricting them to the tasks of the logged-in user.
+
+    Attributes:
+        login_url (str): The URL to redirect anonymous users to.
+        raise_exception (bool): Respond with 403 instead of redirecting anonymous users to login.
+
+    Methods:
+        get_user(): Returns the logged-in user, or None.
+        handle_no_permission(): Returns the response for anonymous users.
+        get_queryset(user): Returns the tasks owned by the user.
+        get_restorable_queryset(user): Returns the user's tasks that can still be restored.
+        get_task(user, pk): Returns one of the user's tasks.
+
+    """
+    login_url = reverse_lazy('login')
+    raise_exception = False
+
+    async def get_user(self):
+        """Return the logged-in user, or None.
+
+        request.user is resolved from the session lazily and synchronously, so it is resolved
+        in a thread once; later attribute access does not touch the database.
+
+        Returns:
+            CustomUser or None: The authenticated user.
+
+        """
+        def resolve():
+            user = self.request.user
+            return user if user.is_authenticated else None
+
+        return await sync_to_async(resolve)()
+
+    def handle_no_permission(self):
+        """Return the response for anonymous users.
+
+        Returns:
+            HttpResponse: A 403 JSON response or a redirect to the login page.
+
+        """
+        if self.raise_exception:
+            return JsonResponse({'error': 'Authentication required.'}, status=403)
+        return redirect_to_login(self.request.get_full_path(), self.login_url)
+
+    def get_queryset(self, user):
+        """Return the tasks owned by the user.
+
+        Args:
+            user (CustomUser): The logged-in user.
+
+        Returns:
+            QuerySet: The user's tasks.
+
+        """
+        return Task.objects.filter(owner=user)
+
+    def get_restorable_queryset(self, user):
+        """Return the user's tasks deleted less than the undo window ago.
+
+        Args:
+            user (CustomUser): The logged-in user.
+
+        Returns:
+            QuerySet: The user's restorable tasks.
+
+        """
+        deleted_after = timezone.now() - timedelta(seconds=settings.TASK_DELETION['UNDO_WINDOW'])
+        return Task.all_objects.deleted().filter(owner=user, deleted_at__gte=deleted_after)
+
+    async def get_task(self, user, pk):
+        """Return one of the user's tasks.
+
+        Args:
+            user (CustomUser): The logged-in user.
+            pk (int): The primary key of the task.
+
+        Returns:
+            Task: The task.
+
+        Raises:
+            Http404: If the user has no task with this primary key.
+
+        """
+        try:
+            return await self.get_queryset(user).aget(pk=pk)
+        except Task.DoesNotExist:
+            raise Http404('No task found matching the query')
+
+
+class AsyncTaskListView(AsyncOwnedTaskView):
+    """Async view listing the user's tasks and creating new ones.
+
+    The list supports the same filters, page size and pagination parameters as TaskCreateView,
+    and the same caching: the page has the ETag of task_list_etag() so unchanged pages are
+    answered with 304, and the rendered task list is shared with TaskCreateView through
+    task_list_cache. The session and the cache have synchronous APIs only, so they are used
+    through sync_to_async.
+
+    Attributes:
+        template_name (str): The name of the template to render.
+        fragment_template_name (str): The name of the template rendering the task list.
+        paginate_by (int): The default number of tasks to display per page.
+        max_paginate_by (int): The largest page size a client may request with ?per_page=.
+        pagination_on_each_side (int): The number of page links around the current page.
+        pagination_on_ends (int): The number of page links at the beginning and the end.
+        success_url (str): The URL to redirect to after a task is created.
+
+    Methods:
+        get(request, *args, **kwargs): Renders the task list unless the client's copy is current.
+        post(request, *args, **kwargs): Creates a task and redirects to the list.
+        get_task_list_context(user): Returns the context of the task list fragment.
+        get_task_list_fragment(user): Returns the rendered task list, from the cache if possible.
+        get_undo_task(user): Returns the task just deleted, if it can still be restored.
+        render_list(user, form): Renders the task list page.
+
+    """
+    template_name = 'tasks/task_list.html'
+    fragment_template_name = 'include/task_items.html'
+    paginate_by = 5
+    max_paginate_by = 50
+    pagination_on_each_side = 2
+    pagination_on_ends = 1
+    success_url = reverse_lazy('async_tasks')
+
+    async def get_task_list_context(self, user):
+        """Return the context of the task list fragment.
+
+        Args:
+            user (CustomUser): The logged-in user.
+
+        Returns:
+            dict: The same keys as TaskCreateView.get_task_list_context().
+
+        """
+        params = self.request.GET
+        counts = await TaskCounter.objects.aget_counts(owner=user)
+        filter_form = TaskFilterForm(params)
+        filters = filter_form.get_filters()
+        queryset = filter_form.filter_queryset(self.get_queryset(user))
+        per_page = get_per_page(params, self.paginate_by, self.max_paginate_by)
+        after, before = parse_cursor(params.get('after')), parse_cursor(params.get('before'))
+
+        page_obj = cursor_page = None
+        page_range = []
+        if (after is not None or before is not None) and filters['sort'] == 'newest':
+            cursor_page = tasks = await KeysetPaginator(queryset, per_page).aget_page(after=after, before=before)
+        else:
+            paginator = Paginator(queryset, per_page)
+            if filters['title']:
+                paginator.count = await queryset.acount()
+            else:
+                paginator.count = counts[filters['status'] or 'total']
+            page_obj = tasks = paginator.get_page(params.get('page'))
+            page_obj.object_list = [task async for task in page_obj.object_list]
+            page_range = get_page_range(page_obj, self.pagination_on_each_side, self.pagination_on_ends)
+
+        return {
+            'tasks': tasks,
+            'total_tasks': counts['total'],
+            'done_tasks': counts['done'],
+            'open_tasks': counts['open'],
+            'page_obj': page_obj,
+            'page_range': page_range,
+            'cursor_page': cursor_page,
+            'pagination_query': get_pagination_query(params),
+        }
+
+    async def get_task_list_fragment(self, user):
+        """Return the rendered task list and the task counts, from the cache if possible.
+
+        The page of tasks is fully materialized before rendering, so the template does not
+        query the database and can be rendered on the event loop.
+
+        Args:
+            user (CustomUser): The logged-in user.
+
+        Returns:
+            dict: A dictionary with 'task_list_html', 'total_tasks', 'done_tasks' and 'open_tasks'.
+
+        """
+        key = await sync_to_async(task_list_cache.get_key)(user.pk, self.request.GET)
+        fragment = await sync_to_async(task_list_cache.get)(key)
+        if fragment is None:
+            task_list = await self.get_task_list_context(user)
+            fragment = {
+                'task_list_html': render_to_string(self.fragment_template_name, task_list),
+                'total_tasks': task_list['total_tasks'],
+                'done_tasks': task_list['done_tasks'],
+                'open_tasks': task_list['open_tasks'],
+            }
+            await sync_to_async(task_list_cache.set)(key, fragment)
+        return fragment
+
+    async def get_undo_task(self, user):
+        """Return the task just deleted, if it can still be restored.
+
+        The task is only offered once: its id is removed from the session.
+
+        Args:
+            user (CustomUser): The logged-in user.
+
+        Returns:
+            Task or None: The deleted task.
+
+        """
+        pk = await sync_to_async(self.request.session.pop)(TaskDeleteView.undo_session_key, None)
+        if pk is None:
+            return None
+        return await self.get_restorable_queryset(user).filter(pk=pk).afirst()
+
+    async def render_list(self, user, form):
+        """Render the task list page.
+
+        Args:
+            user (CustomUser): The logged-in user.
+            form (TaskCreateForm): The task creation form, possibly bound with errors.
+
+        Returns:
+            HttpResponse: The rendered page.
+
+        """
+        context = {
+            **await self.get_task_list_fragment(user),
+            'form': form,
+            'filter_form': TaskFilterForm(self.request.GET),
+            'undo_task': await self.get_undo_task(user),
+            'title': 'Tasks',
+        }
+        return render(self.request, self.template_name, context)
+
+    async def get(self, request, *args, **kwargs):
+        """Render the task list, or answer 304 Not Modified if the client's copy is current.
+
+        Returns:
+            HttpResponse: The rendered page or an empty 304 response.
+
+        """
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        etag = quote_etag(await sync_to_async(task_list_etag)(request))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await self.render_list(user, TaskCreateForm())
+        response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    async def post(self, request, *args, **kwargs):
+        """Create a task for the logged-in user and redirect to the list.
+
+        Returns:
+            HttpResponse: A redirect, or the list with the form errors.
+
+        """
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        form = TaskCreateForm(request.POST)
+        if not form.is_valid():
+            return await self.render_list(user, form)
+        task = form.save(commit=False)
+        task.owner = user
+        await task.asave()
+        return redirect(self.success_url)
+
+
+class AsyncTaskUpdateView(AsyncOwnedTaskView):
+    """Async view for updating one of the user's tasks.
+
+    Attributes:
+        template_name (str): The name of the template to render.
+        success_url (str): The URL to redirect to after a successful update.
+
+    Methods:
+        get(request, pk, *args, **kwargs): Renders the update form.
+        post(request, pk, *args, **kwargs): Updates the task and redirects to the list.
+
+    """
+    template_name = 'tasks/update_task.html'
+    success_url = reverse_lazy('async_tasks')
+
+    async def get(self, request, pk, *args, **kwargs):
+        """Render the update form.
+
+        Returns:
+            HttpResponse: The rendered page.
+
+        """
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        task = await self.get_task(user, pk)
+        form = TaskUpdateForm(instance=task)
+        return render(request, self.template_name, {'task': task, 'form': form, 'title': 'Update task'})
+
+    async def post(self, request, pk, *args, **kwargs):
+        """Update the task and redirect to the list.
+
+        Returns:
+            HttpResponse: A redirect, or the update form with the form errors.
+
+        """
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        task = await self.get_task(user, pk)
+        form = TaskUpdateForm(request.POST, instance=task)
+        if not form.is_valid():
+            return render(request, self.template_name, {'task': task, 'form': form, 'title': 'Update task'})
+        await form.save(commit=False).asave()
+        return redirect(self.success_url)
+
+
+class AsyncTaskDeleteView(AsyncOwnedTaskView):
+    """Async view for deleting one of the user's tasks.
+
+    The task is remembered in the session so that the list offers to undo the deletion, as
+    with TaskDeleteView.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        success_url (str): The URL to redirect to after the deletion.
+
+    Methods:
+        post(request, pk, *args, **kwargs): Deletes the task and redirects to the list.
+
+    """
+    http_method_names = ['post']
+    success_url = reverse_lazy('async_tasks')
+
+    async def post(self, request, pk, *args, **kwargs):
+        """Delete the task and redirect to the list.
+
+        Returns:
+            HttpResponse: A redirect to the list.
+
+        """
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        task = await self.get_task(user, pk)
+        await task.adelete()
+        await sync_to_async(request.session.__setitem__)(TaskDeleteView.undo_session_key, task.pk)
+        return redirect(self.success_url)
+
+
+class AsyncTaskStatusToggleView(AsyncOwnedTaskView):
+    """Async version of TaskStatusToggleView.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        max_batch_size (int): The maximum number of task ids accepted in one request.
+        raise_exception (bool): Respond with 403 instead of redirecting anonymous users to login.
+
+    Methods:
+        post(request, *args, **kwargs): Toggles the tasks and returns their new states.
+
+    """
+    http_method_names = ['post']
+    max_batch_size = TaskStatusToggleView.max_batch_size
+    raise_exception = True
+
+    get_task_ids = TaskStatusToggleView.get_task_ids
+
+    async def post(self, request, *args, **kwargs):
+        """Toggle the status of the requested tasks.
+
+        Returns:
+            JsonResponse: The new status of every toggled task, or an error with status 400.
+
+        """
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        ids = self.get_task_ids()
+        if not ids:
+            return JsonResponse({'error': 'Expected a non-empty list of task ids.'}, status=400)
+        if len(ids) > self.max_batch_size:
+            return JsonResponse(
+                {'error': f'At most {self.max_batch_size} tasks can be toggled at once.'},
+                status=400,
+            )
+
+        tasks = self.get_queryset(user).filter(pk__in=ids)
+        await tasks.aupdate(status=Case(When(status=True, then=Value(False)), default=Value(True)))
+        return JsonResponse({
+            'tasks': [{'id': pk, 'status': status} async for pk, status in tasks.values_list('pk', 'status')],
+        })
+
+
+class TaskEventStreamView(AsyncOwnedTaskView):
+    """Server-Sent Events stream of the changes to the user's task list.
+
+    Every committed create, update and delete of one of the user's tasks is sent as an event
+    named after the action, with the event id and the changed task ids as JSON data. A
+    'resync' event means events were dropped because the client read too slowly and the list
+    should be reloaded. Keep-alive comments are sent while nothing happens, and the stream is
+    closed after settings.TASK_EVENTS['MAX_AGE'] seconds so that the browser reconnects.
+
+    The stream only works under the ASGI application (todo/asgi.py): a WSGI server would
+    buffer the whole stream and hold a thread for it, so under WSGI the view answers
+    204 No Content, which tells the browser not to reconnect.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        raise_exception (bool): Respond with 403 instead of redirecting anonymous users to login.
+
+    Methods:
+        get(request, *args, **kwargs): Opens the stream.
+        stream(owner_id): Yields the stream as server-sent event messages.
+
+    """
+    http_method_names = ['get']
+    raise_exception = True
+
+    async def get(self, request, *args, **kwargs):
+        """Open the stream of the user's events.
+
+        Returns:
+            StreamingHttpResponse: The text/event-stream response, or 204 under WSGI.
+
+        """
+        if not is_asgi_request(request):
+            return HttpResponse(status=204)
+        user = await self.get_user()
+        if user is None:
+            return self.handle_no_permission()
+        response = StreamingHttpResponse(self.stream(user.pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, owner_id):
+        """Yield the events of an owner as server-sent event messages.
+
+        The subscription is opened when the response starts streaming and closed when the
+        stream ends, including when the client disconnects, so a response that is never
+        streamed does not leave a subscription behind.
+
+        Args:
+            owner_id (int): The owner whose events are streamed.
+
+        Yields:
+            str: The messages, keep-alive comments included.
+
+        """
+        options = settings.TASK_EVENTS
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + options['MAX_AGE']
+        subscription = task_event_hub.subscribe(owner_id)
+        try:
+            yield f"retry: {options['RETRY']}\n\n"
+            while (remaining := deadline - loop.time()) > 0:
+                event = await subscription.get(timeout=min(options['HEARTBEAT'], remaining))
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                lines = [f"event: {event['type']}", f'data: {json.dumps(event)}']
+                if 'id' in event:
+                    lines.insert(0, f"id: {event['id']}")
+                yield '\n'.join(lines) + '\n\n'
+        finally:
+            task_event_hub.unsubscribe(subscription)
@@ -0,0 +1,148 @@
+"""
+Helpers shared by the benchmark management commands.
+
+The benchmarks never touch the development database: they run against a throwaway test
+database created with the same machinery as the test runner and destroyed afterwards.
+"""
+import random
+import statistics
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from .models import Task, TaskCounter
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+@contextmanager
+def isolated_database(using='default', verbosity=0):
+    """Run the enclosed block against a freshly created test database.
+
+    The test environment is set up as well, so that the test client accepts the 'testserver'
+    host and outgoing email is kept in memory.
+
+    Args:
+        using (str): The alias of the database to replace.
+        verbosity (int): The verbosity passed to the test database creation.
+
+    Yields:
+        str: The name of the test database.
+
+    """
+    connection = connections[using]
+    setup_test_environment()
+    allowed_hosts = settings.ALLOWED_HOSTS
+    settings.ALLOWED_HOSTS = [*allowed_hosts, 'testserver']
+    old_name = connection.settings_dict['NAME']
+    try:
+        yield connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        settings.ALLOWED_HOSTS = allowed_hosts
+        teardown_test_environment()
+
+
+def summarize(latencies, elapsed=None):
+    """Summarize a list of latencies.
+
+    Args:
+        latencies (list): The latency of every request, in seconds.
+        elapsed (float): The wall-clock duration of the whole run, in seconds.
+
+    Returns:
+        dict: The number of requests, the throughput when elapsed is given, and the mean,
+              p50, p95, p99 and maximum latency in milliseconds.
+
+    """
+    if not latencies:
+        return {'requests': 0}
+    ordered = sorted(latencies)
+    quantiles = statistics.quantiles(ordered, n=100, method='inclusive') if len(ordered) > 1 else ordered * 99
+    summary = {
+        'requests': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(quantiles[49] * 1000, 3),
+        'p95_ms': round(quantiles[94] * 1000, 3),
+        'p99_ms': round(quantiles[98] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+    if elapsed:
+        summary['requests_per_second'] = round(len(ordered) / elapsed, 1)
+    return summary
+
+
+def seed_users(count, password=BENCHMARK_PASSWORD):
+    """Create users named user<n>@example.com, all with the same password.
+
+    The password is hashed once and the hash shared, so seeding does not pay for
+    count password hashes.
+
+    Args:
+        count (int): The number of users to create.
+        password (str): The password of every user.
+
+    Returns:
+        list: The users, in creation order.
+
+    """
+    user_model = get_user_model()
+    password = make_password(password)
+    return user_model.objects.bulk_create(
+        (user_model(email=f'user{number}@example.com', password=password) for number in range(count)),
+        batch_size=1000,
+    )
+
+
+def seed_tasks(owners, count, seed=0):
+    """Create tasks for the given owners and rebuild the task counters.
+
+    Args:
+        owners (list): The users to create the tasks for; each gets count tasks.
+        count (int): The number of tasks per owner.
+        seed (int): The seed of the random titles and statuses, for reproducible data.
+
+    """
+    rng = random.Random(seed)
+    words = ('buy', 'call', 'fix', 'write', 'review', 'plan', 'clean', 'book', 'send', 'read')
+
+    def tasks():
+        for owner in owners:
+            for _ in range(count):
+                title = ' '.join(rng.choice(words) for _ in range(3))
+                yield Task(owner=owner, title=title, status=rng.random() < 0.3)
+
+    Task.objects.bulk_create(tasks(), batch_size=1000)
+    TaskCounter.objects.rebuild()
+
+
+def compare(results, baseline, threshold):
+    """Compare benchmark results against a baseline.
+
+    A scenario regresses when its median or p95 latency exceeds the baseline by more than
+    the threshold, or when it runs more queries than in the baseline.
+
+    Args:
+        results (dict): The scenario summaries of the current run.
+        baseline (dict): The scenario summaries of the baseline run.
+        threshold (float): The allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        list: The regressions, as human-readable strings.
+
+    """
+    regressions = []
+    for name, summary in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if summary[metric] > expected[metric] * (1 + threshold):
+                regressions.append(f'{name}: {metric} {summary[metric]} > baseline {expected[metric]}')
+        if summary.get('queries', 0) > expected.get('queries', 0):
+            regressions.append(f"{name}: queries {summary['queries']} > baseline {expected['queries']}")
+    return regressions
@@ -0,0 +1,169 @@
+from django.db import transaction
+
+from .forms import TaskCreateForm, TaskUpdateForm
+from .models import Task
+
+# The largest primary key a SQLite INTEGER (and a bigint column) can hold.
+MAX_ID = 2 ** 63 - 1
+
+
+def is_task_id(value):
+    """
+    Return whether a value decoded from JSON is a plausible task primary key.
+
+    Booleans are rejected although they are ints in Python, so that true does not mean task 1.
+
+    Args:
+        value: The decoded value.
+
+    Returns:
+        bool: True for an int between 1 and MAX_ID.
+    """
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= MAX_ID
+
+
+def get_field_errors(operation):
+    """
+    Return the errors of the fields of an operation that have the wrong JSON type.
+
+    The forms coerce what they are given, e.g. a list title to its string representation,
+    so the types are checked before the values reach them.
+
+    Args:
+        operation (dict): The operation.
+
+    Returns:
+        dict: The errors by field, empty if the types are right.
+    """
+    errors = {}
+    if 'title' in operation and not isinstance(operation['title'], str):
+        errors['title'] = ['Expected a string.']
+    if 'status' in operation and not isinstance(operation['status'], bool):
+        errors['status'] = ['Expected true or false.']
+    return errors
+
+
+class BulkOperations:
+    """
+    Validates and executes a batch of task create, update and delete operations.
+
+    Every operation is a dictionary with an 'op' key ('create', 'update' or 'delete'). Create
+    operations are validated with TaskCreateForm and update operations with TaskUpdateForm,
+    so the bulk API accepts exactly what the single-task views accept. Fields missing from an
+    update operation keep their current values.
+
+    Valid operations are executed together inside one transaction: one bulk_create, one
+    bulk_update and one DELETE statement, regardless of the number of operations. Invalid
+    operations are skipped and reported in the results.
+
+    Attributes:
+        operations (list): The operations to execute, in request order.
+        owner (CustomUser): The owner assigned to created tasks.
+        queryset (QuerySet): The tasks that update and delete operations may target.
+        results (list): One result dictionary per operation, filled in by validate() and execute().
+
+    Methods:
+        validate(): Validates every operation and groups the valid ones by type.
+        execute(): Executes the valid operations and returns the results.
+
+    """
+
+    def __init__(self, operations, owner=None, queryset=None):
+        self.operations = operations
+        self.owner = owner
+        self.queryset = queryset if queryset is not None else Task.objects.all()
+        self.results = [None] * len(operations)
+        self._creates = []
+        self._updates = []
+        self._deletes = []
+
+    def _fail(self, index, errors):
+        self.results[index] = {'index': index, 'ok': False, 'errors': errors}
+
+    def validate(self):
+        """
+        Validate every operation and group the valid ones by type.
+
+        Update and delete targets are fetched with one query. An operation whose id is not an
+        integer, or that targets a task already targeted by an earlier update or delete
+        operation, is rejected.
+
+        """
+        target_ids = set()
+        for operation in self.operations:
+            if isinstance(operation, dict) and operation.get('op') in ('update', 'delete'):
+                if is_task_id(operation.get('id')):
+                    target_ids.add(operation['id'])
+        instances = self.queryset.in_bulk(target_ids)
+
+        seen = set()
+        for index, operation in enumerate(self.operations):
+            if not isinstance(operation, dict):
+                self._fail(index, {'__all__': ['Expected an object.']})
+                continue
+            action = operation.get('op')
+            errors = get_field_errors(operation)
+            if errors and action in ('create', 'update'):
+                self._fail(index, errors)
+                continue
+            if action == 'create':
+                form = TaskCreateForm(data=operation)
+                if form.is_valid():
+                    form.instance.owner = self.owner
+                    self._creates.append((index, form.save(commit=False)))
+                else:
+                    self._fail(index, {field: list(errors) for field, errors in form.errors.items()})
+                continue
+            if action not in ('update', 'delete'):
+                self._fail(index, {'op': ["Expected 'create', 'update' or 'delete'."]})
+                continue
+
+            if not is_task_id(operation.get('id')):
+                self._fail(index, {'id': ['Expected a positive integer.']})
+                continue
+            task = instances.get(operation['id'])
+            if task is None:
+                self._fail(index, {'id': ['Task not found.']})
+                continue
+            if task.pk in seen:
+                self._fail(index, {'id': ['Task is targeted by more than one operation.']})
+                continue
+            seen.add(task.pk)
+
+            if action == 'delete':
+                self._deletes.append((index, task))
+                continue
+            form = TaskUpdateForm(
+                data={
+                    'title': operation.get('title', task.title),
+                    'status': operation.get('status', task.status),
+                },
+                instance=task,
+            )
+            if form.is_valid():
+                self._updates.append((index, form.save(commit=False)))
+            else:
+                self._fail(index, {field: list(errors) for field, errors in form.errors.items()})
+
+    def execute(self):
+        """
+        Execute the valid operations inside one transaction.
+
+        Returns:
+            list: One result dictionary per operation, in request order.
+        """
+        self.validate()
+        with transaction.atomic():
+            created = Task.objects.bulk_create([task for _, task in self._creates])
+            if self._updates:
+                Task.objects.bulk_update([task for _, task in self._updates], ['title', 'status'])
+            if self._deletes:
+                Task.objects.filter(pk__in=[task.pk for _, task in self._deletes]).delete()
+
+        for (index, _), task in zip(self._creates, created):
+            self.results[index] = {'index': index, 'ok': True, 'op': 'create', 'id': task.pk}
+        for index, task in self._updates:
+            self.results[index] = {'index': index, 'ok': True, 'op': 'update', 'id': task.pk}
+        for index, task in self._deletes:
+            self.results[index] = {'index': index, 'ok': True, 'op': 'delete', 'id': task.pk}
+        return self.results
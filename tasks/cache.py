@@ -0,0 +1,169 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning
+
+
+class TaskListCache:
+    """
+    Cache for rendered task list fragments.
+
+    Fragments are stored in the cache configured by settings.TASK_LIST_CACHE, a bounded
+    local-memory cache by default that evicts the least recently used entries. The versions
+    live in the same cache, so with several worker processes it must be shared by all of them;
+    check_task_list_cache() reports a per-process cache in 'manage.py check --deploy'. Every owner
+    has a list version that is bumped whenever one of their tasks changes; the version is
+    part of the fragment key, so a change makes all cached pages of the owner unreachable
+    instead of deleting them one by one.
+
+    Hits and misses are counted in the same cache and reported by stats().
+
+    Attributes:
+        alias (str): The alias of the cache in settings.CACHES.
+        timeout (int): The number of seconds a fragment is kept.
+
+    Methods:
+        get_version(owner_id): Returns the current list version of an owner.
+        bump(owner_ids): Invalidates the cached fragments of the given owners.
+        get_key(owner_id, params): Returns the fragment key for a page of an owner's list.
+        get(key): Returns a cached fragment, counting the hit or miss.
+        set(key, value): Stores a fragment.
+        stats(): Returns the hit and miss counters.
+
+    """
+    HITS_KEY = 'tasks:list:hits'
+    MISSES_KEY = 'tasks:list:misses'
+
+    def __init__(self, alias=None, timeout=None):
+        self.alias = alias or getattr(settings, 'TASK_LIST_CACHE', 'default')
+        self.timeout = timeout if timeout is not None else getattr(settings, 'TASK_LIST_CACHE_TIMEOUT', 300)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _version_key(self, owner_id):
+        return f'tasks:list:version:{owner_id}'
+
+    def _increment(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 1, None)
+
+    def get_version(self, owner_id):
+        """
+        Return the current list version of an owner.
+
+        A missing version, e.g. after eviction, is recreated from the clock, so it is always
+        greater than any version handed out before.
+
+        Args:
+            owner_id (int): The primary key of the owner.
+
+        Returns:
+            int: The list version.
+        """
+        key = self._version_key(owner_id)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, time.time_ns(), None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self, owner_ids):
+        """
+        Invalidate the cached fragments of the given owners.
+
+        Args:
+            owner_ids (iterable): The primary keys of the owners whose lists changed.
+
+        """
+        for owner_id in owner_ids:
+            key = self._version_key(owner_id)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.set(key, time.time_ns(), None)
+
+    def get_key(self, owner_id, params):
+        """
+        Return the fragment key for a page of an owner's list.
+
+        Args:
+            owner_id (int): The primary key of the owner.
+            params (QueryDict): The query parameters that select the page.
+
+        Returns:
+            str: The cache key.
+        """
+        digest = hashlib.md5(params.urlencode().encode(), usedforsecurity=False).hexdigest()
+        return f'tasks:list:{owner_id}:{self.get_version(owner_id)}:{digest}'
+
+    def get(self, key):
+        """
+        Return a cached fragment, counting the hit or miss.
+
+        Args:
+            key (str): The fragment key.
+
+        Returns:
+            dict or None: The cached fragment, None on a miss.
+        """
+        value = self.cache.get(key)
+        self._increment(self.MISSES_KEY if value is None else self.HITS_KEY)
+        return value
+
+    def set(self, key, value):
+        """
+        Store a fragment.
+
+        Args:
+            key (str): The fragment key.
+            value (dict): The fragment to store.
+
+        """
+        self.cache.set(key, value, self.timeout)
+
+    def stats(self):
+        """
+        Return the hit and miss counters.
+
+        Returns:
+            dict: The number of hits and misses and the hit rate.
+        """
+        hits = self.cache.get(self.HITS_KEY, 0)
+        misses = self.cache.get(self.MISSES_KEY, 0)
+        lookups = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else None}
+
+
+task_list_cache = TaskListCache()
+
+
+def check_task_list_cache(app_configs, **kwargs):
+    """
+    Report a task list cache that is not shared between worker processes.
+
+    Registered by TasksConfig.ready() as a deployment check. With a per-process LocMemCache
+    a worker only sees the list versions bumped by its own requests and keeps serving stale
+    fragments of lists changed through another worker.
+
+    Returns:
+        list: A warning if the fragments are cached in a per-process LocMemCache.
+
+    """
+    if not isinstance(task_list_cache.cache, LocMemCache):
+        return []
+    return [
+        Warning(
+            f'The task list cache {task_list_cache.alias!r} is a LocMemCache, which is not shared '
+            'between processes.',
+            hint='Use a shared cache such as Redis or a FileBasedCache for TASK_LIST_CACHE when '
+                 'running several worker processes.',
+            id='tasks.W001',
+        )
+    ]
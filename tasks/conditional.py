@@ -0,0 +1,81 @@
+import hashlib
+
+from .cache import task_list_cache
+from .models import UNDO_SESSION_KEY, Task
+
+
+def _client_fingerprint(request):
+    """
+    Return a digest of the user and the CSRF secret the page was rendered for.
+
+    Pages contain a CSRF token, so a cached copy may only be reused by the same user with
+    the same CSRF cookie.
+
+    Args:
+        request (HttpRequest): The current HTTP request object.
+
+    Returns:
+        str: A short hexadecimal digest.
+    """
+    csrf_cookie = request.META.get('CSRF_COOKIE', '')
+    value = f'{request.user.pk}:{csrf_cookie}'.encode()
+    return hashlib.md5(value, usedforsecurity=False).hexdigest()[:16]
+
+
+def task_list_etag(request, *args, **kwargs):
+    """
+    Return the ETag of a page of the current user's task list.
+
+    The ETag is derived from the user's list version, which changes on every task write,
+    so it can be computed without querying the tasks table, and from the task the page
+    offers to restore, which is only offered once.
+
+    Args:
+        request (HttpRequest): The current HTTP request object.
+
+    Returns:
+        str: The ETag of the requested page.
+    """
+    version = task_list_cache.get_version(request.user.pk)
+    query = hashlib.md5(request.GET.urlencode().encode(), usedforsecurity=False).hexdigest()[:16]
+    undo = request.session.get(UNDO_SESSION_KEY, '')
+    return f'tasks-{version}-{undo}-{query}-{_client_fingerprint(request)}'
+
+
+def _task_updated_at(request, pk):
+    if not hasattr(request, '_task_updated_at'):
+        request._task_updated_at = (
+            Task.objects.filter(pk=pk, owner=request.user).values_list('updated_at', flat=True).first()
+        )
+    return request._task_updated_at
+
+
+def task_etag(request, pk, *args, **kwargs):
+    """
+    Return the ETag of a task's update page.
+
+    Args:
+        request (HttpRequest): The current HTTP request object.
+        pk (int): The primary key of the task.
+
+    Returns:
+        str or None: The ETag of the page, None if the task does not exist.
+    """
+    updated_at = _task_updated_at(request, pk)
+    if updated_at is None:
+        return None
+    return f'task-{pk}-{updated_at.timestamp()}-{_client_fingerprint(request)}'
+
+
+def task_last_modified(request, pk, *args, **kwargs):
+    """
+    Return the time a task was last changed.
+
+    Args:
+        request (HttpRequest): The current HTTP request object.
+        pk (int): The primary key of the task.
+
+    Returns:
+        datetime or None: The time of the last change, None if the task does not exist.
+    """
+    return _task_updated_at(request, pk)
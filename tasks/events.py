@@ -0,0 +1,235 @@
+"""
+In-process publish/subscribe hub for live task list updates.
+
+Committed task changes are published per owner (see the task_list_changed signal) and
+delivered to the Server-Sent Events streams the owner has open (see TaskEventStreamView).
+
+The hub does not talk to subscribers across processes by itself. Publishing goes through a
+broker: the default InProcessBroker hands the event straight back to the hub of the current
+process, which is enough for a single ASGI worker. Deployments running several workers plug in
+a broker that fans the events out to every process (e.g. over Redis pub/sub) and calls
+hub.deliver() in each of them when an event arrives.
+
+Every stream has a bounded queue. Publishers never wait for slow clients: when a queue is
+full, its pending events are dropped and replaced by a single 'resync' event, which tells the
+client to reload its list instead of replaying the changes it missed.
+"""
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Broker:
+    """
+    Interface of the transports that carry events to the hubs of every process.
+
+    Methods:
+        publish(owner_id, event): Sends an event to the hubs of every process.
+
+    """
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, owner_id, event):
+        """
+        Send an event to the hubs of every process.
+
+        Implementations must not block for long: events are published from the request that
+        committed the change.
+
+        Args:
+            owner_id (int): The owner whose task list changed.
+            event (dict): The event, serializable to JSON.
+
+        """
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    """
+    Broker delivering events to the hub of the current process only.
+    """
+
+    def publish(self, owner_id, event):
+        self.hub.deliver(owner_id, event)
+
+
+class Subscription:
+    """
+    The queue of events of one open stream.
+
+    The queue belongs to the event loop the stream runs on. Events are put on it with
+    loop.call_soon_threadsafe(), so that they can be published from any thread.
+
+    Attributes:
+        owner_id (int): The owner whose events are received.
+        queue (asyncio.Queue): The pending events, at most queue_size of them.
+
+    Methods:
+        put(event): Queues an event, from any thread.
+        get(timeout): Waits for the next event.
+
+    """
+    RESYNC = {'type': 'resync'}
+
+    def __init__(self, owner_id, queue_size):
+        self.owner_id = owner_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        """
+        Queue an event. Safe to call from any thread.
+
+        Args:
+            event (dict): The event to deliver.
+
+        """
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client cannot keep up. Everything it has not read yet is replaced by a
+            # single resync event, so the queue cannot grow and the publisher never waits.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.RESYNC)
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """
+        Wait for the next event.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+
+        Returns:
+            dict or None: The next event, None if none arrived within the timeout.
+
+        """
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is self.RESYNC:
+            self.overflowed = False
+        return event
+
+
+class TaskEventHub:
+    """
+    Registry of the open streams of this process.
+
+    Attributes:
+        queue_size (int): The maximum number of pending events per stream.
+        broker (Broker): The transport events are published through.
+
+    Methods:
+        subscribe(owner_id): Opens a subscription to an owner's events.
+        unsubscribe(subscription): Closes a subscription.
+        publish(owner_ids, action, task_ids=None): Publishes a change of the owners' task lists.
+        deliver(owner_id, event): Queues an event for the owner's local subscriptions.
+        stats(): Returns the number of open subscriptions.
+
+    """
+
+    def __init__(self, broker=None, queue_size=None):
+        options = getattr(settings, 'TASK_EVENTS', {})
+        self.queue_size = queue_size or options.get('QUEUE_SIZE', 100)
+        broker = broker or options.get('BROKER', 'tasks.events.InProcessBroker')
+        self.broker = import_string(broker)(self) if isinstance(broker, str) else broker
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, owner_id):
+        """
+        Open a subscription to an owner's events. Must be called from the stream's event loop.
+
+        Args:
+            owner_id (int): The owner whose events are received.
+
+        Returns:
+            Subscription: The new subscription.
+
+        """
+        subscription = Subscription(owner_id, self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(owner_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Close a subscription.
+
+        Args:
+            subscription (Subscription): The subscription returned by subscribe().
+
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.owner_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.owner_id, None)
+
+    def publish(self, owner_ids, action, task_ids=None):
+        """
+        Publish a change of the owners' task lists through the broker.
+
+        Args:
+            owner_ids (iterable): The owners whose task lists changed.
+            action (str): 'created', 'updated' or 'deleted'.
+            task_ids (dict): The primary keys of the changed tasks by owner, if known.
+
+        """
+        for owner_id in owner_ids:
+            if owner_id is None:
+                continue
+            event = {'id': next(self._ids), 'type': action}
+            if task_ids and owner_id in task_ids:
+                event['tasks'] = list(task_ids[owner_id])
+            self.broker.publish(owner_id, event)
+
+    def deliver(self, owner_id, event):
+        """
+        Queue an event for the subscriptions of the owner in this process.
+
+        Args:
+            owner_id (int): The owner whose task list changed.
+            event (dict): The event to deliver.
+
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(owner_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.put(event)
+            except RuntimeError:
+                # The stream's event loop has been closed without unsubscribing.
+                self.unsubscribe(subscription)
+
+    def stats(self):
+        """
+        Return the number of open subscriptions.
+
+        Returns:
+            dict: The number of subscribed owners and of open streams.
+
+        """
+        with self._lock:
+            return {
+                'owners': len(self._subscriptions),
+                'streams': sum(len(subscriptions) for subscriptions in self._subscriptions.values()),
+            }
+
+
+task_event_hub = TaskEventHub()
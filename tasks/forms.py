@@ -1,7 +1,15 @@
+import string
+
+from django import forms
+from django.db import connections
+from django.db.models.functions import Lower
 from django.forms import ModelForm, CheckboxInput
 
 from .models import Task
 
+# SQLite's LOWER() only folds ASCII letters; prefixes are folded the same way to match it.
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
 
 class TaskCreateForm(ModelForm):
     """Form for creating and updating a task.
@@ -77,3 +85,93 @@ class TaskUpdateForm(ModelForm):
             visible.field.widget.attrs['class'] = 'input__default'
             if isinstance(visible.field.widget, CheckboxInput):
                 visible.field.widget.attrs['class'] = 'form-check-input'
+
+
+class TaskFilterForm(forms.Form):
+    """
+    Form for filtering and sorting the task list.
+
+    The form is bound to the query string of the task list. Every combination of filter and
+    sort order is served by one of the indexes declared on Task.Meta. The title filter matches
+    a case-insensitive prefix, which can use the index on the lowercased title, unlike a
+    substring match. On SQLite only ASCII letters are matched case-insensitively, like
+    istartswith: 'Éc' finds 'Éclair' but 'éc' does not.
+
+    Attributes:
+        status (ChoiceField): Show only open or only completed tasks.
+        title (CharField): Show only tasks whose title starts with this text.
+        sort (ChoiceField): The order of the tasks.
+
+    Methods:
+        __init__(*args, **kwargs): Initializes the form and customizes field attributes.
+        get_filters(): Returns the valid filters, ignoring invalid values.
+        filter_queryset(queryset): Applies the filters and sort order to a queryset.
+
+    """
+    STATUS_CHOICES = (('', 'All'), ('open', 'Open'), ('done', 'Done'))
+    SORT_CHOICES = (('newest', 'Newest'), ('oldest', 'Oldest'), ('title', 'Title'))
+    ORDERINGS = {
+        'newest': ('-id',),
+        'oldest': ('id',),
+        'title': (Lower('title'), '-id'),
+    }
+
+    status = forms.ChoiceField(choices=STATUS_CHOICES, required=False)
+    title = forms.CharField(max_length=255, required=False)
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the form and customize field attributes.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Arbitrary keyword arguments.
+
+        """
+        super().__init__(*args, **kwargs)
+        self.fields['title'].widget.attrs['placeholder'] = 'Title starts with'
+        for visible in self.visible_fields():
+            visible.field.widget.attrs['class'] = 'input__default'
+
+    def get_filters(self):
+        """Return the valid filters, ignoring invalid values.
+
+        Returns:
+            dict: The 'status', 'title' and 'sort' values, with defaults for missing or invalid ones.
+
+        """
+        filters = {'status': '', 'title': '', 'sort': 'newest'}
+        if self.is_bound:
+            self.is_valid()
+            for name, value in self.cleaned_data.items():
+                if value:
+                    filters[name] = value.strip() if name == 'title' else value
+        return filters
+
+    def filter_queryset(self, queryset):
+        """Apply the filters and sort order to a queryset.
+
+        Args:
+            queryset (QuerySet): The tasks to filter.
+
+        Returns:
+            QuerySet: The filtered and ordered tasks.
+
+        """
+        filters = self.get_filters()
+        if filters['status']:
+            # status=True compiles to a bare boolean column on SQLite, which cannot be matched
+            # against the (owner, status, -id) index; an IN lookup compiles to an equality.
+            queryset = queryset.filter(status__in=[filters['status'] == 'done'])
+        if filters['title']:
+            prefix = filters['title']
+            # Folded like the database folds the column, so that exact-case matches are never lost.
+            if connections[queryset.db].vendor == 'sqlite':
+                prefix = prefix.translate(ASCII_LOWER)
+            else:
+                prefix = prefix.lower()
+            queryset = queryset.alias(title_lower=Lower('title')).filter(
+                title_lower__gte=prefix,
+                title_lower__lt=prefix + chr(0x10FFFF),
+            )
+        return queryset.order_by(*self.ORDERINGS[filters['sort']])
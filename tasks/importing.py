@@ -0,0 +1,279 @@
+"""
+Streaming import of tasks from CSV and JSON Lines files.
+
+The file is processed as a pipeline of generators (read rows, validate them, group them into
+chunks), so memory use does not depend on the size of the file. Valid rows are inserted with
+bulk_create, several chunks per transaction, and a checkpoint is written after every
+transaction so that an interrupted import can be resumed where it stopped.
+"""
+import csv
+import gzip
+import io
+import itertools
+import json
+import os
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+
+from .bulk import get_field_errors
+from .forms import TaskCreateForm, TaskUpdateForm
+from .models import Task
+
+FORMATS = ('csv', 'jsonl')
+CSV_STATUSES = {'': False, '0': False, 'false': False, '1': True, 'true': True}
+
+
+def get_format(path):
+    """
+    Return the format of a file from its name.
+
+    Args:
+        path (str): The path of the file, optionally ending in .gz.
+
+    Returns:
+        str or None: 'csv' or 'jsonl', None if the extension is not recognised.
+
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    extension = os.path.splitext(name)[1].lower()
+    return {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(extension)
+
+
+def open_text(path):
+    """
+    Open a file for reading as text, decompressing it if its name ends in .gz.
+
+    Args:
+        path (str): The path of the file, '-' for the standard input.
+
+    Returns:
+        file: The text file.
+
+    """
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def read_rows(file, format):
+    """
+    Yield the rows of a CSV or JSON Lines file.
+
+    CSV files must have a header row. CSV values are text, so a status of true/false or 1/0
+    (in any case) is converted to a boolean, and columns missing from a short row are left
+    out. Blank JSON Lines lines are skipped.
+
+    Args:
+        file (file): The text file.
+        format (str): 'csv' or 'jsonl'.
+
+    Yields:
+        tuple: The number of the row, counting from 1, and the row as a dictionary, or the
+               error message if the row could not be parsed.
+
+    """
+    if format == 'csv':
+        for number, row in enumerate(csv.DictReader(file), 1):
+            row = {name: value for name, value in row.items() if value is not None}
+            if isinstance(row.get('status'), str):
+                row['status'] = CSV_STATUSES.get(row['status'].strip().lower(), row['status'])
+            yield number, row
+        return
+    number = 0
+    for line in file:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, f'Invalid JSON: {error}'
+            continue
+        yield number, row if isinstance(row, dict) else 'Expected an object.'
+
+
+class TaskImporter:
+    """
+    Imports tasks from an iterable of rows.
+
+    Each row is a dictionary with a 'title' and an optional 'status'. The title must be a
+    string and the status a boolean, as in the bulk API (see tasks.bulk.get_field_errors),
+    since the form fields would coerce other types, e.g. a list title to its representation.
+    The title is then validated with the rules of TaskCreateForm and the status with those of
+    TaskUpdateForm, so the import accepts what the views accept; the form fields are used
+    directly, without building a form per row.
+
+    Every task needs an owner, so that it is visible to a user: either the owner given for all
+    rows, or, e.g. to restore an export of every user's tasks, the user whose email is in the
+    owner_column of the row. Rows naming no existing user are invalid.
+
+    Attributes:
+        owner (CustomUser): The owner of all imported tasks, or None to read it from the rows.
+        owner_column (str): The column holding the owner's email when no owner is given.
+        batch_size (int): The number of tasks per bulk_create.
+        transaction_size (int): The number of batches committed together.
+        checkpoint (str): The file recording the progress, or None.
+        on_error (callable): Called with the row number, the row and the errors of invalid rows.
+        on_progress (callable): Called with the counters and the rows per second after every transaction.
+
+    Methods:
+        load_checkpoint(): Returns the number of rows already processed.
+        get_owner_id(row): Returns the id of the owner of a row's task.
+        run(rows): Imports the rows and returns the counters.
+
+    """
+    title_field = TaskCreateForm.base_fields['title']
+    status_field = TaskUpdateForm.base_fields['status']
+
+    def __init__(self, owner, batch_size=1000, transaction_size=10, checkpoint=None,
+                 on_error=None, on_progress=None, owner_column=None):
+        if owner is None and not owner_column:
+            raise ValueError('Imported tasks need an owner or an owner column.')
+        if owner is not None and owner.pk is None:
+            raise ValueError('Imported tasks need a saved owner.')
+        self.owner = owner
+        self.owner_id = owner.pk if owner is not None else None
+        self.owner_column = owner_column
+        self._owner_ids = {}
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.checkpoint = checkpoint
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.using = router.db_for_write(Task)
+        self.counters = {'processed': 0, 'imported': 0, 'failed': 0}
+
+    def load_checkpoint(self):
+        """
+        Return the number of rows processed by a previous run, from the checkpoint file.
+
+        Returns:
+            int: The number of rows to skip, 0 without a checkpoint.
+
+        """
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint) as file:
+            self.counters.update(json.load(file))
+        return self.counters['processed']
+
+    def save_checkpoint(self):
+        if not self.checkpoint:
+            return
+        # Written to a temporary file and renamed, so a crash never leaves a truncated checkpoint.
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.counters, file)
+        os.replace(temporary, self.checkpoint)
+
+    def get_owner_id(self, row):
+        """
+        Return the id of the owner of a row's task.
+
+        The users named in the owner column are looked up once per email.
+
+        Args:
+            row (dict): The parsed row.
+
+        Returns:
+            int or None: The primary key of the owner, None if the row names no existing user.
+
+        """
+        if self.owner_id is not None:
+            return self.owner_id
+        email = row.get(self.owner_column)
+        if not isinstance(email, str) or not email:
+            return None
+        if email not in self._owner_ids:
+            self._owner_ids[email] = (
+                get_user_model().objects.filter(email=email).values_list('pk', flat=True).first()
+            )
+        return self._owner_ids[email]
+
+    def clean(self, row):
+        """
+        Validate a row.
+
+        Args:
+            row (dict or str): The parsed row, or the error message of an unparsable row.
+
+        Returns:
+            tuple: The Task to insert, None if the row is invalid, and the errors by field.
+
+        """
+        if isinstance(row, str):
+            return None, {'__all__': [row]}
+        values, errors = {}, get_field_errors(row)
+        for name, field in (('title', self.title_field), ('status', self.status_field)):
+            if name in errors:
+                continue
+            try:
+                values[name] = field.clean(row.get(name))
+            except ValidationError as error:
+                errors[name] = error.messages
+        owner_id = self.get_owner_id(row)
+        if owner_id is None:
+            errors[self.owner_column] = ['Expected the email of a user.']
+        if errors:
+            return None, errors
+        # Assigned by id: the related object descriptor is comparatively slow for millions of rows.
+        return Task(owner_id=owner_id, **values), None
+
+    def validate(self, rows):
+        """
+        Yield the tasks of the valid rows and report the invalid ones.
+
+        Args:
+            rows (iterable): (row number, row) pairs.
+
+        Yields:
+            tuple: The row number and the Task, or None for an invalid row.
+
+        """
+        for number, row in rows:
+            task, errors = self.clean(row)
+            if errors:
+                self.counters['failed'] += 1
+                if self.on_error is not None:
+                    self.on_error(number, row, errors)
+            yield number, task
+
+    def run(self, rows):
+        """
+        Import the rows, skipping those processed before the checkpoint.
+
+        The checkpoint is written right after each commit; if the process dies in between,
+        the rows of that last transaction are imported again on resume.
+
+        Args:
+            rows (iterable): (row number, row) pairs, e.g. from read_rows().
+
+        Returns:
+            dict: The number of processed, imported and failed rows, including previous runs.
+
+        """
+        skip = self.load_checkpoint()
+        pipeline = self.validate(itertools.islice(rows, skip, None))
+        rows_per_transaction = self.batch_size * self.transaction_size
+        started = time.monotonic()
+        while True:
+            chunk = list(itertools.islice(pipeline, rows_per_transaction))
+            if not chunk:
+                break
+            tasks = [task for _, task in chunk if task is not None]
+            with transaction.atomic(using=self.using):
+                for start in range(0, len(tasks), self.batch_size):
+                    Task.objects.using(self.using).bulk_create(tasks[start:start + self.batch_size])
+            self.counters['processed'] += len(chunk)
+            self.counters['imported'] += len(tasks)
+            self.save_checkpoint()
+            if self.on_progress is not None:
+                rate = (self.counters['processed'] - skip) / max(time.monotonic() - started, 1e-9)
+                self.on_progress(dict(self.counters), rate)
+        return self.counters
@@ -0,0 +1,123 @@
+"""
+Background jobs of the tasks app, run by the run_jobs command (see jobs.registry).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from jobs.registry import job
+
+from .exporting import export_rows, gzip_stream
+from .forms import TaskFilterForm
+from .importing import TaskImporter, open_text, read_rows
+from .models import Task, TaskCounter
+
+
+@job('tasks.rebuild_counters')
+def rebuild_counters():
+    """
+    Recompute every task counter from the task table.
+    """
+    TaskCounter.objects.rebuild()
+
+
+@job('tasks.purge_deleted')
+def purge_deleted(older_than=None):
+    """
+    Purge the tasks deleted before the undo window, in batches.
+
+    Args:
+        older_than (int): Only purge tasks deleted at least this many seconds ago. Defaults to
+                          the undo window.
+
+    Returns:
+        int: The number of purged tasks.
+
+    """
+    options = settings.TASK_DELETION
+    if older_than is None:
+        older_than = options['UNDO_WINDOW']
+    return Task.all_objects.purge_deleted(
+        timezone.now() - timedelta(seconds=older_than),
+        batch_size=options['PURGE_BATCH_SIZE'],
+        pause=options['PURGE_PAUSE'],
+    )
+
+
+@job('tasks.archive')
+def archive(older_than=None):
+    """
+    Move the tasks completed before the archive threshold to the archive, in batches.
+
+    Args:
+        older_than (int): Only archive tasks unchanged for at least this many days. Defaults
+                          to settings.TASK_ARCHIVE['AFTER_DAYS'].
+
+    Returns:
+        int: The number of archived tasks.
+
+    """
+    options = settings.TASK_ARCHIVE
+    if older_than is None:
+        older_than = options['AFTER_DAYS']
+    return Task.objects.archive(
+        timezone.now() - timedelta(days=older_than),
+        batch_size=options['BATCH_SIZE'],
+        pause=options['PAUSE'],
+    )
+
+
+@job('tasks.import')
+def import_tasks(path, format, owner_id=None, checkpoint=None):
+    """
+    Import tasks from a CSV or JSON Lines file.
+
+    A checkpoint is always kept, next to the file unless given, so a retried attempt resumes
+    after the last committed transaction instead of importing the rows again.
+
+    Args:
+        path (str): The path of the file, optionally gzip-compressed.
+        format (str): 'csv' or 'jsonl'.
+        owner_id (int): The id of the owner of the imported tasks, None to assign each task to
+                        the user whose email is in the 'owner' column.
+        checkpoint (str): The path of the checkpoint file.
+
+    Returns:
+        dict: The number of processed, imported and failed rows.
+
+    """
+    owner = get_user_model().objects.get(pk=owner_id) if owner_id is not None else None
+    importer = TaskImporter(owner=owner, owner_column='owner', checkpoint=checkpoint or f'{path}.checkpoint')
+    with open_text(path) as file:
+        return importer.run(read_rows(file, format))
+
+
+@job('tasks.export')
+def export_tasks(path, format, owner_id=None, compress=False, filters=None):
+    """
+    Export tasks to a CSV or JSON Lines file.
+
+    Args:
+        path (str): The path of the file to write.
+        format (str): 'csv' or 'jsonl'.
+        owner_id (int): Only export the tasks of this user.
+        compress (bool): Whether to gzip-compress the file.
+        filters (dict): The 'status' and 'title' filters of TaskFilterForm.
+
+    Returns:
+        str: The path of the file.
+
+    """
+    queryset = Task.objects.all()
+    if owner_id is not None:
+        queryset = queryset.filter(owner_id=owner_id)
+    form = TaskFilterForm({'status': '', 'title': '', **(filters or {}), 'sort': 'oldest'})
+    queryset = form.filter_queryset(queryset)
+    chunks = export_rows(queryset, format)
+    chunks = gzip_stream(chunks) if compress else (chunk.encode() for chunk in chunks)
+    with open(path, 'wb') as file:
+        for chunk in chunks:
+            file.write(chunk)
+    return path
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Management command that moves completed tasks to the archive.
+
+    Tasks that are done and have not changed for --older-than days are moved from the tasks
+    table to the ArchivedTask table, --batch-size tasks per transaction with a pause of
+    --pause seconds in between, so that concurrent writers are not locked out. It is meant
+    to run periodically, from cron or as the tasks.archive job.
+
+    Example Usage:
+        python manage.py archive_tasks --older-than 30
+
+    """
+    help = 'Move the tasks completed before a threshold to the archive, in batches.'
+
+    def add_arguments(self, parser):
+        options = settings.TASK_ARCHIVE
+        parser.add_argument('--older-than', type=int, default=options['AFTER_DAYS'],
+                            help='Only archive tasks unchanged for at least this many days.')
+        parser.add_argument('--batch-size', type=int, default=options['BATCH_SIZE'],
+                            help='The number of tasks moved per transaction.')
+        parser.add_argument('--pause', type=float, default=options['PAUSE'],
+                            help='The seconds to wait between two transactions.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        before = timezone.now() - timedelta(days=options['older_than'])
+        archived = Task.objects.archive(
+            before,
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            on_batch=lambda archived: self.stderr.write(f'{archived} tasks archived'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} tasks.'))
@@ -0,0 +1,215 @@
+import json
+import platform
+import sqlite3
+import statistics
+import time
+
+import django
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.benchmarking import (
+    BENCHMARK_PASSWORD,
+    compare,
+    isolated_database,
+    seed_tasks,
+    seed_users,
+    summarize,
+)
+from tasks.cache import task_list_cache
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Management command that benchmarks the task and sign-in hot paths.
+
+    A throwaway SQLite test database is seeded with --users users owning --tasks-per-user
+    tasks each; the first user, the one the benchmarks act as, owns --tasks tasks. Every
+    scenario is then run --iterations times after --warmup untimed runs, measuring the
+    latency and the number of queries of each run:
+
+        list_shallow          The first page of the task list, fragment cache invalidated.
+        list_shallow_cached   The first page of the task list, served from the fragment cache.
+        list_deep             The last page of the task list by page number.
+        list_deep_keyset      A page near the end of the task list by cursor.
+        search                A full-text search of the tasks.
+        create                Creating a task through the task list form.
+        update                Updating a task through the update form.
+        delete                Deleting a task.
+        toggle                Toggling the status of a page of tasks.
+        login                 Authenticating with CustomUserBackend, password hashing included.
+
+    The results can be written to a JSON file with --output and checked against a previous
+    results file with --baseline; the command fails if a scenario's p50 or p95 latency grew
+    by more than --threshold or if it runs more queries than in the baseline.
+
+    Example Usage:
+        python manage.py benchmark --output baseline.json
+        python manage.py benchmark --baseline baseline.json --threshold 0.25
+
+    """
+    help = 'Benchmark the task and sign-in hot paths against a seeded test database.'
+
+    scenarios = (
+        'list_shallow',
+        'list_shallow_cached',
+        'list_deep',
+        'list_deep_keyset',
+        'search',
+        'create',
+        'update',
+        'delete',
+        'toggle',
+        'login',
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='The number of users to seed.')
+        parser.add_argument('--tasks', type=int, default=5000, help='The number of tasks of the benchmark user.')
+        parser.add_argument('--tasks-per-user', type=int, default=50, help='The number of tasks of the other users.')
+        parser.add_argument('--iterations', type=int, default=50, help='The number of timed runs per scenario.')
+        parser.add_argument('--warmup', type=int, default=3, help='The number of untimed runs per scenario.')
+        parser.add_argument('--scenario', action='append', choices=self.scenarios, help='Only run these scenarios.')
+        parser.add_argument('--seed', type=int, default=0, help='The seed of the generated data.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', help='Compare the results with this results file.')
+        parser.add_argument('--threshold', type=float, default=0.2, help='The allowed relative slowdown.')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('At least one user is needed.')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)['scenarios']
+
+        with isolated_database():
+            self.seed(options)
+            results = {
+                name: self.measure(getattr(self, f'bench_{name}'), options)
+                for name in options['scenario'] or self.scenarios
+            }
+
+        report = {'meta': self.get_meta(options), 'scenarios': results}
+        for name, summary in results.items():
+            self.stdout.write(
+                f"{name:<20} p50 {summary['p50_ms']:>9} ms  p95 {summary['p95_ms']:>9} ms  "
+                f"queries {summary['queries']}"
+            )
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError('Performance regressions:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+    def get_meta(self, options):
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            **{name: options[name] for name in ('users', 'tasks', 'tasks_per_user', 'iterations', 'seed')},
+        }
+
+    def seed(self, options):
+        """Create the users and tasks and sign the benchmark client in."""
+        users = seed_users(options['users'])
+        self.user, others = users[0], users[1:]
+        seed_tasks([self.user], options['tasks'], seed=options['seed'])
+        seed_tasks(others, options['tasks_per_user'], seed=options['seed'] + 1)
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.factory = RequestFactory()
+
+    def measure(self, scenario, options):
+        """Run a scenario and summarize its runs.
+
+        Args:
+            scenario (callable): Prepares one run and returns the function to time.
+            options (dict): The command options.
+
+        Returns:
+            dict: The summary of tasks.benchmarking.summarize() plus the median number of queries.
+
+        """
+        latencies, queries = [], []
+        for iteration in range(options['warmup'] + options['iterations']):
+            run = scenario(iteration)
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+            if iteration >= options['warmup']:
+                latencies.append(elapsed)
+                queries.append(len(context.captured_queries))
+        return {**summarize(latencies), 'queries': statistics.median_low(queries)}
+
+    def get(self, url, data=None):
+        def run():
+            response = self.client.get(url, data)
+            if response.status_code != 200:
+                raise CommandError(f'GET {url} responded with {response.status_code}.')
+        return run
+
+    def post(self, url, data=None, **extra):
+        def run():
+            response = self.client.post(url, data, **extra)
+            if response.status_code not in (200, 302):
+                raise CommandError(f'POST {url} responded with {response.status_code}.')
+        return run
+
+    def owned_tasks(self):
+        return Task.objects.filter(owner=self.user)
+
+    def bench_list_shallow(self, iteration):
+        task_list_cache.bump([self.user.pk])
+        return self.get(reverse('tasks'))
+
+    def bench_list_shallow_cached(self, iteration):
+        return self.get(reverse('tasks'))
+
+    def bench_list_deep(self, iteration):
+        task_list_cache.bump([self.user.pk])
+        return self.get(reverse('tasks'), {'page': 'last'})
+
+    def bench_list_deep_keyset(self, iteration):
+        task_list_cache.bump([self.user.pk])
+        cursor = self.owned_tasks().order_by('pk').values_list('pk', flat=True)[10]
+        return self.get(reverse('tasks'), {'after': cursor})
+
+    def bench_search(self, iteration):
+        return self.get(reverse('search_tasks'), {'q': 'review'})
+
+    def bench_create(self, iteration):
+        return self.post(reverse('tasks'), {'title': f'Benchmark task {iteration}'})
+
+    def bench_update(self, iteration):
+        task = self.owned_tasks().order_by('-pk').first()
+        return self.post(reverse('update_task', args=[task.pk]), {'title': f'Updated {iteration}', 'status': 'on'})
+
+    def bench_delete(self, iteration):
+        task = Task.objects.create(owner=self.user, title='To delete')
+        return self.post(reverse('delete_task', args=[task.pk]))
+
+    def bench_toggle(self, iteration):
+        ids = list(self.owned_tasks().order_by('-pk').values_list('pk', flat=True)[:5])
+        return self.post(reverse('toggle_tasks'), json.dumps({'ids': ids}), content_type='application/json')
+
+    def bench_login(self, iteration):
+        request = self.factory.post(reverse('login'))
+
+        def run():
+            if authenticate(request, username=self.user.email, password=BENCHMARK_PASSWORD) is None:
+                raise CommandError('The benchmark user could not sign in.')
+        return run
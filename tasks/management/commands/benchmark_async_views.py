@@ -0,0 +1,98 @@
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+from django.urls import reverse
+
+from tasks.benchmarking import isolated_database, seed_tasks, seed_users, summarize
+from tasks.cache import task_list_cache
+
+
+class Command(BaseCommand):
+    """
+    Management command that compares the synchronous and the async task list under load.
+
+    A throwaway test database is seeded with one user owning --tasks tasks. The same number of
+    GET requests is then sent to the synchronous list (/tasks/) and to the async list
+    (/async/tasks/) through Django's ASGI handler, with --concurrency requests in flight at
+    any time, and the throughput and latency percentiles of both runs are reported.
+
+    The synchronous list serves repeated requests from the task list fragment cache. With
+    --cold the user's fragments are invalidated before every request, so both views hit
+    the database on every request.
+
+    Example Usage:
+        python manage.py benchmark_async_views --tasks 5000 --requests 500 --concurrency 50
+
+    """
+    help = 'Compare the throughput and latency of the sync and async task list views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1000, help='The number of tasks to seed.')
+        parser.add_argument('--requests', type=int, default=200, help='The number of requests per view.')
+        parser.add_argument('--concurrency', type=int, default=20, help='The number of requests in flight.')
+        parser.add_argument('--cold', action='store_true', help='Invalidate the fragment cache before every request.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            user = self.seed(options['tasks'])
+            results = asyncio.run(self.run_all(user, options))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, summary in results.items():
+            self.stdout.write(
+                f"{name:>5}: {summary['requests_per_second']:>8} req/s  "
+                f"p50 {summary['p50_ms']} ms  p95 {summary['p95_ms']} ms  p99 {summary['p99_ms']} ms"
+            )
+
+    def seed(self, count):
+        """Create the benchmark user and its tasks.
+
+        Args:
+            count (int): The number of tasks to create.
+
+        Returns:
+            CustomUser: The owner of the tasks.
+
+        """
+        user = seed_users(1)[0]
+        seed_tasks([user], count)
+        return user
+
+    async def run_all(self, user, options):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(user)
+        results = {}
+        for name, url in (('sync', reverse('tasks')), ('async', reverse('async_tasks'))):
+            results[name] = await self.run(client, url, user, options)
+        return results
+
+    async def run(self, client, url, user, options):
+        """Send the requests to one view and summarize the latencies.
+
+        Returns:
+            dict: The summary produced by tasks.benchmarking.summarize().
+
+        """
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        latencies = []
+
+        async def request(number):
+            async with semaphore:
+                if options['cold']:
+                    await sync_to_async(task_list_cache.bump)([user.pk])
+                started = time.perf_counter()
+                response = await client.get(url, {'page': number % 10 + 1})
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise RuntimeError(f'{url} responded with {response.status_code}.')
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request(number) for number in range(options['requests'])))
+        return summarize(latencies, time.perf_counter() - started)
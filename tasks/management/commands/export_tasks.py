@@ -0,0 +1,66 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.exporting import FORMATS, export_rows, gzip_stream
+from tasks.forms import TaskFilterForm
+from tasks.importing import get_format
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Management command that exports tasks as CSV or JSON Lines.
+
+    The tasks are streamed to the file while they are read, so exports of any size use
+    constant memory. Files whose name ends in .gz are gzip-compressed. The export can be
+    restricted to one owner and filtered like the task list. Every row names its owner by
+    email, so import_tasks can restore a full export without --owner.
+
+    Example Usage:
+        python manage.py export_tasks backup.jsonl.gz
+        python manage.py export_tasks - --format csv --owner user@example.com --status open
+
+    """
+    help = 'Export tasks as CSV or JSON Lines (optionally gzipped, - for stdout).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The file to write, - for the standard output.')
+        parser.add_argument('--format', choices=FORMATS, help='The file format, by default from the extension.')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output, implied by a .gz extension.')
+        parser.add_argument('--owner', help='Only export the tasks of the user with this email.')
+        parser.add_argument('--status', choices=('open', 'done'), help='Only export open or completed tasks.')
+        parser.add_argument('--title', help='Only export tasks whose title starts with this text.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='The number of tasks read at a time.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        export_format = options['format'] or (get_format(path) if path != '-' else 'jsonl')
+        if export_format is None:
+            raise CommandError('Cannot tell the format from the file name, use --format.')
+
+        queryset = Task.objects.all()
+        if options['owner']:
+            try:
+                queryset = queryset.filter(owner=get_user_model().objects.get(email=options['owner']))
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with the email {options['owner']}.")
+        filters = {'status': options['status'] or '', 'title': options['title'] or '', 'sort': 'oldest'}
+        queryset = TaskFilterForm(filters).filter_queryset(queryset)
+
+        chunks = export_rows(queryset, export_format, options['chunk_size'])
+        if options['gzip'] or path.endswith('.gz'):
+            chunks = gzip_stream(chunks)
+        else:
+            chunks = (chunk.encode() for chunk in chunks)
+
+        output = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f'Exported tasks to {path}.'))
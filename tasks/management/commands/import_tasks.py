@@ -0,0 +1,88 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importing import FORMATS, TaskImporter, get_format, open_text, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Management command that imports tasks from a CSV or JSON Lines file.
+
+    Every row needs a 'title' and may have a 'status' (true/false, 1/0). The tasks belong to
+    the user given with --owner, or else to the user whose email is in the 'owner' column of
+    each row, as written by export_tasks. The file is streamed,
+    so files of any size are imported in constant memory. Valid rows are inserted in batches
+    of --batch-size, --transaction-size batches per transaction; invalid rows are skipped
+    and, with --errors, written to a JSON Lines file with their errors.
+
+    With --checkpoint the progress is recorded after every transaction; running the command
+    again with the same checkpoint file resumes after the last committed row.
+
+    Example Usage:
+        python manage.py import_tasks tasks.csv.gz --owner user@example.com --checkpoint import.json
+
+    """
+    help = 'Import tasks from a CSV or JSON Lines file (optionally gzipped, - for stdin).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='The file to import, - for the standard input.')
+        parser.add_argument('--format', choices=FORMATS, help='The file format, by default from the extension.')
+        parser.add_argument(
+            '--owner',
+            help="The email of the user the tasks are imported for, by default each row's 'owner' column.",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='The number of tasks per INSERT.')
+        parser.add_argument('--transaction-size', type=int, default=10, help='The number of batches per transaction.')
+        parser.add_argument('--checkpoint', help='Record the progress in this file and resume from it.')
+        parser.add_argument('--errors', help='Write the invalid rows to this JSON Lines file.')
+
+    def handle(self, *args, **options):
+        format = options['format'] or get_format(options['path'])
+        if format is None:
+            raise CommandError('Cannot tell the format from the file name, use --format.')
+        if options['batch_size'] < 1 or options['transaction_size'] < 1:
+            raise CommandError('--batch-size and --transaction-size must be positive.')
+
+        owner = None
+        if options['owner']:
+            try:
+                owner = get_user_model().objects.get(email=options['owner'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with the email {options['owner']}.")
+
+        errors_file = open(options['errors'], 'a') if options['errors'] else None
+
+        def on_error(number, row, errors):
+            if errors_file is not None:
+                data = row if isinstance(row, dict) else None
+                errors_file.write(json.dumps({'row': number, 'data': data, 'errors': errors}) + '\n')
+
+        def on_progress(counters, rate):
+            self.stderr.write(
+                f"{counters['processed']} rows processed, {counters['imported']} imported, "
+                f"{counters['failed']} failed ({rate:.0f} rows/s)"
+            )
+
+        importer = TaskImporter(
+            owner=owner,
+            owner_column='owner',
+            batch_size=options['batch_size'],
+            transaction_size=options['transaction_size'],
+            checkpoint=options['checkpoint'],
+            on_error=on_error,
+            on_progress=on_progress,
+        )
+        try:
+            with open_text(options['path']) as file:
+                counters = importer.run(read_rows(file, format))
+        except (OSError, UnicodeDecodeError) as error:
+            raise CommandError(f'Cannot read {options["path"]}: {error}')
+        finally:
+            if errors_file is not None:
+                errors_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {counters['imported']} tasks, {counters['failed']} rows failed."
+        ))
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Management command that removes deleted tasks from the database.
+
+    Deleting a task only marks it as deleted. This command deletes the rows of the tasks
+    deleted more than --older-than seconds ago, by default the undo window, --batch-size rows
+    per transaction with a pause of --pause seconds in between, so that concurrent writers are
+    not locked out while many tasks are purged. It can run from cron or be enqueued as the
+    tasks.purge_deleted job.
+
+    Example Usage:
+        python manage.py purge_deleted_tasks --batch-size 1000 --pause 0.05
+
+    """
+    help = 'Purge the tasks deleted before the undo window, in batches.'
+
+    def add_arguments(self, parser):
+        options = settings.TASK_DELETION
+        parser.add_argument('--older-than', type=int, default=options['UNDO_WINDOW'],
+                            help='Only purge tasks deleted at least this many seconds ago.')
+        parser.add_argument('--batch-size', type=int, default=options['PURGE_BATCH_SIZE'],
+                            help='The number of tasks deleted per transaction.')
+        parser.add_argument('--pause', type=float, default=options['PURGE_PAUSE'],
+                            help='The seconds to wait between two transactions.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+        before = timezone.now() - timedelta(seconds=options['older_than'])
+        purged = Task.all_objects.purge_deleted(
+            before,
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            on_batch=lambda purged: self.stderr.write(f'{purged} tasks purged'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} deleted tasks.'))
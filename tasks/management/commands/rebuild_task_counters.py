@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import TaskCounter
+
+
+class Command(BaseCommand):
+    """
+    Management command that rebuilds the task counters from scratch.
+
+    The counters are maintained incrementally on every task write. This command recomputes them
+    from the tasks table, e.g. after rows were changed by raw SQL or restored from a backup.
+
+    Example Usage:
+        python manage.py rebuild_task_counters
+
+    """
+    help = 'Rebuild the task counters from the tasks table.'
+
+    def handle(self, *args, **options):
+        counts = TaskCounter.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt task counters: {counts['total']} total, {counts['done']} done."
+        ))
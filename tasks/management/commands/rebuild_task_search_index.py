@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from tasks.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Management command that recreates the task search index and refills it from the tasks table.
+
+    Run it after restoring a backup or after a migration that rebuilt the tasks table, which
+    on SQLite drops the triggers that keep the index in sync.
+
+    Example Usage:
+        python manage.py rebuild_task_search_index
+
+    """
+    help = 'Recreate the task search index and refill it from the tasks table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='The database to rebuild the index in.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        backend = get_search_backend(connection)
+        backend.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the task search index with {type(backend).__name__}.'))
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 01:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, unique=True)),
+                ('total', models.PositiveBigIntegerField(default=0)),
+                ('done', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 01:18
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_owner_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'status', '-id'], name='task_owner_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(models.F('owner'), django.db.models.functions.text.Lower('title'), models.OrderBy(models.F('id'), descending=True), name='task_owner_title_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 14:20
+
+from django.db import migrations
+
+# The SQL is inlined rather than imported from tasks.search, so that the migration keeps
+# creating the same schema whatever later happens to the search backend.
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+# The index gains an owner_id column, so that searches match the owner's tasks only.
+OWNER_SQL = DROP_SQL + [
+    "CREATE VIRTUAL TABLE tasks_task_fts USING fts5("
+    "owner_id, title, content='tasks_task', content_rowid='id', prefix='2 3')",
+    'CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN '
+    'INSERT INTO tasks_task_fts(rowid, owner_id, title) VALUES (new.id, new.owner_id, new.title); END',
+    'CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN '
+    'INSERT INTO tasks_task_fts(tasks_task_fts, rowid, owner_id, title) '
+    "VALUES ('delete', old.id, old.owner_id, old.title); END",
+    'CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF owner_id, title ON tasks_task BEGIN '
+    'INSERT INTO tasks_task_fts(tasks_task_fts, rowid, owner_id, title) '
+    "VALUES ('delete', old.id, old.owner_id, old.title); "
+    'INSERT INTO tasks_task_fts(rowid, owner_id, title) VALUES (new.id, new.owner_id, new.title); END',
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+# The title-only index created by 0005_task_search_index.
+TITLE_SQL = DROP_SQL + [
+    "CREATE VIRTUAL TABLE tasks_task_fts USING fts5("
+    "title, content='tasks_task', content_rowid='id', prefix='2 3')",
+    'CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN '
+    'INSERT INTO tasks_task_fts(rowid, title) VALUES (new.id, new.title); END',
+    'CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN '
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    'CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title ON tasks_task BEGIN '
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    'INSERT INTO tasks_task_fts(rowid, title) VALUES (new.id, new.title); END',
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+
+class RunSQLiteSQL(migrations.RunSQL):
+    """RunSQL operation that is skipped on databases other than SQLite, which have no FTS5."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'sqlite':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_archivedtask'),
+    ]
+
+    operations = [
+        RunSQLiteSQL(OWNER_SQL, TITLE_SQL),
+    ]
@@ -1,17 +1,623 @@
-from django.db import models
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .signals import task_list_changed
+
+# The condition of the partial indexes over the tasks that have not been deleted.
+LIVE = Q(deleted_at__isnull=True)
+
+# The session key holding the id of the task just deleted, which the task list offers to restore.
+UNDO_SESSION_KEY = 'undo_task_id'
+
+
+def count_by_owner(queryset):
+    """
+    Count the tasks of a queryset per owner.
+
+    Args:
+        queryset (QuerySet): The tasks to count.
+
+    Returns:
+        dict: A mapping of owner id to a (total, done) tuple.
+    """
+    rows = (
+        queryset.order_by()
+        .values('owner_id')
+        .annotate(total=Count('pk'), done=Count('pk', filter=Q(status=True)))
+        .values_list('owner_id', 'total', 'done')
+    )
+    return {owner_id: (total, done) for owner_id, total, done in rows}
+
+
+def notify_task_list_changed(owner_ids, using=None, action='updated', task_ids=None):
+    """
+    Send task_list_changed for the given owners once the current transaction commits.
+
+    Args:
+        owner_ids (iterable): The owners whose task lists changed.
+        using (str): The alias of the database the change was written to.
+        action (str): 'created', 'updated' or 'deleted'.
+        task_ids (dict): The primary keys of the changed tasks by owner, if known.
+
+    """
+    owner_ids = set(owner_ids)
+    if owner_ids:
+        transaction.on_commit(
+            lambda: task_list_changed.send(sender=Task, owner_ids=owner_ids, action=action, task_ids=task_ids),
+            using=using,
+        )
+
+
+def group_by_owner(objs):
+    """
+    Return the primary keys of the given tasks grouped by owner.
+
+    Args:
+        objs (iterable): The tasks.
+
+    Returns:
+        dict: The list of primary keys of every owner's tasks, or None if a task has no primary key.
+
+    """
+    task_ids = {}
+    for obj in objs:
+        if obj.pk is None:
+            return None
+        task_ids.setdefault(obj.owner_id, []).append(obj.pk)
+    return task_ids
+
+
+class TaskCounterQuerySet(models.QuerySet):
+    """
+    QuerySet with helpers for reading and maintaining task counters.
+
+    Every task is counted twice: in the global scope and in the scope of its owner.
+
+    Methods:
+        get_counts(owner): Returns the total, done and open task counts of an owner.
+        aget_counts(owner): Asynchronous version of get_counts().
+        apply_delta(owner_id, total, done): Adjusts the stored counts of an owner.
+        rebuild(): Recomputes every counter from the tasks table.
+
+    """
+
+    def get_counts(self, owner=None):
+        """
+        Return the task counts of an owner, initialising the counter if it does not exist yet.
+
+        Args:
+            owner (CustomUser): The owner whose tasks are counted. Defaults to all tasks.
+
+        Returns:
+            dict: A dictionary with 'total', 'done' and 'open' keys.
+        """
+        owner_id = owner.pk if owner is not None else None
+        scope = TaskCounter.get_scope(owner_id)
+        counter = self.filter(scope=scope).first()
+        if counter is None:
+            # Initialised from the database the counter is written to, which a read replica may lag behind.
+            using = router.db_for_write(TaskCounter)
+            tasks = Task.objects.using(using).all()
+            if owner_id is not None:
+                tasks = tasks.filter(owner_id=owner_id)
+            counts = tasks.aggregate(total=Count('pk'), done=Count('pk', filter=Q(status=True)))
+            counter, _ = self.using(using).get_or_create(scope=scope, defaults=counts)
+        return {'total': counter.total, 'done': counter.done, 'open': counter.total - counter.done}
+
+    async def aget_counts(self, owner=None):
+        """
+        Asynchronous version of get_counts().
+
+        Args:
+            owner (CustomUser): The owner whose tasks are counted. Defaults to all tasks.
+
+        Returns:
+            dict: A dictionary with 'total', 'done' and 'open' keys.
+        """
+        owner_id = owner.pk if owner is not None else None
+        counter = await self.filter(scope=TaskCounter.get_scope(owner_id)).afirst()
+        if counter is None:
+            return await sync_to_async(self.get_counts)(owner)
+        return {'total': counter.total, 'done': counter.done, 'open': counter.total - counter.done}
+
+    def apply_delta(self, owner_id=None, total=0, done=0):
+        """
+        Adjust the global counts and the counts of an owner in a single UPDATE statement.
+
+        Counters that have not been initialised yet are left alone; they are computed from
+        the tasks table, including this change, the first time they are read.
+
+        Args:
+            owner_id (int): The owner of the changed tasks.
+            total (int): The change in the number of tasks.
+            done (int): The change in the number of completed tasks.
+
+        """
+        if total or done:
+            scopes = {TaskCounter.GLOBAL_SCOPE, TaskCounter.get_scope(owner_id)}
+            self.filter(scope__in=scopes).update(
+                total=F('total') + total,
+                done=F('done') + done,
+            )
+
+    def rebuild(self):
+        """
+        Recompute every counter from the tasks table.
+
+        Returns:
+            dict: The rebuilt counts of the global scope.
+        """
+        self._for_write = True
+        per_owner = count_by_owner(Task.objects.using(self.db))
+        counts = {
+            'total': sum(total for total, _ in per_owner.values()),
+            'done': sum(done for _, done in per_owner.values()),
+        }
+        counters = [TaskCounter(scope=TaskCounter.GLOBAL_SCOPE, **counts)]
+        counters += [
+            TaskCounter(scope=TaskCounter.get_scope(owner_id), total=total, done=done)
+            for owner_id, (total, done) in per_owner.items()
+            if owner_id is not None
+        ]
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            self.bulk_create(counters)
+        return counts
+
+
+class TaskCounter(models.Model):
+    """
+    Model holding pre-computed task counts.
+
+    The counts are kept in sync by Task and TaskQuerySet on every create, update and delete,
+    so showing them costs one primary key lookup instead of a scan of the tasks table.
+
+    Attributes:
+        scope (CharField): The name of the set of tasks that is counted.
+        total (PositiveBigIntegerField): The number of tasks in the scope.
+        done (PositiveBigIntegerField): The number of completed tasks in the scope.
+
+    Methods:
+        get_scope(owner_id): Returns the scope name of an owner's tasks.
+
+    """
+    GLOBAL_SCOPE = 'all'
+
+    scope = models.CharField(max_length=64, unique=True)
+    total = models.PositiveBigIntegerField(default=0)
+    done = models.PositiveBigIntegerField(default=0)
+
+    objects = TaskCounterQuerySet.as_manager()
+
+    @classmethod
+    def get_scope(cls, owner_id):
+        """
+        Return the scope name of an owner's tasks.
+
+        Args:
+            owner_id (int): The primary key of the owner, None for all tasks.
+
+        Returns:
+            str: The scope name.
+        """
+        return cls.GLOBAL_SCOPE if owner_id is None else f'owner:{owner_id}'
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet for the Task model that keeps the task counters in sync on bulk writes and
+    announces every change with the task_list_changed signal.
+
+    Like Django's own write methods, the overrides mark the queryset for writing first, so that
+    the rows they read to compute the counter changes come from the database being written to
+    rather than from a read replica.
+
+    Deleting tasks only marks them as deleted (see Task), so that the deletion is a cheap
+    UPDATE and can be undone; purge() removes the rows for good.
+
+    Attributes:
+        update_batch_size (int): The number of tasks per UPDATE when the status changes.
+
+    Methods:
+        bulk_create(objs, *args, **kwargs): Creates tasks and counts them.
+        bulk_update(objs, fields, *args, **kwargs): Updates tasks, stamps and recounts them.
+        update(**kwargs): Updates tasks, stamps and recounts them.
+        delete(): Marks tasks as deleted and removes them from the counts.
+        deleted(): Returns the tasks marked as deleted.
+        restore(): Unmarks deleted tasks and counts them again.
+        purge(): Deletes tasks from the database.
+        purge_deleted(before, batch_size, pause): Purges the tasks deleted before a time, in batches.
+        archive(before, batch_size, pause): Moves the tasks completed before a time to the archive, in batches.
+
+    """
+    update_batch_size = 500
+
+    def bulk_create(self, objs, *args, **kwargs):
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            deltas = {}
+            for obj in objs:
+                total, done = deltas.get(obj.owner_id, (0, 0))
+                deltas[obj.owner_id] = (total + 1, done + obj.status)
+            for owner_id, (total, done) in deltas.items():
+                TaskCounter.objects.apply_delta(owner_id, total=total, done=done)
+            notify_task_list_changed(deltas, using=self.db, action='created', task_ids=group_by_owner(objs))
+        for obj in objs:
+            obj._loaded_status = obj.status
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields = [*fields, 'updated_at'] if 'updated_at' not in fields else fields
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            # QuerySet.bulk_update() writes through update(), which recounts the done tasks from
+            # the database, so instances not loaded from the database are counted correctly too.
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            notify_task_list_changed({obj.owner_id for obj in objs}, using=self.db, task_ids=group_by_owner(objs))
+        for obj in objs:
+            obj._loaded_status = obj.status
+        return rows
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            if 'status' not in kwargs:
+                owner_ids = set(self.order_by().values_list('owner_id', flat=True).distinct())
+                rows = super().update(**kwargs)
+                notify_task_list_changed(owner_ids, using=self.db)
+                return rows
+            # A status update is applied update_batch_size tasks at a time, walking the primary
+            # key, so that the done counts can be compared before and after each batch without
+            # holding every primary key in memory or exceeding SQLite's limit on parameters.
+            rows, owner_ids, last_pk = 0, set(), 0
+            while True:
+                pks = list(
+                    self.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:self.update_batch_size]
+                )
+                if not pks:
+                    break
+                last_pk = pks[-1]
+                affected = self.model._base_manager.using(self.db).filter(pk__in=pks)
+                before = count_by_owner(affected)
+                rows += affected.update(**kwargs)
+                for owner_id, (_, done) in count_by_owner(affected).items():
+                    TaskCounter.objects.apply_delta(owner_id, done=done - before[owner_id][1])
+                owner_ids.update(before)
+            notify_task_list_changed(owner_ids, using=self.db)
+        return rows
+
+    def delete(self):
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            live = self.filter(deleted_at__isnull=True)
+            deltas = count_by_owner(live)
+            # The UPDATE of QuerySet, not ours: a deletion neither stamps updated_at nor counts as an update.
+            rows = models.QuerySet.update(live, deleted_at=timezone.now())
+            for owner_id, (total, done) in deltas.items():
+                TaskCounter.objects.apply_delta(owner_id, total=-total, done=-done)
+            notify_task_list_changed(deltas, using=self.db, action='deleted')
+        return rows, {self.model._meta.label: rows}
+
+    delete.alters_data = True
+
+    def deleted(self):
+        """
+        Return the tasks of the queryset that are marked as deleted but not purged yet.
+
+        Returns:
+            TaskQuerySet: The deleted tasks.
+        """
+        return self.filter(deleted_at__isnull=False)
+
+    def restore(self):
+        """
+        Unmark the deleted tasks of the queryset and count them again.
+
+        Returns:
+            int: The number of restored tasks.
+        """
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            tombstones = self.deleted()
+            deltas = count_by_owner(tombstones)
+            task_ids = {}
+            for owner_id, pk in tombstones.values_list('owner_id', 'pk'):
+                task_ids.setdefault(owner_id, []).append(pk)
+            rows = models.QuerySet.update(tombstones, deleted_at=None)
+            for owner_id, (total, done) in deltas.items():
+                TaskCounter.objects.apply_delta(owner_id, total=total, done=done)
+            notify_task_list_changed(deltas, using=self.db, action='created', task_ids=task_ids)
+        return rows
+
+    restore.alters_data = True
+
+    def purge(self):
+        """
+        Delete the tasks of the queryset from the database, deleted or not.
+
+        Returns:
+            tuple: The number of deleted rows and the number per model, like QuerySet.delete().
+        """
+        self._for_write = True
+        with transaction.atomic(using=self.db):
+            deltas = count_by_owner(self.filter(deleted_at__isnull=True))
+            result = super().delete()
+            for owner_id, (total, done) in deltas.items():
+                TaskCounter.objects.apply_delta(owner_id, total=-total, done=-done)
+            notify_task_list_changed(deltas, using=self.db, action='deleted')
+        return result
+
+    purge.alters_data = True
+
+    def purge_deleted(self, before, batch_size=500, pause=0.1, on_batch=None):
+        """
+        Purge the tasks of the queryset deleted before a time, batch_size rows at a time.
+
+        Every batch is a short transaction of its own, followed by a pause, so that purging
+        many tasks never holds the SQLite write lock for long and concurrent writers get their
+        turn between the batches.
+
+        Args:
+            before (datetime): Purge the tasks deleted before this time.
+            batch_size (int): The number of tasks deleted per transaction.
+            pause (float): The number of seconds to wait between two batches.
+            on_batch (callable): Called with the total number of purged tasks after every batch.
+
+        Returns:
+            int: The number of purged tasks.
+        """
+        self._for_write = True
+        tombstones = self.filter(deleted_at__lt=before).order_by('deleted_at')
+        purged = 0
+        while True:
+            pks = list(tombstones.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            # Filtered again, in case a task of the batch has been restored in the meantime.
+            batch = self.model._base_manager.using(self.db).filter(pk__in=pks, deleted_at__lt=before)
+            purged += batch.delete()[0]
+            if on_batch is not None:
+                on_batch(purged)
+            if len(pks) < batch_size:
+                break
+            time.sleep(pause)
+        return purged
+
+    purge_deleted.alters_data = True
+
+    def archive(self, before, batch_size=500, pause=0.1, on_batch=None):
+        """
+        Move the completed tasks of the queryset last changed before a time to ArchivedTask.
+
+        Every batch is copied to the archive and purged from the tasks table in one short
+        transaction, so a task is always in exactly one of the tables, followed by a pause,
+        so that concurrent writers get their turn between the batches. Archived tasks leave
+        the task counters like deleted ones.
+
+        Args:
+            before (datetime): Archive the tasks completed and last changed before this time.
+            batch_size (int): The number of tasks moved per transaction.
+            pause (float): The number of seconds to wait between two batches.
+            on_batch (callable): Called with the total number of archived tasks after every batch.
+
+        Returns:
+            int: The number of archived tasks.
+        """
+        self._for_write = True
+        candidates = self.filter(status=True, deleted_at__isnull=True, updated_at__lt=before).order_by('pk')
+        archived = 0
+        while True:
+            with transaction.atomic(using=self.db):
+                # Read inside the transaction, so that the rows copied are the rows purged.
+                tasks = list(candidates.select_for_update()[:batch_size])
+                if not tasks:
+                    break
+                archived_at = timezone.now()
+                ArchivedTask.objects.using(self.db).bulk_create(
+                    ArchivedTask.from_task(task, archived_at) for task in tasks
+                )
+                self.model.all_objects.using(self.db).filter(pk__in=[task.pk for task in tasks]).purge()
+            archived += len(tasks)
+            if on_batch is not None:
+                on_batch(archived)
+            if len(tasks) < batch_size:
+                break
+            time.sleep(pause)
+        return archived
+
+    archive.alters_data = True
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    """
+    Default manager of the Task model, which leaves out the tasks marked as deleted.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Task(models.Model):
     """
     Model representing a task.
 
+    Tasks belong to the user who created them. The composite indexes cover the task list,
+    which filters by owner and orders by descending id, and its filters by status and by
+    title prefix (see TaskFilterForm).
+
+    Deleting a task only stamps deleted_at. The default manager, objects, leaves such
+    tombstones out, and the list indexes are partial indexes over the live tasks, so
+    tombstones cost the task list nothing; all_objects includes them. A deleted task can be
+    restored during settings.TASK_DELETION['UNDO_WINDOW'] seconds, after which the
+    purge_deleted_tasks command removes it for good.
+
     Attributes:
+        owner (ForeignKey): The user the task belongs to.
         title (CharField): The title of the task.
         status (BooleanField): The status of the task.
+        created_at (DateTimeField): When the task was created.
+        updated_at (DateTimeField): When the task was last changed, also by bulk updates.
+        deleted_at (DateTimeField): When the task was deleted, None for live tasks.
 
     Methods:
-        None
+        save(*args, **kwargs): Saves the task and updates the task counters.
+        delete(*args, **kwargs): Marks the task as deleted and updates the task counters.
+        restore(): Unmarks the deleted task and updates the task counters.
 
     """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='tasks',
+        null=True,
+        db_index=False,
+    )
     title = models.CharField(max_length=255)
     status = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = TaskManager()
+    all_objects = TaskQuerySet.as_manager()
+
+    _loaded_status = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', '-id'], name='task_owner_id_idx', condition=LIVE),
+            models.Index(fields=['owner', 'status', '-id'], name='task_owner_status_id_idx', condition=LIVE),
+            models.Index('owner', Lower('title'), F('id').desc(), name='task_owner_title_idx', condition=LIVE),
+            models.Index(fields=['deleted_at'], name='task_deleted_at_idx', condition=Q(deleted_at__isnull=False)),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if adding:
+                TaskCounter.objects.apply_delta(self.owner_id, total=1, done=int(self.status))
+            elif self._loaded_status is not None and self.status != self._loaded_status:
+                TaskCounter.objects.apply_delta(self.owner_id, done=1 if self.status else -1)
+            notify_task_list_changed(
+                [self.owner_id],
+                using=using,
+                action='created' if adding else 'updated',
+                task_ids={self.owner_id: [self.pk]},
+            )
+        self._loaded_status = self.status
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        deleted_at = timezone.now()
+        with transaction.atomic(using=using):
+            # Conditional, so deleting a task twice only removes it from the counts once.
+            rows = type(self).all_objects.using(using).filter(pk=self.pk, deleted_at__isnull=True)
+            rows = models.QuerySet.update(rows, deleted_at=deleted_at)
+            if rows:
+                TaskCounter.objects.apply_delta(self.owner_id, total=-1, done=-int(bool(self._loaded_status)))
+                notify_task_list_changed(
+                    [self.owner_id], using=using, action='deleted', task_ids={self.owner_id: [self.pk]},
+                )
+        self.deleted_at = deleted_at
+        return rows, {self._meta.label: rows}
+
+    delete.alters_data = True
+
+    def restore(self, using=None):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            rows = type(self).all_objects.using(using).filter(pk=self.pk, deleted_at__isnull=False)
+            rows = models.QuerySet.update(rows, deleted_at=None)
+            if rows:
+                TaskCounter.objects.apply_delta(self.owner_id, total=1, done=int(self.status))
+                notify_task_list_changed(
+                    [self.owner_id], using=using, action='created', task_ids={self.owner_id: [self.pk]},
+                )
+        self.deleted_at = None
+        return rows
+
+    restore.alters_data = True
+
+
+class ArchivedTask(models.Model):
+    """
+    Model representing a completed task moved out of the tasks table.
+
+    Tasks completed long ago are moved here by TaskQuerySet.archive() (see the archive_tasks
+    command), so that the tasks table and its indexes only grow with active work. Archived
+    tasks keep the primary key they had as tasks and are read on demand, by
+    ArchivedTaskListView; they are not counted by TaskCounter.
+
+    Attributes:
+        id (BigIntegerField): The primary key of the task.
+        owner (ForeignKey): The user the task belongs to.
+        title (CharField): The title of the task.
+        status (BooleanField): The status of the task when it was archived.
+        created_at (DateTimeField): When the task was created.
+        updated_at (DateTimeField): When the task was last changed before it was archived.
+        archived_at (DateTimeField): When the task was archived.
+
+    Methods:
+        from_task(task, archived_at): Returns the archived copy of a task.
+
+    """
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks',
+        null=True,
+        db_index=False,
+    )
+    title = models.CharField(max_length=255)
+    status = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', '-id'], name='archived_task_owner_id_idx'),
+        ]
+
+    @classmethod
+    def from_task(cls, task, archived_at=None):
+        """
+        Return the archived copy of a task, without saving it.
+
+        Args:
+            task (Task): The task to archive.
+            archived_at (datetime): When the task is archived. Defaults to now.
+
+        Returns:
+            ArchivedTask: The unsaved copy.
+        """
+        return cls(
+            id=task.pk,
+            owner_id=task.owner_id,
+            title=task.title,
+            status=task.status,
+            created_at=task.created_at,
+            updated_at=task.updated_at,
+            archived_at=archived_at or timezone.now(),
+        )
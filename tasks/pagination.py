@@ -0,0 +1,206 @@
+# The largest primary key a SQLite INTEGER (and a bigint column) can hold.
+MAX_CURSOR = 2 ** 63 - 1
+
+
+class KeysetPage:
+    """
+    A single page of results produced by the KeysetPaginator.
+
+    Unlike django.core.paginator.Page this page does not know its number or the total
+    number of pages. It only knows whether there are neighbouring pages and which cursors
+    lead to them, which is all the pagination template needs to render prev/next links.
+
+    Attributes:
+        object_list (list): The objects on this page, in display order.
+        has_next (bool): Whether there are older objects after this page.
+        has_previous (bool): Whether there are newer objects before this page.
+
+    Methods:
+        next_cursor(): Returns the cursor for the page after this one.
+        previous_cursor(): Returns the cursor for the page before this one.
+
+    """
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def next_cursor(self):
+        """
+        Returns the cursor to pass as ?after= to fetch the next page.
+
+        Returns:
+            int or None: The primary key of the last object on the page, None if the page is empty.
+        """
+        return self.object_list[-1].pk if self.object_list else None
+
+    def previous_cursor(self):
+        """
+        Returns the cursor to pass as ?before= to fetch the previous page.
+
+        Returns:
+            int or None: The primary key of the first object on the page, None if the page is empty.
+        """
+        return self.object_list[0].pk if self.object_list else None
+
+
+class KeysetPaginator:
+    """
+    Cursor (keyset) paginator over a queryset ordered by descending primary key.
+
+    Each page is served by a single range query on the primary key index
+    (WHERE id < cursor ORDER BY id DESC LIMIT n + 1), so fetching a deep page costs the same
+    as fetching the first one and no COUNT query is issued. One extra row is fetched to find
+    out whether another page exists in the direction of travel.
+
+    Attributes:
+        queryset (QuerySet): The queryset to paginate. Any existing ordering is replaced.
+        per_page (int): The number of objects to display per page.
+
+    Methods:
+        get_page(after=None, before=None): Returns the KeysetPage for the given cursor.
+        aget_page(after=None, before=None): Asynchronous version of get_page().
+
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, after=None, before=None):
+        """
+        Returns the page of objects adjacent to the given cursor.
+
+        Args:
+            after (int): Return the objects that follow the object with this primary key.
+            before (int): Return the objects that precede the object with this primary key.
+
+        Returns:
+            KeysetPage: The requested page. Without a cursor the first page is returned.
+        """
+        limit = self.per_page + 1
+        if before is not None:
+            rows = list(self.queryset.filter(pk__gt=before).order_by('pk')[:limit])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_previous)
+
+        queryset = self.queryset.order_by('-pk')
+        if after is not None:
+            queryset = queryset.filter(pk__lt=after)
+        rows = list(queryset[:limit])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], has_next=has_next, has_previous=after is not None)
+
+    async def aget_page(self, after=None, before=None):
+        """
+        Asynchronous version of get_page(), fetching the rows with async iteration.
+
+        Args:
+            after (int): Return the objects that follow the object with this primary key.
+            before (int): Return the objects that precede the object with this primary key.
+
+        Returns:
+            KeysetPage: The requested page. Without a cursor the first page is returned.
+        """
+        limit = self.per_page + 1
+        if before is not None:
+            rows = [obj async for obj in self.queryset.filter(pk__gt=before).order_by('pk')[:limit]]
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return KeysetPage(rows, has_next=True, has_previous=has_previous)
+
+        queryset = self.queryset.order_by('-pk')
+        if after is not None:
+            queryset = queryset.filter(pk__lt=after)
+        rows = [obj async for obj in queryset[:limit]]
+        has_next = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page], has_next=has_next, has_previous=after is not None)
+
+
+def parse_cursor(value):
+    """
+    Converts a cursor query parameter into a primary key.
+
+    Args:
+        value (str): The raw value of the ?after= or ?before= parameter.
+
+    Returns:
+        int or None: The cursor as an integer, None if it is missing, malformed or outside
+                     the range of primary keys (1 to 2**63 - 1).
+    """
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if 1 <= cursor <= MAX_CURSOR else None
+
+
+def get_pagination_query(params):
+    """
+    Returns the query string to prefix pagination links with.
+
+    The page and cursor parameters are dropped, so that links only replace the position
+    and keep every other parameter, e.g. a search query or filter.
+
+    Args:
+        params (QueryDict): The query parameters of the current request.
+
+    Returns:
+        str: The encoded parameters followed by '&', or an empty string.
+    """
+    params = params.copy()
+    for name in ('page', 'after', 'before'):
+        params.pop(name, None)
+    query = params.urlencode()
+    return f'{query}&' if query else ''
+
+
+def get_per_page(params, default, maximum):
+    """
+    Returns the page size requested with the ?per_page= parameter.
+
+    Args:
+        params (QueryDict): The query parameters of the current request.
+        default (int): The page size used when none or an invalid one is requested.
+        maximum (int): The largest page size a client may request.
+
+    Returns:
+        int: The page size, between 1 and maximum.
+    """
+    per_page = parse_cursor(params.get('per_page'))
+    if per_page is None or per_page < 1:
+        return default
+    return min(per_page, maximum)
+
+
+def get_page_range(page_obj, on_each_side=2, on_ends=1):
+    """
+    Returns the page numbers to link to from the given page.
+
+    Only the first and last on_ends pages and on_each_side pages around the current page are
+    included; the gaps are represented by Paginator.ELLIPSIS. The number of links therefore
+    does not grow with the number of pages.
+
+    Args:
+        page_obj (Page): The current page.
+        on_each_side (int): The number of pages shown on each side of the current page.
+        on_ends (int): The number of pages shown at the beginning and the end.
+
+    Returns:
+        list: Page numbers and ellipsis strings, in order.
+    """
+    return list(page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=on_each_side,
+        on_ends=on_ends,
+    ))
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .cache import task_list_cache
+from .events import task_event_hub
+from .models import Task
+from .signals import task_list_changed
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def delete_owned_tasks(sender, instance, **kwargs):
+    """
+    Delete a user's tasks before the user is deleted.
+
+    The database cascade would remove the rows without going through TaskQuerySet.purge(),
+    leaving the task counters out of sync. Purging them here first, deleted tasks included,
+    keeps the counters exact.
+
+    Args:
+        sender (class): The user model.
+        instance (CustomUser): The user being deleted.
+
+    """
+    Task.all_objects.filter(owner=instance).purge()
+
+
+@receiver(task_list_changed)
+def invalidate_task_list_cache(sender, owner_ids, **kwargs):
+    """
+    Invalidate the cached task list fragments of the owners whose tasks changed.
+
+    Args:
+        sender (class): The Task model.
+        owner_ids (set): The owners whose task lists changed.
+
+    """
+    task_list_cache.bump(owner_ids)
+
+
+@receiver(task_list_changed)
+def publish_task_events(sender, owner_ids, action='updated', task_ids=None, **kwargs):
+    """
+    Push the change to the owners' open live update streams.
+
+    Args:
+        sender (class): The Task model.
+        owner_ids (set): The owners whose task lists changed.
+        action (str): 'created', 'updated' or 'deleted'.
+        task_ids (dict): The primary keys of the changed tasks by owner, if known.
+
+    """
+    task_event_hub.publish(owner_ids, action, task_ids)
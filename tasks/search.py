@@ -0,0 +1,230 @@
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+
+class SearchResults:
+    """
+    Lazily evaluated, paginatable search results.
+
+    The object implements count() and slicing, so it can be handed to
+    django.core.paginator.Paginator and to ListView like a queryset. Only the rows of the
+    requested slice are fetched.
+
+    Attributes:
+        model (class): The model of the results, used by ListView to name the context variable.
+        backend (SearchBackend): The backend that runs the queries.
+        query (str): The search query as typed by the user.
+        owner (CustomUser): The user whose tasks are searched.
+
+    Methods:
+        count(): Returns the number of matching tasks.
+
+    """
+    model = Task
+
+    def __init__(self, backend, query, owner):
+        self.backend = backend
+        self.query = query
+        self.owner = owner
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.query, self.owner)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        offset = key.start or 0
+        limit = None if key.stop is None else max(key.stop - offset, 0)
+        return self.backend.fetch(self.query, self.owner, offset, limit)
+
+
+class SearchBackend:
+    """
+    Interface of task search backends.
+
+    Methods:
+        search(query, owner): Returns the SearchResults for a query.
+        count(query, owner): Returns the number of tasks matching a query.
+        fetch(query, owner, offset, limit): Returns a slice of the matching tasks, best match first.
+        install(connection): Creates the search index.
+        rebuild(connection): Rebuilds the search index from the tasks table.
+
+    """
+
+    def search(self, query, owner):
+        return SearchResults(self, query, owner)
+
+    def count(self, query, owner):
+        raise NotImplementedError
+
+    def fetch(self, query, owner, offset, limit):
+        raise NotImplementedError
+
+    def install(self, connection):
+        pass
+
+    def rebuild(self, connection):
+        pass
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    Task search backed by an SQLite FTS5 virtual table.
+
+    The tasks_task_fts table is an external-content index over tasks_task.owner_id and
+    tasks_task.title that is kept in sync by triggers, so every write path, including bulk
+    operations and raw SQL, updates it. Deleted tasks stay in the index until they are purged
+    and are filtered out by the join.
+
+    The owner id is indexed as a token and required by every MATCH expression, so the index
+    only returns, and bm25 only ranks, the tasks of the user searching instead of the matching
+    tasks of every user. Every word of the query is matched as a prefix of a title word.
+
+    Attributes:
+        table (str): The name of the FTS5 table.
+
+    """
+    table = 'tasks_task_fts'
+
+    def get_match_expression(self, query, owner):
+        """
+        Convert a user query into an FTS5 MATCH expression.
+
+        Args:
+            query (str): The search query as typed by the user.
+            owner (CustomUser): The user whose tasks are searched.
+
+        Returns:
+            str: An expression matching the owner's tasks whose title contains all words of the
+                 query as prefixes, or an empty string if the query has no words.
+        """
+        words = re.findall(r'\w+', query)
+        if not words:
+            return ''
+        return ' AND '.join([f'owner_id : "{owner.pk}"', *(f'title : "{word}"*' for word in words)])
+
+    def _execute(self, sql, params):
+        connection = connections[router.db_for_read(Task)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def count(self, query, owner):
+        expression = self.get_match_expression(query, owner)
+        if not expression:
+            return 0
+        rows = self._execute(
+            f'SELECT COUNT(*) FROM {self.table} AS fts '
+            f'JOIN tasks_task AS task ON task.id = fts.rowid '
+            f'WHERE {self.table} MATCH %s AND task.owner_id = %s AND task.deleted_at IS NULL',
+            [expression, owner.pk],
+        )
+        return rows[0][0]
+
+    def fetch(self, query, owner, offset, limit):
+        expression = self.get_match_expression(query, owner)
+        if not expression or limit == 0:
+            return []
+        rows = self._execute(
+            f'SELECT fts.rowid FROM {self.table} AS fts '
+            f'JOIN tasks_task AS task ON task.id = fts.rowid '
+            f'WHERE {self.table} MATCH %s AND task.owner_id = %s AND task.deleted_at IS NULL '
+            f'ORDER BY bm25({self.table}, 0.0, 1.0), fts.rowid DESC LIMIT %s OFFSET %s',
+            [expression, owner.pk, -1 if limit is None else limit, offset],
+        )
+        ids = [row[0] for row in rows]
+        tasks = Task.objects.in_bulk(ids)
+        return [tasks[pk] for pk in ids if pk in tasks]
+
+    def install(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                f"owner_id, title, content='tasks_task', content_rowid='id', prefix='2 3')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {self.table}_insert AFTER INSERT ON tasks_task BEGIN '
+                f'INSERT INTO {self.table}(rowid, owner_id, title) VALUES (new.id, new.owner_id, new.title); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {self.table}_delete AFTER DELETE ON tasks_task BEGIN '
+                f"INSERT INTO {self.table}({self.table}, rowid, owner_id, title) "
+                f"VALUES ('delete', old.id, old.owner_id, old.title); END"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {self.table}_update AFTER UPDATE OF owner_id, title ON tasks_task BEGIN '
+                f"INSERT INTO {self.table}({self.table}, rowid, owner_id, title) "
+                f"VALUES ('delete', old.id, old.owner_id, old.title); "
+                f'INSERT INTO {self.table}(rowid, owner_id, title) VALUES (new.id, new.owner_id, new.title); END'
+            )
+
+    def uninstall(self, connection):
+        with connection.cursor() as cursor:
+            for trigger in ('insert', 'delete', 'update'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {self.table}_{trigger}')
+            cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def rebuild(self, connection):
+        # Recreated rather than only refilled, so that an index with an outdated schema is replaced.
+        self.uninstall(connection)
+        self.install(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+
+
+class ContainsSearchBackend(SearchBackend):
+    """
+    Portable task search using a case-insensitive substring match.
+
+    This backend needs no index and works on every database, but scans all of the owner's
+    tasks. It is meant for development and tests on databases without a text index backend.
+
+    """
+
+    def _queryset(self, query, owner):
+        queryset = Task.objects.filter(owner=owner)
+        for word in re.findall(r'\w+', query):
+            queryset = queryset.filter(title__icontains=word)
+        return queryset.order_by('-id')
+
+    def count(self, query, owner):
+        return self._queryset(query, owner).count() if query.strip() else 0
+
+    def fetch(self, query, owner, offset, limit):
+        if not query.strip():
+            return []
+        end = None if limit is None else offset + limit
+        return list(self._queryset(query, owner)[offset:end])
+
+
+def get_search_backend(connection=None):
+    """
+    Return the task search backend.
+
+    settings.TASK_SEARCH_BACKEND may name a backend class. Otherwise SQLite databases use the
+    FTS5 backend and other databases the portable substring backend.
+
+    Args:
+        connection (DatabaseWrapper): The database to search. Defaults to the task read database.
+
+    Returns:
+        SearchBackend: The search backend instance.
+    """
+    backend_path = getattr(settings, 'TASK_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    connection = connection or connections[router.db_for_read(Task)]
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    return ContainsSearchBackend()
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Sent after a transaction that created, updated or deleted tasks has been committed.
+# Arguments: owner_ids (set) - the owners whose task lists changed,
+#            action (str) - 'created', 'updated' or 'deleted',
+#            task_ids (dict or None) - the primary keys of the changed tasks by owner, if known.
+task_list_changed = Signal()
@@ -1,3 +1,645 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Case, Count, Q, Value, When
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+
+from .bulk import BulkOperations
+from .cache import check_task_list_cache, task_list_cache
+from .events import Subscription, TaskEventHub, task_event_hub
+from .importing import TaskImporter, read_rows
+from .models import ArchivedTask, Task, TaskCounter, TaskQuerySet
+from .pagination import KeysetPaginator, get_page_range, get_per_page, parse_cursor
+from .search import SQLiteFTS5Backend
+from .views import TaskCreateView, TaskDeleteView, TaskExportView, TaskStatusToggleView
+
+
+def create_user(email, password='Secret-pass-123'):
+    user = CustomUser(email=email)
+    user.set_password(password)
+    user.save()
+    return user
+
+
+class TaskCounterTests(TestCase):
+    """Tests that every write path keeps TaskCounter equal to a recount of the tasks table."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        # Counters are only maintained once initialised, which the first read does.
+        TaskCounter.objects.get_counts(self.owner)
+        TaskCounter.objects.get_counts()
+
+    def assertCountsMatch(self):
+        for owner, tasks in ((self.owner, Task.objects.filter(owner=self.owner)), (None, Task.objects.all())):
+            counts = tasks.aggregate(total=Count('pk'), done=Count('pk', filter=Q(status=True)))
+            counts['open'] = counts['total'] - counts['done']
+            self.assertEqual(TaskCounter.objects.get_counts(owner), counts)
+
+    def test_save_counts_created_and_toggled_tasks(self):
+        task = Task.objects.create(owner=self.owner, title='a')
+        task.status = True
+        task.save()
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner), {'total': 1, 'done': 1, 'open': 0})
+        self.assertCountsMatch()
+
+    def test_bulk_create(self):
+        Task.objects.bulk_create([Task(owner=self.owner, title=str(i), status=i % 2 == 0) for i in range(5)])
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner), {'total': 5, 'done': 3, 'open': 2})
+        self.assertCountsMatch()
+
+    def test_bulk_update_counts_each_change_once(self):
+        tasks = Task.objects.bulk_create([Task(owner=self.owner, title=str(i)) for i in range(5)])
+        for task in tasks:
+            task.status = True
+        Task.objects.bulk_update(tasks, ['status'])
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner)['done'], 5)
+        self.assertCountsMatch()
+
+    def test_bulk_update_of_instances_not_loaded_from_the_database(self):
+        tasks = Task.objects.bulk_create([Task(owner=self.owner, title=str(i), status=True) for i in range(3)])
+        Task.objects.bulk_update([Task(pk=task.pk, owner=self.owner, title='x', status=False) for task in tasks], ['status'])
+        self.assertCountsMatch()
+
+    def test_update_in_batches(self):
+        Task.objects.bulk_create([Task(owner=self.owner, title=str(i), status=i < 2) for i in range(7)])
+        with mock.patch.object(TaskQuerySet, 'update_batch_size', 2):
+            rows = Task.objects.update(status=Case(When(status=True, then=Value(False)), default=Value(True)))
+        self.assertEqual(rows, 7)
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner), {'total': 7, 'done': 5, 'open': 2})
+        self.assertCountsMatch()
+
+    def test_update_without_status_leaves_the_counts(self):
+        Task.objects.bulk_create([Task(owner=self.owner, title='a', status=True)])
+        Task.objects.update(title='b')
+        self.assertCountsMatch()
+
+    def test_delete_counts_each_task_once(self):
+        tasks = Task.objects.bulk_create([Task(owner=self.owner, title=str(i), status=True) for i in range(3)])
+        tasks[0].delete()
+        tasks[0].delete()
+        Task.objects.filter(pk=tasks[1].pk).delete()
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner), {'total': 1, 'done': 1, 'open': 0})
+        self.assertCountsMatch()
+
+    def test_restore(self):
+        task = Task.objects.create(owner=self.owner, title='a', status=True)
+        task.delete()
+        self.assertEqual(Task.all_objects.filter(pk=task.pk).restore(), 1)
+        self.assertEqual(Task.all_objects.filter(pk=task.pk).restore(), 0)
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner)['total'], 1)
+        self.assertCountsMatch()
+
+    def test_purge_of_a_deleted_task_leaves_the_counts(self):
+        tasks = Task.objects.bulk_create([Task(owner=self.owner, title=str(i)) for i in range(2)])
+        tasks[0].delete()
+        Task.all_objects.purge()
+        self.assertFalse(Task.all_objects.exists())
+        self.assertCountsMatch()
+
+    def test_archive_moves_completed_tasks_out_of_the_counts(self):
+        Task.objects.bulk_create([Task(owner=self.owner, title=str(i), status=i < 3) for i in range(5)])
+        archived = Task.objects.archive(timezone.now() + timedelta(seconds=1), batch_size=2, pause=0)
+        self.assertEqual(archived, 3)
+        self.assertEqual(ArchivedTask.objects.count(), 3)
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner), {'total': 2, 'done': 0, 'open': 2})
+        self.assertCountsMatch()
+
+    def test_rebuild(self):
+        Task.objects.bulk_create([Task(owner=self.owner, title='a', status=True)])
+        TaskCounter.objects.update(total=42)
+        self.assertEqual(TaskCounter.objects.rebuild(), {'total': 1, 'done': 1})
+        self.assertCountsMatch()
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests of cursor pagination and cursor parsing."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        self.tasks = Task.objects.bulk_create([Task(owner=self.owner, title=str(i)) for i in range(7)])
+        self.pks = sorted((task.pk for task in self.tasks), reverse=True)
+        self.paginator = KeysetPaginator(Task.objects.filter(owner=self.owner), 3)
+
+    def test_first_page(self):
+        page = self.paginator.get_page()
+        self.assertEqual([task.pk for task in page], self.pks[:3])
+        self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+
+    def test_next_and_previous_pages(self):
+        second = self.paginator.get_page(after=self.paginator.get_page().next_cursor())
+        self.assertEqual([task.pk for task in second], self.pks[3:6])
+        self.assertTrue(second.has_previous)
+        first = self.paginator.get_page(before=second.previous_cursor())
+        self.assertEqual([task.pk for task in first], self.pks[:3])
+        self.assertFalse(first.has_previous)
+
+    def test_last_page(self):
+        page = self.paginator.get_page(after=self.pks[5])
+        self.assertEqual([task.pk for task in page], self.pks[6:])
+        self.assertFalse(page.has_next)
+
+    def test_parse_cursor(self):
+        self.assertEqual(parse_cursor('12'), 12)
+        for value in (None, '', 'abc', '1.5', '0', '-3', str(2 ** 63), '9' * 400):
+            self.assertIsNone(parse_cursor(value), value)
+
+    def test_list_view_with_cursors(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('tasks'), {'after': self.pks[0], 'per_page': 2})
+        self.assertEqual([task.pk for task in response.context['tasks']], self.pks[1:3])
+        response = self.client.get(reverse('tasks'), {'after': str(2 ** 70)})
+        self.assertEqual(response.status_code, 200)
+
+
+class PageRangeTests(TestCase):
+    """Tests of the windowed page range and of the bounded page size."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        Task.objects.bulk_create([Task(owner=self.owner, title=str(i)) for i in range(100)])
+        self.client.force_login(self.owner)
+
+    def test_page_range_is_elided(self):
+        page_obj = Paginator(range(100), 1).get_page(50)
+        ellipsis = Paginator.ELLIPSIS
+        self.assertEqual(get_page_range(page_obj), [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100])
+        self.assertEqual(get_page_range(Paginator(range(5), 1).get_page(1)), [1, 2, 3, 4, 5])
+
+    def test_list_view_links_a_window_of_pages(self):
+        response = self.client.get(reverse('tasks'), {'page': 10, 'per_page': 2})
+        ellipsis = Paginator.ELLIPSIS
+        self.assertEqual(response.context['page_range'], [1, ellipsis, 8, 9, 10, 11, 12, ellipsis, 50])
+        self.assertContains(response, 'pagination-ellipsis', count=2)
+        self.assertContains(response, '?per_page=2&amp;page=50')
+
+    def test_per_page_is_bounded(self):
+        self.assertEqual(get_per_page(QueryDict('per_page=20'), 5, 50), 20)
+        self.assertEqual(get_per_page(QueryDict('per_page=1000'), 5, 50), 50)
+        for value in ('0', '-1', 'x', str(2 ** 70)):
+            self.assertEqual(get_per_page(QueryDict(f'per_page={value}'), 5, 50), 5, value)
+        response = self.client.get(reverse('tasks'), {'per_page': 1000})
+        self.assertEqual(len(response.context['tasks']), TaskCreateView.max_paginate_by)
+
+
+class TaskBulkViewTests(TestCase):
+    """Tests of the bulk API and its validation of the JSON types."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        self.other = create_user('other@example.com')
+        self.task = Task.objects.create(owner=self.owner, title='mine')
+        self.foreign = Task.objects.create(owner=self.other, title='theirs')
+        self.client.force_login(self.owner)
+
+    def post(self, operations):
+        return self.client.post(reverse('bulk_tasks'), json.dumps(operations), content_type='application/json')
+
+    def test_operations_are_executed(self):
+        response = self.post([
+            {'op': 'create', 'title': 'new'},
+            {'op': 'update', 'id': self.task.pk, 'status': True},
+        ])
+        data = response.json()
+        self.assertEqual((data['created'], data['updated'], data['failed']), (1, 1, 0))
+        self.assertTrue(Task.objects.get(pk=self.task.pk).status)
+        self.assertEqual(Task.objects.get(title='new').owner, self.owner)
+
+        data = self.post([{'op': 'delete', 'id': self.task.pk}]).json()
+        self.assertEqual(data['deleted'], 1)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_ids_of_the_wrong_type_are_rejected(self):
+        results = self.post([
+            {'op': 'update', 'id': True, 'title': 'x'},
+            {'op': 'delete', 'id': str(self.task.pk)},
+            {'op': 'delete', 'id': 2 ** 63},
+            {'op': 'delete', 'id': 1.0},
+        ]).json()['results']
+        for result in results:
+            self.assertEqual(result['errors'], {'id': ['Expected a positive integer.']})
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_fields_of_the_wrong_type_are_rejected(self):
+        results = self.post([
+            {'op': 'create', 'title': ['a', 'b']},
+            {'op': 'update', 'id': self.task.pk, 'status': 'yes'},
+        ]).json()['results']
+        self.assertEqual(results[0]['errors'], {'title': ['Expected a string.']})
+        self.assertEqual(results[1]['errors'], {'status': ['Expected true or false.']})
+
+    def test_tasks_of_other_users_are_not_found(self):
+        results = self.post([{'op': 'delete', 'id': self.foreign.pk}]).json()['results']
+        self.assertEqual(results[0]['errors'], {'id': ['Task not found.']})
+        self.assertTrue(Task.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_malformed_body(self):
+        self.assertEqual(self.post({'op': 'create'}).status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+
+    def test_operations_without_owner_queryset(self):
+        results = BulkOperations([{'op': 'nope'}, 'x']).execute()
+        self.assertEqual(results[0]['errors'], {'op': ["Expected 'create', 'update' or 'delete'."]})
+        self.assertEqual(results[1]['errors'], {'__all__': ['Expected an object.']})
+
+
+class TaskStatusToggleViewTests(TestCase):
+    """Tests of the toggle endpoint."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        self.task = Task.objects.create(owner=self.owner, title='a')
+        self.client.force_login(self.owner)
+
+    def post(self, ids):
+        return self.client.post(reverse('toggle_tasks'), json.dumps({'ids': ids}), content_type='application/json')
+
+    def test_toggle(self):
+        response = self.post([self.task.pk])
+        self.assertEqual(response.json(), {'tasks': [{'id': self.task.pk, 'status': True}]})
+        response = self.client.post(reverse('toggle_tasks'), {'ids': [str(self.task.pk)]})
+        self.assertEqual(response.json(), {'tasks': [{'id': self.task.pk, 'status': False}]})
+
+    def test_full_batch_is_one_update(self):
+        tasks = Task.objects.bulk_create(
+            [Task(owner=self.owner, title=str(i)) for i in range(TaskStatusToggleView.max_batch_size - 1)]
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([self.task.pk, *(task.pk for task in tasks)])
+        self.assertEqual(response.status_code, 200)
+        updates = [query for query in queries if query['sql'].startswith('UPDATE "tasks_task"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_ids_of_the_wrong_type_are_rejected(self):
+        for ids in ([True], [str(self.task.pk)], [2 ** 63], [], 'x'):
+            self.assertEqual(self.post(ids).status_code, 400, ids)
+        self.assertFalse(Task.objects.get(pk=self.task.pk).status)
+
+    def test_anonymous(self):
+        self.client.logout()
+        self.assertEqual(self.post([self.task.pk]).status_code, 403)
+
+
+class TaskListViewTests(TestCase):
+    """Tests of the task list and update pages."""
+
+    def setUp(self):
+        for alias in ('default', 'task_lists'):
+            caches[alias].clear()
+        self.owner = create_user('owner@example.com')
+        self.task = Task.objects.create(owner=self.owner, title='Écrire', status=True)
+        Task.objects.create(owner=self.owner, title='ecrire', status=False)
+        self.client.force_login(self.owner)
+
+    def test_filters(self):
+        response = self.client.get(reverse('tasks'), {'status': 'done'})
+        self.assertEqual([task.pk for task in response.context['tasks']], [self.task.pk])
+        response = self.client.get(reverse('tasks'), {'title': 'E'})
+        self.assertEqual([task.title for task in response.context['tasks']], ['ecrire'])
+
+    def test_unchanged_list_is_not_modified(self):
+        self.client.get(reverse('tasks'))
+        etag = self.client.get(reverse('tasks'))['ETag']
+        response = self.client.get(reverse('tasks'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+        # The list version is bumped once the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(owner=self.owner, title='new')
+        response = self.client.get(reverse('tasks'), headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_unchanged_task_is_not_modified(self):
+        url = reverse('update_task', args=[self.task.pk])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(self.client.get(url, headers={'if-none-match': response['ETag']}).status_code, 304)
+        self.task.title = 'Changed'
+        self.task.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': response['ETag']}).status_code, 200)
+
+    def test_deleted_task_is_offered_once_for_undo(self):
+        response = self.client.post(reverse('delete_task', args=[self.task.pk]))
+        self.assertRedirects(response, reverse('tasks'), fetch_redirect_response=False)
+        self.assertEqual(self.client.session[TaskDeleteView.undo_session_key], self.task.pk)
+        self.assertEqual(self.client.get(reverse('tasks')).context['undo_task'], self.task)
+        self.assertIsNone(self.client.get(reverse('tasks')).context['undo_task'])
+
+        self.client.post(reverse('restore_task', args=[self.task.pk]))
+        self.assertTrue(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_restore_after_the_undo_window(self):
+        self.task.delete()
+        Task.all_objects.filter(pk=self.task.pk).update(deleted_at=timezone.now() - timedelta(days=1))
+        response = self.client.post(reverse('restore_task', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_tasks_of_other_users_cannot_be_deleted(self):
+        self.client.force_login(create_user('other@example.com'))
+        response = self.client.post(reverse('delete_task', args=[self.task.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_list_shares_the_caching(self):
+        self.client.get(reverse('async_tasks'))
+        response = self.client.get(reverse('async_tasks'))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('async_tasks'), headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_event_stream_needs_asgi(self):
+        self.assertEqual(self.client.get(reverse('task_events')).status_code, 204)
+
+    async def test_async_list_under_asgi(self):
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse('async_tasks'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task.title for task in response.context['tasks']], ['ecrire', 'Écrire'])
+
+
+class TaskEventTests(TestCase):
+    """Tests of the live update hub, its backpressure and the event stream."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+
+    def create_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(owner=self.owner, title='a')
+
+    async def test_full_queue_is_replaced_by_a_resync(self):
+        hub = TaskEventHub(broker='tasks.events.InProcessBroker', queue_size=3)
+        subscription = hub.subscribe(1)
+        other = hub.subscribe(2)
+        for _ in range(5):
+            hub.publish([1], 'updated')
+        await asyncio.sleep(0)
+        # The publisher never waits: the pending events are dropped for a single resync.
+        self.assertEqual(await subscription.get(timeout=0.1), Subscription.RESYNC)
+        self.assertIsNone(await subscription.get(timeout=0.01))
+        self.assertIsNone(await other.get(timeout=0.01))
+
+        # Once the client has read the resync, events are queued again.
+        hub.publish([1], 'created', {1: [7]})
+        await asyncio.sleep(0)
+        self.assertEqual((await subscription.get(timeout=0.1))['tasks'], [7])
+
+        hub.unsubscribe(subscription)
+        hub.unsubscribe(other)
+        self.assertEqual(hub.stats(), {'owners': 0, 'streams': 0})
+
+    async def test_committed_changes_are_published(self):
+        subscription = task_event_hub.subscribe(self.owner.pk)
+        try:
+            task = await sync_to_async(self.create_task)()
+            event = await subscription.get(timeout=1)
+        finally:
+            task_event_hub.unsubscribe(subscription)
+        self.assertEqual((event['type'], event['tasks']), ('created', [task.pk]))
+
+    @override_settings(TASK_EVENTS={**settings.TASK_EVENTS, 'HEARTBEAT': 0.05, 'MAX_AGE': 0.2})
+    async def test_stream_under_asgi(self):
+        await sync_to_async(self.client.force_login)(self.owner)
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse('task_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertTrue(content.startswith('retry: 3000\n\n'))
+        self.assertIn(': keep-alive\n\n', content)
+        self.assertEqual(task_event_hub.stats()['streams'], 0)
+
+
+class TaskListCacheTests(TestCase):
+    """Tests of the fragment cache of the task list."""
+
+    def setUp(self):
+        caches['task_lists'].clear()
+        self.owner = create_user('owner@example.com')
+        Task.objects.create(owner=self.owner, title='a')
+        self.client.force_login(self.owner)
+
+    def test_fragment_is_cached_until_the_list_changes(self):
+        self.client.get(reverse('tasks'))
+        self.client.get(reverse('tasks'))
+        self.assertEqual(task_list_cache.stats()['hits'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(owner=self.owner, title='Buy bread')
+        response = self.client.get(reverse('tasks'))
+        self.assertEqual(task_list_cache.stats()['hits'], 1)
+        self.assertContains(response, 'Buy bread')
+
+    def test_unshared_cache_is_reported(self):
+        backend = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(CACHES={**settings.CACHES, 'task_lists': backend}):
+            self.assertEqual([error.id for error in check_task_list_cache(None)], ['tasks.W001'])
+        with tempfile.TemporaryDirectory() as directory:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+            with override_settings(CACHES={**settings.CACHES, 'task_lists': backend}):
+                self.assertEqual(check_task_list_cache(None), [])
+
+
+class SearchIndexTests(TestCase):
+    """Tests that the FTS5 triggers keep the search index in sync with the tasks table."""
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('The FTS5 index only exists on SQLite.')
+        self.owner = create_user('owner@example.com')
+        self.backend = SQLiteFTS5Backend()
+
+    def search(self, query):
+        return [task.title for task in self.backend.search(query, self.owner)[:10]]
+
+    def test_insert_update_and_delete(self):
+        task = Task.objects.create(owner=self.owner, title='Buy milk')
+        Task.objects.bulk_create([Task(owner=self.owner, title='Milkshake recipe')])
+        self.assertEqual(sorted(self.search('mil')), ['Buy milk', 'Milkshake recipe'])
+
+        task.title = 'Buy bread'
+        task.save()
+        self.assertEqual(self.search('milk'), ['Milkshake recipe'])
+        self.assertEqual(self.search('bread'), ['Buy bread'])
+
+        task.delete()
+        self.assertEqual(self.search('bread'), [])
+        Task.all_objects.filter(pk=task.pk).purge()
+        self.assertEqual(self.backend.count('bread', self.owner), 0)
+
+    def test_tasks_of_other_users_are_not_found(self):
+        other = create_user('other@example.com')
+        task = Task.objects.create(owner=other, title='Buy milk')
+        self.assertEqual(self.search('milk'), [])
+        # The index itself only matches the owner's tasks, before the join.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.backend.table} WHERE {self.backend.table} MATCH %s',
+                [self.backend.get_match_expression('milk', other)],
+            )
+            self.assertEqual(cursor.fetchall(), [(task.pk,)])
+
+        Task.objects.filter(pk=task.pk).update(owner=self.owner)
+        self.assertEqual(self.search('milk'), ['Buy milk'])
+        self.assertEqual(self.backend.count('milk', other), 0)
+
+    def test_rebuild(self):
+        Task.objects.create(owner=self.owner, title='Buy milk')
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.backend.table}({self.backend.table}) VALUES ('delete-all')")
+        self.assertEqual(self.search('milk'), [])
+        self.backend.rebuild(connection)
+        self.assertEqual(self.search('milk'), ['Buy milk'])
+
+    def test_query_without_words(self):
+        self.assertEqual(self.backend.count('"*', self.owner), 0)
+
+
+class TaskImporterTests(TestCase):
+    """Tests of the importer and of resuming an import from its checkpoint."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'import.json')
+        self.rows = [{'title': f'task {i}', 'status': i % 2 == 0} for i in range(6)]
+
+    def test_owner_is_required(self):
+        with self.assertRaises(ValueError):
+            TaskImporter(None)
+        with self.assertRaises(ValueError):
+            TaskImporter(CustomUser(email='unsaved@example.com'))
+
+    def test_invalid_rows_are_reported(self):
+        errors = []
+        importer = TaskImporter(self.owner, on_error=lambda number, row, error: errors.append(number))
+        counters = importer.run(enumerate([{'title': ''}, 'Invalid JSON', {'title': 'ok'}], 1))
+        self.assertEqual(counters, {'processed': 3, 'imported': 1, 'failed': 2})
+        self.assertEqual(errors, [1, 2])
+        self.assertEqual(Task.objects.get().owner, self.owner)
+
+    def test_owner_from_the_owner_column(self):
+        errors = {}
+        importer = TaskImporter(
+            None, owner_column='owner', on_error=lambda number, row, error: errors.update({number: error}),
+        )
+        rows = [{'title': 'a', 'owner': 'owner@example.com'}, {'title': 'b', 'owner': 'nobody@example.com'}, {'title': 'c'}]
+        self.assertEqual(importer.run(enumerate(rows, 1)), {'processed': 3, 'imported': 1, 'failed': 2})
+        self.assertEqual(Task.objects.get().owner, self.owner)
+        self.assertEqual(list(errors), [2, 3])
+        self.assertEqual(errors[2], {'owner': ['Expected the email of a user.']})
+
+    def test_values_of_the_wrong_type_are_rejected(self):
+        errors = {}
+        importer = TaskImporter(self.owner, on_error=lambda number, row, error: errors.update({number: error}))
+        rows = [{'title': ['a', 'b']}, {'title': 'a', 'status': 'yes'}, {'title': 'a', 'status': 1}, {'title': 'ok'}]
+        counters = importer.run(enumerate(rows, 1))
+        self.assertEqual(counters, {'processed': 4, 'imported': 1, 'failed': 3})
+        self.assertEqual(errors, {
+            1: {'title': ['Expected a string.']},
+            2: {'status': ['Expected true or false.']},
+            3: {'status': ['Expected true or false.']},
+        })
+
+    def test_csv_statuses_are_converted(self):
+        file = io.StringIO('title,status\na,true\nb,0\nc,FALSE\nd,yes\ne\n')
+        rows = [row for _, row in read_rows(file, 'csv')]
+        self.assertEqual([row.get('status') for row in rows], [True, False, False, 'yes', None])
+        counters = TaskImporter(self.owner).run(enumerate(rows, 1))
+        self.assertEqual(counters, {'processed': 5, 'imported': 4, 'failed': 1})
+        self.assertEqual(set(Task.objects.filter(status=True).values_list('title', flat=True)), {'a'})
+
+    def test_resume_from_checkpoint(self):
+        first = TaskImporter(self.owner, batch_size=2, transaction_size=1, checkpoint=self.checkpoint)
+        first.run(enumerate(self.rows[:4], 1))
+        with open(self.checkpoint) as file:
+            self.assertEqual(json.load(file)['processed'], 4)
+
+        second = TaskImporter(self.owner, batch_size=2, transaction_size=1, checkpoint=self.checkpoint)
+        counters = second.run(enumerate(self.rows, 1))
+        self.assertEqual(counters, {'processed': 6, 'imported': 6, 'failed': 0})
+        self.assertEqual(Task.objects.count(), 6)
+        self.assertEqual(TaskCounter.objects.get_counts(self.owner), {'total': 6, 'done': 3, 'open': 3})
+
+
+class TaskExportTests(TestCase):
+    """Tests of the streaming export view and of restoring an export with import_tasks."""
+
+    def setUp(self):
+        self.owner = create_user('owner@example.com')
+        self.other = create_user('other@example.com')
+        Task.objects.bulk_create([Task(owner=self.owner, title=f'task {i}', status=i == 0) for i in range(5)])
+        Task.objects.create(owner=self.other, title='theirs')
+        self.client.force_login(self.owner)
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_tasks'), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv(self):
+        with mock.patch.object(TaskExportView, 'chunk_size', 2):
+            response = self.client.get(reverse('export_tasks'), {'sort': 'oldest'})
+            chunks = list(response.streaming_content)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.csv"')
+        # The rows are encoded two at a time, the header with the first two.
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+        self.assertEqual(rows[0], ['id', 'owner', 'title', 'status', 'created_at', 'updated_at'])
+        self.assertEqual([row[1:4] for row in rows[1:3]], [
+            ['owner@example.com', 'task 0', 'True'],
+            ['owner@example.com', 'task 1', 'False'],
+        ])
+        self.assertEqual(len(rows), 6)
+
+    def test_jsonl_with_filters(self):
+        response, content = self.export(format='jsonl', status='done')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([(row['owner'], row['title'], row['status']) for row in rows], [
+            ('owner@example.com', 'task 0', True),
+        ])
+
+    def test_gzip(self):
+        response, content = self.export(format='jsonl', compress='gzip')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tasks.jsonl.gz"')
+        self.assertEqual(len(gzip.decompress(content).decode().splitlines()), 5)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(reverse('export_tasks'), {'format': 'xml'}).status_code, 400)
+
+    async def test_streamed_under_asgi(self):
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse('export_tasks'), {'format': 'jsonl'})
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 5)
+
+    def test_full_export_is_restored_to_the_owners(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'tasks.jsonl.gz')
+        expected = sorted(Task.objects.values_list('owner__email', 'title', 'status'))
+        call_command('export_tasks', path, stdout=io.StringIO())
+        Task.all_objects.purge()
+
+        call_command('import_tasks', path, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(sorted(Task.objects.values_list('owner__email', 'title', 'status')), expected)
 
-# Create your tests here.
@@ -1,10 +1,41 @@
 from django.urls import path
 
-from .views import IndexTemplateView, TaskCreateView, TaskDeleteView, TaskUpdateView
+from .async_views import (
+    AsyncTaskDeleteView,
+    AsyncTaskListView,
+    AsyncTaskStatusToggleView,
+    AsyncTaskUpdateView,
+    TaskEventStreamView,
+)
+from .views import (
+    ArchivedTaskListView,
+    IndexTemplateView,
+    TaskBulkView,
+    TaskCreateView,
+    TaskDeleteView,
+    TaskExportView,
+    TaskListCacheStatsView,
+    TaskRestoreView,
+    TaskSearchView,
+    TaskStatusToggleView,
+    TaskUpdateView,
+)
 
 urlpatterns = [
     path('', IndexTemplateView.as_view(), name='index_page'),
     path('tasks/', TaskCreateView.as_view(), name='tasks'),
     path('tasks/<int:pk>/delete', TaskDeleteView.as_view(), name='delete_task'),
+    path('tasks/<int:pk>/restore', TaskRestoreView.as_view(), name='restore_task'),
     path('tasks/<int:pk>/update', TaskUpdateView.as_view(), name='update_task'),
+    path('tasks/search', TaskSearchView.as_view(), name='search_tasks'),
+    path('tasks/archive', ArchivedTaskListView.as_view(), name='archived_tasks'),
+    path('tasks/toggle', TaskStatusToggleView.as_view(), name='toggle_tasks'),
+    path('tasks/bulk', TaskBulkView.as_view(), name='bulk_tasks'),
+    path('tasks/export', TaskExportView.as_view(), name='export_tasks'),
+    path('tasks/events', TaskEventStreamView.as_view(), name='task_events'),
+    path('tasks/cache-stats', TaskListCacheStatsView.as_view(), name='task_cache_stats'),
+    path('async/tasks/', AsyncTaskListView.as_view(), name='async_tasks'),
+    path('async/tasks/<int:pk>/delete', AsyncTaskDeleteView.as_view(), name='async_delete_task'),
+    path('async/tasks/<int:pk>/update', AsyncTaskUpdateView.as_view(), name='async_update_task'),
+    path('async/tasks/toggle', AsyncTaskStatusToggleView.as_view(), name='async_toggle_tasks'),
 ]
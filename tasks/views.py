@@ -1,11 +1,53 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.db.models import Case, Value, When
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
-from django.views.generic import TemplateView, CreateView, DeleteView, UpdateView
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views import View
+from django.views.generic import TemplateView, CreateView, DeleteView, ListView, UpdateView
+
+from . import exporting
+from .bulk import BulkOperations, is_task_id
+from .cache import task_list_cache
+from .conditional import task_etag, task_last_modified, task_list_etag
+from .models import UNDO_SESSION_KEY, ArchivedTask, Task, TaskCounter, TaskQuerySet
+from .forms import TaskCreateForm, TaskFilterForm, TaskUpdateForm
+from .pagination import (
+    KeysetPaginator,
+    get_page_range,
+    get_pagination_query,
+    get_per_page,
+    parse_cursor,
+)
+from .search import get_search_backend
+
+
+def is_asgi_request(request):
+    """
+    Return whether a request is served by the ASGI application (see todo/asgi.py).
+
+    Streaming responses depend on it: under ASGI they must be async iterators to be streamed,
+    and under WSGI a long-lived stream would hold a worker thread.
+
+    Args:
+        request (HttpRequest): The current HTTP request object.
 
-from .models import Task
-from .forms import TaskCreateForm, TaskUpdateForm
+    Returns:
+        bool: True for an ASGI request, False for a WSGI request.
+    """
+    return isinstance(request, ASGIRequest)
 
 
 class IndexTemplateView(TemplateView):
@@ -37,86 +79,320 @@ class IndexTemplateView(TemplateView):
         return context
 
 
-class TaskCreateView(LoginRequiredMixin, CreateView):
+class OwnedTaskMixin(LoginRequiredMixin):
+    """Mixin restricting a view to the tasks of the logged-in user.
+
+    Anonymous users are redirected to the login page. Tasks of other users are not part of
+    the queryset, so single-object views respond with 404 for them.
+
+    Attributes:
+        login_url (str): The URL to redirect anonymous users to.
+
+    Methods:
+        get_queryset(): Returns the tasks owned by the current user.
+        get_restorable_queryset(): Returns the current user's tasks that can still be restored.
+
+    """
+    login_url = reverse_lazy('login')
+
+    def get_queryset(self):
+        """Return the tasks owned by the current user.
+
+        Returns:
+            QuerySet: The current user's tasks.
+
+        """
+        return Task.objects.filter(owner=self.request.user)
+
+    def get_restorable_queryset(self):
+        """Return the current user's tasks deleted less than the undo window ago.
+
+        Returns:
+            QuerySet: The current user's restorable tasks.
+
+        """
+        deleted_after = timezone.now() - timedelta(seconds=settings.TASK_DELETION['UNDO_WINDOW'])
+        return Task.all_objects.deleted().filter(owner=self.request.user, deleted_at__gte=deleted_after)
+
+
+class TaskCreateView(OwnedTaskMixin, CreateView):
     """View for creating a new task.
 
     This view extends the CreateView class and provides functionality to create a new task object
     using the TaskForm. The view renders the 'tasks/task_list.html' template and handles the form
     submission to create the task. It also includes pagination for the task list.
 
+    The task list is paginated either by page number (?page=N) or, when a cursor is given
+    (?after=<id> / ?before=<id>) or pagination_mode is 'keyset', by cursor. Cursor pagination
+    serves every page with one indexed range query and never counts the table. The list can
+    be filtered by status and title prefix and sorted with the parameters of TaskFilterForm.
+
     Attributes:
         form_class (class): The form class to use for creating the task.
         template_name (str): The name of the template to render.
+        fragment_template_name (str): The name of the cached template rendering the task list.
         model (class): The model class to use for creating the task.
-        paginate_by (int): The number of tasks to display per page.
+        paginate_by (int): The default number of tasks to display per page.
+        max_paginate_by (int): The largest page size a client may request with ?per_page=.
+        pagination_on_each_side (int): The number of page links around the current page.
+        pagination_on_ends (int): The number of page links at the beginning and the end.
+        pagination_mode (str): The default pagination mode, either 'page' or 'keyset'.
         success_url (str): The URL to redirect to upon successful task creation.
 
     Methods:
         get_context_data(**kwargs): Adds additional context data to the view's context dictionary.
+        get_keyset_cursors(): Returns the cursors requested in the query string.
+        get_paginate_by(): Returns the page size requested in the query string.
+        get_filter_form(): Returns the filter form bound to the query string.
+        get_task_list_context(): Returns the context of the task list fragment.
+        get_task_list_fragment(): Returns the rendered task list, from the cache if possible.
+        get_undo_task(): Returns the task just deleted, if it can still be restored.
+        get(request, *args, **kwargs): Renders the task list unless the client's copy is current.
+        form_valid(form): Assigns the new task to the current user and saves it.
 
     """
 
     form_class = TaskCreateForm
     template_name = 'tasks/task_list.html'
+    fragment_template_name = 'include/task_items.html'
     model = Task
     paginate_by = 5
+    max_paginate_by = 50
+    pagination_on_each_side = 2
+    pagination_on_ends = 1
+    pagination_mode = 'page'
     success_url = reverse_lazy('tasks')
-    login_url = reverse_lazy('login')
+
+    def get_keyset_cursors(self):
+        """Return the cursors requested in the query string.
+
+        Returns:
+            tuple: The (after, before) primary keys, each None if not given or malformed.
+
+        """
+        return (
+            parse_cursor(self.request.GET.get('after')),
+            parse_cursor(self.request.GET.get('before')),
+        )
+
+    def get_paginate_by(self):
+        """Return the page size requested in the query string.
+
+        Returns:
+            int: The value of ?per_page=, bounded by max_paginate_by, or paginate_by.
+
+        """
+        return get_per_page(self.request.GET, self.paginate_by, self.max_paginate_by)
+
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=task_list_etag))
+    def get(self, request, *args, **kwargs):
+        """Render the task list, or answer 304 Not Modified if the client's copy is current.
+
+        Returns:
+            HttpResponse: The rendered page or an empty 304 response.
+
+        """
+        return super().get(request, *args, **kwargs)
+
+    def get_filter_form(self):
+        """Return the filter form bound to the query string.
+
+        Returns:
+            TaskFilterForm: The bound filter form.
+
+        """
+        return TaskFilterForm(self.request.GET)
+
+    def get_task_list_context(self):
+        """Return the context of the task list fragment.
+
+        The tasks are filtered and sorted by the filter form. The task counts are read from
+        the maintained TaskCounter, which also gives the number of tasks for the status
+        filters; only a title filter requires a COUNT query. Cursor pagination is used for the
+        default newest-first order; other orders fall back to page numbers. In page mode
+        'cursor_page' is None; in keyset mode 'page_obj' is None.
+
+        Returns:
+            dict: A dictionary with 'tasks', 'total_tasks', 'done_tasks', 'open_tasks',
+                  'page_obj', 'page_range', 'cursor_page' and 'pagination_query'.
+
+        """
+        counts = TaskCounter.objects.get_counts(owner=self.request.user)
+        filter_form = self.get_filter_form()
+        filters = filter_form.get_filters()
+        queryset = filter_form.filter_queryset(self.get_queryset())
+        after, before = self.get_keyset_cursors()
+        per_page = self.get_paginate_by()
+        page_obj = cursor_page = None
+        page_range = []
+        keyset = after is not None or before is not None or self.pagination_mode == 'keyset'
+        if keyset and filters['sort'] == 'newest':
+            paginator = KeysetPaginator(queryset, per_page)
+            cursor_page = tasks = paginator.get_page(after=after, before=before)
+        else:
+            paginator = Paginator(queryset, per_page)
+            if not filters['title']:
+                paginator.count = counts[filters['status'] or 'total']
+            page_obj = tasks = paginator.get_page(self.request.GET.get('page'))
+            page_range = get_page_range(page_obj, self.pagination_on_each_side, self.pagination_on_ends)
+
+        return {
+            'tasks': tasks,
+            'total_tasks': counts['total'],
+            'done_tasks': counts['done'],
+            'open_tasks': counts['open'],
+            'page_obj': page_obj,
+            'page_range': page_range,
+            'cursor_page': cursor_page,
+            'pagination_query': get_pagination_query(self.request.GET),
+        }
+
+    def get_task_list_fragment(self):
+        """Return the rendered task list and the task counts, from the cache if possible.
+
+        The fragment is cached per user and query string and invalidated whenever one of
+        the user's tasks changes, so repeated views of an unchanged page skip all task queries.
+
+        Returns:
+            dict: A dictionary with 'task_list_html', 'total_tasks', 'done_tasks' and 'open_tasks'.
+
+        """
+        key = task_list_cache.get_key(self.request.user.pk, self.request.GET)
+        fragment = task_list_cache.get(key)
+        if fragment is None:
+            task_list = self.get_task_list_context()
+            fragment = {
+                'task_list_html': render_to_string(self.fragment_template_name, task_list),
+                'total_tasks': task_list['total_tasks'],
+                'done_tasks': task_list['done_tasks'],
+                'open_tasks': task_list['open_tasks'],
+            }
+            task_list_cache.set(key, fragment)
+        return fragment
+
+    def get_undo_task(self):
+        """Return the task just deleted by TaskDeleteView, if it can still be restored.
+
+        The task is only offered once: its id is removed from the session.
+
+        Returns:
+            Task or None: The deleted task.
+
+        """
+        pk = self.request.session.pop(TaskDeleteView.undo_session_key, None)
+        if pk is None:
+            return None
+        return self.get_restorable_queryset().filter(pk=pk).first()
 
     def get_context_data(self, **kwargs):
         """Add additional context data to the view's context dictionary.
 
         This method overrides the get_context_data() method of the parent class and adds
-        'tasks', 'total_tasks', 'page_obj', and 'form' to the context dictionary.
+        'task_list_html', 'total_tasks', 'done_tasks', 'open_tasks', 'form', 'filter_form'
+        and 'undo_task' to the context dictionary.
 
         Returns:
             dict: The updated context dictionary.
 
         """
         context = super().get_context_data(**kwargs)
-        paginator = Paginator(self.get_queryset(), self.paginate_by)
-        page_number = self.request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
-        p = Paginator(Task.objects.all().order_by('-id'), self.paginate_by)
-        tasks = p.page(page_obj.number)
-        total_tasks = len(Task.objects.all())
-
+        context.update(self.get_task_list_fragment())
         context.update({
-            'tasks': tasks,
-            'total_tasks': total_tasks,
-            'page_obj': page_obj,
             'form': self.get_form(),
+            'filter_form': self.get_filter_form(),
+            'undo_task': self.get_undo_task(),
             'title': 'Tasks'
         })
 
         return context
 
+    def form_valid(self, form):
+        """Assign the new task to the current user and save it.
 
-class TaskDeleteView(DeleteView):
+        Args:
+            form (TaskCreateForm): The valid form instance.
+
+        Returns:
+            HttpResponseRedirect: Redirects the user to the 'success_url'.
+
+        """
+        form.instance.owner = self.request.user
+        return super().form_valid(form)
+
+
+class TaskDeleteView(OwnedTaskMixin, DeleteView):
     """View for deleting a task.
 
     This view extends the DeleteView class and provides functionality to delete a task object.
     The view renders a confirmation page to confirm the deletion of the task. Upon confirmation,
-    the task object is deleted from the database, and the user is redirected to the 'tasks' page.
+    the task is marked as deleted, and the user is redirected to the 'tasks' page, which offers
+    to undo the deletion (see TaskRestoreView). Only the current user's tasks can be deleted.
 
     Attributes:
         model (class): The model class to use for deleting the task.
         success_url (str): The URL to redirect to upon successful task deletion.
+        undo_session_key (str): The session key holding the id of the task to offer to restore.
 
     Methods:
-        None
+        form_valid(form): Deletes the task and remembers it for the undo offer.
 
     """
 
     model = Task
     success_url = reverse_lazy('tasks')
+    undo_session_key = UNDO_SESSION_KEY
+
+    def form_valid(self, form):
+        """Delete the task and remember it for the undo offer.
+
+        Args:
+            form (Form): The confirmation form.
+
+        Returns:
+            HttpResponseRedirect: Redirects the user to the 'success_url'.
+
+        """
+        response = super().form_valid(form)
+        self.request.session[self.undo_session_key] = self.object.pk
+        return response
+
+
+class TaskRestoreView(OwnedTaskMixin, View):
+    """View for undoing the deletion of a task.
+
+    Deleted tasks are kept as tombstones until they are purged, and can be restored during
+    settings.TASK_DELETION['UNDO_WINDOW'] seconds. Later, or for tasks of other users, the
+    view responds with 404.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        success_url (str): The URL to redirect to after the task is restored.
+
+    Methods:
+        post(request, pk, *args, **kwargs): Restores the task and redirects to the list.
+
+    """
+    http_method_names = ['post']
+    success_url = reverse_lazy('tasks')
 
+    def post(self, request, pk, *args, **kwargs):
+        """Restore the task and redirect to the list.
 
-class TaskUpdateView(UpdateView):
+        Returns:
+            HttpResponseRedirect: Redirects the user to the 'success_url'.
+
+        """
+        get_object_or_404(self.get_restorable_queryset(), pk=pk).restore()
+        return redirect(self.success_url)
+
+
+class TaskUpdateView(OwnedTaskMixin, UpdateView):
     """A class-based view for updating a Task object.
 
     This view allows users to update an existing Task object using a form. It extends Django's UpdateView,
     which provides built-in functionalities for handling form processing and database updates.
+    Only the current user's tasks can be updated.
 
     Attributes:
         template_name (str): The name of the template used to render the update task page.
@@ -128,6 +404,8 @@ class TaskUpdateView(UpdateView):
                            to 'tasks', which is the URL name for the tasks list page.
 
     Methods:
+        get(request, *args, **kwargs):
+            Renders the update page, or answers 304 Not Modified if the client's copy is current.
         get_context_data(**kwargs):
             Returns a dictionary containing the updated context data to be used in the template rendering.
     """
@@ -136,6 +414,19 @@ class TaskUpdateView(UpdateView):
     form_class = TaskUpdateForm
     success_url = reverse_lazy('tasks')
 
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=task_etag, last_modified_func=task_last_modified))
+    def get(self, request, *args, **kwargs):
+        """Render the update page, or answer 304 Not Modified if the client's copy is current.
+
+        The ETag and Last-Modified headers are derived from the task's updated_at timestamp.
+
+        Returns:
+            HttpResponse: The rendered page or an empty 304 response.
+
+        """
+        return super().get(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         """Add additional context data to be passed to the template during rendering.
 
@@ -155,3 +446,367 @@ class TaskUpdateView(UpdateView):
             'title': 'Update task'
         })
         return context
+
+
+class TaskSearchView(OwnedTaskMixin, ListView):
+    """View for searching the current user's tasks by title.
+
+    The query is taken from the 'q' parameter and run against the task search backend
+    (an SQLite FTS5 index by default). Every word is matched as a prefix and the results are
+    ranked by relevance and paginated like the task list.
+
+    Attributes:
+        template_name (str): The name of the template to render.
+        paginate_by (int): The default number of tasks to display per page.
+        max_paginate_by (int): The largest page size a client may request with ?per_page=.
+        pagination_on_each_side (int): The number of page links around the current page.
+        pagination_on_ends (int): The number of page links at the beginning and the end.
+
+    Methods:
+        get_query(): Returns the search query.
+        get_paginate_by(queryset): Returns the page size requested in the query string.
+        get_queryset(): Returns the search results.
+        get_context_data(**kwargs): Adds additional context data to the view's context dictionary.
+
+    """
+    template_name = 'tasks/search.html'
+    paginate_by = 5
+    max_paginate_by = 50
+    pagination_on_each_side = 2
+    pagination_on_ends = 1
+
+    def get_query(self):
+        """Return the search query.
+
+        Returns:
+            str: The value of the 'q' parameter, stripped of surrounding whitespace.
+
+        """
+        return self.request.GET.get('q', '').strip()
+
+    def get_paginate_by(self, queryset):
+        """Return the page size requested in the query string.
+
+        Returns:
+            int: The value of ?per_page=, bounded by max_paginate_by, or paginate_by.
+
+        """
+        return get_per_page(self.request.GET, self.paginate_by, self.max_paginate_by)
+
+    def get_queryset(self):
+        """Return the search results.
+
+        Returns:
+            SearchResults: The tasks of the current user matching the query, best match first.
+
+        """
+        return get_search_backend().search(self.get_query(), self.request.user)
+
+    def get_context_data(self, **kwargs):
+        """Add additional context data to the view's context dictionary.
+
+        This method overrides the get_context_data() method of the parent class and adds
+        'tasks', 'page_range', 'query', 'pagination_query' and 'title' to the context dictionary.
+
+        Returns:
+            dict: The updated context dictionary.
+
+        """
+        context = super().get_context_data(**kwargs)
+        context.update({
+            'tasks': context['page_obj'],
+            'page_range': get_page_range(
+                context['page_obj'], self.pagination_on_each_side, self.pagination_on_ends,
+            ),
+            'query': self.get_query(),
+            'pagination_query': get_pagination_query(self.request.GET),
+            'title': 'Search'
+        })
+        return context
+
+
+class ArchivedTaskListView(OwnedTaskMixin, ListView):
+    """View listing the current user's archived tasks.
+
+    Archived tasks are read from the ArchivedTask table only when this page is requested.
+    The archive grows without bound, so it is paginated by cursor (?after=<id> /
+    ?before=<id>), which never counts the table, and can be filtered by title with ?q=.
+
+    Attributes:
+        template_name (str): The name of the template to render.
+        per_page (int): The default number of tasks to display per page.
+        max_per_page (int): The largest page size a client may request with ?per_page=.
+
+    Methods:
+        get_query(): Returns the title filter.
+        get_queryset(): Returns the current user's archived tasks.
+        get_context_data(**kwargs): Adds additional context data to the view's context dictionary.
+
+    """
+    template_name = 'tasks/archive.html'
+    per_page = 5
+    max_per_page = 50
+
+    def get_query(self):
+        """Return the title filter.
+
+        Returns:
+            str: The value of the 'q' parameter, stripped of surrounding whitespace.
+
+        """
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        """Return the current user's archived tasks.
+
+        Returns:
+            QuerySet: The archived tasks whose title contains the query, if any.
+
+        """
+        queryset = ArchivedTask.objects.filter(owner=self.request.user)
+        query = self.get_query()
+        if query:
+            queryset = queryset.filter(title__icontains=query)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        """Add additional context data to the view's context dictionary.
+
+        The page of archived tasks is fetched with KeysetPaginator instead of ListView's
+        paginator, and 'tasks', 'cursor_page', 'query', 'pagination_query' and 'title' are
+        added to the context dictionary.
+
+        Returns:
+            dict: The updated context dictionary.
+
+        """
+        per_page = get_per_page(self.request.GET, self.per_page, self.max_per_page)
+        cursor_page = KeysetPaginator(self.object_list, per_page).get_page(
+            after=parse_cursor(self.request.GET.get('after')),
+            before=parse_cursor(self.request.GET.get('before')),
+        )
+        context = super().get_context_data(object_list=cursor_page, **kwargs)
+        context.update({
+            'tasks': cursor_page,
+            'cursor_page': cursor_page,
+            'query': self.get_query(),
+            'pagination_query': get_pagination_query(self.request.GET),
+            'title': 'Archive'
+        })
+        return context
+
+
+class TaskStatusToggleView(OwnedTaskMixin, View):
+    """View for toggling the status of one or many tasks via AJAX.
+
+    The view accepts a POST request whose body is either JSON ({"ids": [1, 2]}) or form data
+    (ids=1&ids=2), flips the status of all given tasks in one transaction and returns the new
+    states as JSON. Ids of tasks owned by other users are ignored. The task list page batches
+    checkbox clicks into one request to this view instead of submitting the update form for
+    every task.
+
+    The status is flipped by TaskQuerySet.update(), which writes update_batch_size tasks per
+    UPDATE statement to keep the task counters exact; max_batch_size is no larger, so a
+    request is flipped with a single UPDATE.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        max_batch_size (int): The maximum number of task ids accepted in one request.
+        raise_exception (bool): Respond with 403 instead of redirecting anonymous users to login.
+
+    Methods:
+        get_task_ids(): Returns the task ids sent in the request body.
+        post(request, *args, **kwargs): Toggles the tasks and returns their new states.
+
+    """
+    http_method_names = ['post']
+    max_batch_size = TaskQuerySet.update_batch_size
+    raise_exception = True
+
+    def get_task_ids(self):
+        """Return the task ids sent in the request body.
+
+        Returns:
+            list or None: The distinct task ids, None if the body is malformed or an id is
+                          not a positive integer.
+
+        """
+        form_data = self.request.content_type != 'application/json'
+        if form_data:
+            ids = self.request.POST.getlist('ids')
+        else:
+            try:
+                ids = json.loads(self.request.body).get('ids')
+            except (ValueError, AttributeError):
+                return None
+        if not isinstance(ids, list):
+            return None
+        task_ids = set()
+        for task_id in ids:
+            # Form data sends strings; JSON must send integers, not e.g. true or "1" for task 1.
+            if form_data and task_id.isascii() and task_id.isdigit():
+                task_id = int(task_id)
+            if not is_task_id(task_id):
+                return None
+            task_ids.add(task_id)
+        return list(task_ids)
+
+    def post(self, request, *args, **kwargs):
+        """Toggle the status of the requested tasks.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: The new status of every toggled task, or an error with status 400.
+
+        """
+        ids = self.get_task_ids()
+        if not ids:
+            return JsonResponse({'error': 'Expected a non-empty list of task ids.'}, status=400)
+        if len(ids) > self.max_batch_size:
+            return JsonResponse(
+                {'error': f'At most {self.max_batch_size} tasks can be toggled at once.'},
+                status=400,
+            )
+
+        tasks = self.get_queryset().filter(pk__in=ids)
+        tasks.update(status=Case(When(status=True, then=Value(False)), default=Value(True)))
+        return JsonResponse({
+            'tasks': [{'id': pk, 'status': status} for pk, status in tasks.values_list('pk', 'status')],
+        })
+
+
+class TaskBulkView(OwnedTaskMixin, View):
+    """View for creating, updating and deleting many tasks in one request.
+
+    The request body is a JSON array of operations, for example:
+
+        [
+            {"op": "create", "title": "Buy milk"},
+            {"op": "update", "id": 4, "status": true},
+            {"op": "delete", "id": 7}
+        ]
+
+    The operations are validated and executed by BulkOperations inside a single transaction.
+    Created tasks belong to the current user, and only their tasks can be updated or deleted.
+    The response lists one result per operation, in request order. Large imports should be
+    split into requests of at most max_operations operations.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        max_operations (int): The maximum number of operations accepted in one request.
+        raise_exception (bool): Respond with 403 instead of redirecting anonymous users to login.
+
+    Methods:
+        post(request, *args, **kwargs): Executes the operations and returns their results.
+
+    """
+    http_method_names = ['post']
+    max_operations = 10000
+    raise_exception = True
+
+    def post(self, request, *args, **kwargs):
+        """Execute the operations sent in the request body.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: The per-operation results and the number of tasks created, updated
+                          and deleted, or an error with status 400.
+
+        """
+        try:
+            operations = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'error': 'Expected a JSON array of operations.'}, status=400)
+        if not isinstance(operations, list) or not operations:
+            return JsonResponse({'error': 'Expected a JSON array of operations.'}, status=400)
+        if len(operations) > self.max_operations:
+            return JsonResponse(
+                {'error': f'At most {self.max_operations} operations can be sent at once.'},
+                status=400,
+            )
+
+        results = BulkOperations(operations, owner=request.user, queryset=self.get_queryset()).execute()
+        summary = {'create': 0, 'update': 0, 'delete': 0}
+        for result in results:
+            if result['ok']:
+                summary[result['op']] += 1
+        return JsonResponse({
+            'created': summary['create'],
+            'updated': summary['update'],
+            'deleted': summary['delete'],
+            'failed': sum(not result['ok'] for result in results),
+            'results': results,
+        })
+
+
+class TaskExportView(OwnedTaskMixin, View):
+    """View streaming the user's tasks as a CSV or JSON Lines file.
+
+    The query string selects the format (?format=csv or jsonl), optional gzip compression
+    (?compress=gzip) and the same status, title and sort filters as the task list. The file is
+    streamed while the tasks are read, so exports of any size use constant memory and start
+    downloading immediately.
+
+    Attributes:
+        http_method_names (list): The HTTP methods accepted by the view.
+        chunk_size (int): The number of tasks read and encoded at a time.
+
+    Methods:
+        get(request, *args, **kwargs): Streams the export.
+
+    """
+    http_method_names = ['get']
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        """Stream the tasks in the requested format.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            StreamingHttpResponse: The export as an attachment, or an error with status 400.
+
+        """
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in exporting.FORMATS:
+            return JsonResponse({'error': f"Expected a format of {', '.join(exporting.FORMATS)}."}, status=400)
+        queryset = TaskFilterForm(request.GET).filter_queryset(self.get_queryset())
+        content = exporting.export_rows(queryset, export_format, self.chunk_size)
+        filename = f'tasks.{export_format}'
+        content_type = exporting.CONTENT_TYPES[export_format]
+        if request.GET.get('compress') == 'gzip':
+            content = exporting.gzip_stream(content)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        if is_asgi_request(request):
+            content = exporting.aiter_sync(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class TaskListCacheStatsView(View):
+    """View reporting the hit and miss counters of the task list cache to staff users.
+
+    Methods:
+        get(request, *args, **kwargs): Returns the cache counters as JSON.
+
+    """
+
+    def get(self, request, *args, **kwargs):
+        """Return the cache counters as JSON.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: The number of hits and misses and the hit rate.
+
+        """
+        return JsonResponse(task_list_cache.stats())
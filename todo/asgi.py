@@ -2,6 +2,8 @@
 ASGI config for todo project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve the project with it (e.g. ``uvicorn todo.asgi:application``) to enable the async
+task views and the live task list stream at /tasks/events.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -9,8 +11,14 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo.settings')
 
 application = get_asgi_application()
+
+if settings.TEMPLATE_WARMUP:
+    from todo.templating import warm_templates
+
+    warm_templates()
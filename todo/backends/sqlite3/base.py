@@ -0,0 +1,37 @@
+"""
+SQLite database backend with per-connection tuning.
+
+This is Django's SQLite backend plus two optional keys in the database settings:
+
+    PRAGMAS (dict): PRAGMA statements run on every new connection, in order, e.g.
+                    {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 5000}.
+    TRANSACTION_MODE (str): 'DEFERRED' (SQLite's default), 'IMMEDIATE' or 'EXCLUSIVE'.
+
+With the default deferred transactions a transaction that reads before it writes has to
+upgrade its lock, and when another connection is writing at that moment SQLite fails with
+"database is locked" immediately instead of waiting busy_timeout. IMMEDIATE transactions take
+the write lock up front, so concurrent writers queue on busy_timeout instead.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    transaction_modes = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+    def get_transaction_mode(self):
+        mode = (self.settings_dict.get('TRANSACTION_MODE') or 'DEFERRED').upper()
+        if mode not in self.transaction_modes:
+            raise ImproperlyConfigured(
+                f"TRANSACTION_MODE of database '{self.alias}' must be one of {', '.join(self.transaction_modes)}."
+            )
+        return mode
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        pragmas = self.settings_dict.get('PRAGMAS') or {}
+        for name, value in pragmas.items():
+            self.connection.execute(f'PRAGMA {name} = {value}')
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.get_transaction_mode()}')
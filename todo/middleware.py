@@ -0,0 +1,173 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.db import connections
+
+from .profiling import RequestProfile, profile_stats
+from .routers import begin_request, end_request
+
+logger = logging.getLogger('todo.profiling')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Middleware giving clients read-your-writes consistency when reads go to replicas.
+
+    When a request writes to the primary database, a short-lived cookie is set on the response.
+    While the client sends it back, its requests read from the primary as well, so the client
+    sees its own changes even though the replicas have not caught up yet. Other clients keep
+    reading from the replicas.
+
+    The cookie lives for settings.DATABASE_REPLICA_PIN_SECONDS, which should exceed the
+    replication lag. See todo.routers.ReadReplicaRouter.
+
+    The middleware works in both sync and async mode: the routing state is kept in a context
+    variable, which the threads running the synchronous parts of an async request inherit.
+
+    Methods:
+        __call__(request): Tracks the routing state of the request and pins the client after a write.
+        pin(state, response): Sets the pinning cookie if the request wrote to the primary.
+
+    """
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'db_pinned'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state, token = begin_request(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state, token = begin_request(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Middleware measuring the queries and the time spent on a sample of the requests.
+
+    A fraction settings.REQUEST_PROFILING['SAMPLE_RATE'] of the requests is profiled; the
+    others only cost a random number. For a profiled request every query on every database is
+    counted and timed, the rendering of a template response is timed, and:
+
+    - the timings are sent in a Server-Timing header, which browsers show in their developer
+      tools, unless SERVER_TIMING is off;
+    - they are added to the statistics of the view's URL name (see todo.profiling);
+    - statements executed N_PLUS_ONE_THRESHOLD times or more are logged as a likely N+1
+      query pattern.
+
+    The middleware should come first, so that the queries of the other middleware are counted.
+    It works in both sync and async mode. Database connections are thread-local, so in async
+    mode the query wrappers are installed in the thread that runs the request's queries.
+
+    Methods:
+        __call__(request): Profiles the request if it is sampled.
+        process_template_response(request, response): Times the rendering of the response.
+
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def is_sampled(self):
+        options = settings.REQUEST_PROFILING
+        return options['ENABLED'] and random.random() < options['SAMPLE_RATE']
+
+    def wrap_connections(self, request):
+        request.profile = RequestProfile()
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(request.profile))
+        return stack
+
+    def finish(self, request, response, started):
+        options = settings.REQUEST_PROFILING
+        profile = request.profile
+        profile.total_time = time.perf_counter() - started
+
+        match = request.resolver_match
+        name = match.view_name if match else '<unresolved>'
+        repeated = profile.get_repeated_statements(options['N_PLUS_ONE_THRESHOLD'])
+        for sql, count in repeated:
+            logger.warning('Possible N+1 queries in %s: executed %d times: %s', name, count, sql)
+        profile_stats.record(name, profile, repeated)
+        if options['SERVER_TIMING']:
+            timings = profile.get_timings()
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings["db"]:.2f};desc="{timings["queries"]} queries"',
+                f'tpl;dur={timings["template"]:.2f}',
+                f'view;dur={timings["view"]:.2f}',
+                f'total;dur={timings["total"]:.2f}',
+            ])
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with self.wrap_connections(request):
+            response = self.get_response(request)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        stack = await sync_to_async(self.wrap_connections)(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, started)
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, 'profile', None)
+        if profile is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                profile.template_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,188 @@
+"""
+Per-request profiling: query counts, database, template and view time.
+
+RequestProfilingMiddleware profiles a sample of the requests (see settings.REQUEST_PROFILING),
+reports the timings of each profiled request in a Server-Timing header and adds them to the
+per-process statistics kept here, which staff users can read at /profiling/.
+"""
+import math
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+
+
+def percentile(ordered, fraction):
+    """
+    Return a percentile of sorted values, using the nearest-rank method.
+
+    Args:
+        ordered (list): The values, sorted in ascending order.
+        fraction (float): The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The value below which the given fraction of the values falls.
+
+    """
+    if not ordered:
+        return 0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class RequestProfile:
+    """
+    The measurements of one request.
+
+    The profile is installed as an execute wrapper on the database connections (see
+    django.db.backends.base.base.BaseDatabaseWrapper.execute_wrapper), so it sees every query.
+
+    Attributes:
+        queries (int): The number of queries executed.
+        db_time (float): The time spent executing queries, in seconds.
+        template_time (float): The time spent rendering the template response, in seconds.
+        total_time (float): The time spent in the view and the middleware below, in seconds.
+        statements (Counter): The number of executions of every SQL statement.
+
+    Methods:
+        __call__(execute, sql, params, many, context): Executes and times a query.
+        get_repeated_statements(threshold): Returns the statements executed threshold times or more.
+        get_timings(): Returns the timings in milliseconds.
+
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self.statements = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.queries += 1
+                self.db_time += elapsed
+                self.statements[sql] += 1
+
+    def get_repeated_statements(self, threshold):
+        """
+        Return the statements executed at least threshold times, a sign of an N+1 query pattern.
+
+        The statements are compared before their parameters are filled in, so loading a
+        related object per row shows up as one statement executed once per row.
+
+        Args:
+            threshold (int): The number of executions from which a statement is reported.
+
+        Returns:
+            list: (statement, count) pairs, most executed first.
+
+        """
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+    def get_timings(self):
+        """
+        Return the timings in milliseconds.
+
+        The view time is the total time minus the template rendering time, database time
+        included.
+
+        Returns:
+            dict: 'queries', 'db', 'template', 'view' and 'total'.
+
+        """
+        return {
+            'queries': self.queries,
+            'db': self.db_time * 1000,
+            'template': self.template_time * 1000,
+            'view': (self.total_time - self.template_time) * 1000,
+            'total': self.total_time * 1000,
+        }
+
+
+class ProfileStats:
+    """
+    Statistics of the profiled requests of this process, per URL name.
+
+    The most recent max_samples measurements of every URL name are kept, so the memory use
+    is bounded and the percentiles follow the current behaviour of the view.
+
+    Attributes:
+        max_samples (int): The number of measurements kept per URL name.
+
+    Methods:
+        record(name, profile, repeated): Adds the measurements of a request.
+        summary(): Returns the percentiles of every URL name.
+        reset(): Drops all measurements.
+
+    """
+    metrics = ('queries', 'db', 'template', 'view', 'total')
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self._samples = {}
+        self._counts = Counter()
+        self._n_plus_one = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name, profile, repeated=()):
+        """
+        Add the measurements of a request.
+
+        Args:
+            name (str): The URL name of the view, '<unresolved>' if the path did not match.
+            profile (RequestProfile): The measurements.
+            repeated (list): The repeated statements found in the request.
+
+        """
+        timings = profile.get_timings()
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(tuple(timings[metric] for metric in self.metrics))
+            self._counts[name] += 1
+            if repeated:
+                self._n_plus_one[name] += 1
+
+    def summary(self):
+        """
+        Return the percentiles of every URL name.
+
+        Returns:
+            dict: Per URL name the number of profiled requests, the number of them with
+                  repeated statements, and the p50, p95 and p99 of every metric.
+
+        """
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            counts = dict(self._counts)
+            n_plus_one = dict(self._n_plus_one)
+        summary = {}
+        for name, samples in sorted(snapshot.items()):
+            entry = {'requests': counts[name], 'n_plus_one': n_plus_one.get(name, 0)}
+            for index, metric in enumerate(self.metrics):
+                ordered = sorted(sample[index] for sample in samples)
+                entry[metric] = {
+                    f'p{p}': round(percentile(ordered, p / 100), 3) for p in (50, 95, 99)
+                }
+            summary[name] = entry
+        return summary
+
+    def reset(self):
+        """
+        Drop all measurements.
+        """
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._n_plus_one.clear()
+
+
+profile_stats = ProfileStats(settings.REQUEST_PROFILING['MAX_SAMPLES'])
@@ -0,0 +1,107 @@
+"""
+Database routers.
+
+See https://docs.djangoproject.com/en/4.2/topics/db/multi-db/#automatic-database-routing
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_request_state = ContextVar('database_routing_state', default=None)
+
+
+class RoutingState:
+    """
+    Routing state of the current request.
+
+    Attributes:
+        pinned (bool): Whether reads go to the primary database.
+        wrote (bool): Whether the request has written to the primary database.
+
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def begin_request(pinned=False):
+    """
+    Start tracking the routing state of a request.
+
+    The state is an object shared by reference, so that writes made in the threads running
+    the synchronous parts of an ASGI request are seen by the middleware.
+
+    Args:
+        pinned (bool): Read from the primary database, e.g. because the client wrote recently.
+
+    Returns:
+        tuple: The RoutingState and the token to pass to end_request().
+
+    """
+    state = RoutingState(pinned)
+    return state, _request_state.set(state)
+
+
+def end_request(token):
+    """
+    Stop tracking the routing state of a request.
+
+    Args:
+        token (Token): The token returned by begin_request().
+
+    """
+    _request_state.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads to the read replicas and everything else to the primary database.
+
+    The replicas are the database aliases listed in settings.DATABASE_REPLICAS; without any,
+    every query goes to the primary. Replicas are expected to hold a copy of the primary
+    (e.g. replicated with Litestream or LiteFS), so they are never migrated and objects read
+    from them may be related to objects of the primary.
+
+    A replica lags behind the primary, so a client must not read from it right after writing.
+    Once a request writes, its remaining reads go to the primary, and ReplicaPinningMiddleware
+    keeps the client's next requests on the primary for settings.DATABASE_REPLICA_PIN_SECONDS.
+
+    Attributes:
+        primary (str): The alias of the primary database.
+
+    Methods:
+        get_replicas(): Returns the aliases of the read replicas.
+        db_for_read(model, **hints): Returns a random replica, or the primary.
+        db_for_write(model, **hints): Returns the primary.
+        allow_relation(obj1, obj2, **hints): Allows relations between all the databases.
+        allow_migrate(db, app_label, model_name=None, **hints): Only migrates the primary.
+
+    """
+    primary = 'default'
+
+    def get_replicas(self):
+        return getattr(settings, 'DATABASE_REPLICAS', [])
+
+    def db_for_read(self, model, **hints):
+        replicas = self.get_replicas()
+        state = _request_state.get()
+        if not replicas or (state is not None and state.pinned):
+            return self.primary
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {self.primary, *self.get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == self.primary
@@ -40,14 +40,18 @@ INSTALLED_APPS = [
 
     'tasks.apps.TasksConfig',
     'users.apps.UsersConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
+    'todo.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'todo.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.TokenAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -70,6 +74,10 @@ TEMPLATES = [
     },
 ]
 
+# Compile every template of DIRS when a WSGI or ASGI worker starts (see todo.templating),
+# so that the first requests do not pay for it.
+TEMPLATE_WARMUP = False
+
 WSGI_APPLICATION = 'todo.wsgi.application'
 
 
@@ -83,6 +91,51 @@ DATABASES = {
     }
 }
 
+# Reads may be spread over read-only copies of the primary database listed in
+# DATABASE_REPLICAS (see todo.routers.ReadReplicaRouter). A client that wrote reads from the
+# primary for DATABASE_REPLICA_PIN_SECONDS afterwards (see todo.middleware).
+DATABASE_ROUTERS = ['todo.routers.ReadReplicaRouter']
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'task_lists': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-lists',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            # Least recently used fragments are evicted, a tenth at a time, once the limit is reached.
+            'MAX_ENTRIES': 5000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# Rendered task list fragments. Point this at a shared backend (e.g. Redis or Memcached)
+# when running several worker processes, so that invalidations reach every worker.
+TASK_LIST_CACHE = 'task_lists'
+TASK_LIST_CACHE_TIMEOUT = 300
+
+
+# Sessions
+# https://docs.djangoproject.com/en/4.2/topics/http/sessions/
+
+# Sessions are read from the cache and written to the database as described in users.sessions.
+# SESSION_WRITE_MODE is 'through' (write every change immediately) or 'behind' (queue changes
+# and write them together SESSION_FLUSH_INTERVAL seconds later). With several worker processes
+# SESSION_CACHE_ALIAS must name a cache shared by all of them, not a LocMemCache.
+SESSION_ENGINE = 'users.sessions'
+SESSION_CACHE_ALIAS = 'default'
+SESSION_WRITE_MODE = 'through'
+SESSION_FLUSH_INTERVAL = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -106,6 +159,84 @@ AUTHENTICATION_BACKENDS = [
     'users.backends.CustomUserBackend',
 ]
 
+# Failed sign-ins are counted per email and per client IP in a sliding window of WINDOW
+# seconds; attempts beyond the limits are rejected before the password is hashed.
+# Use a shared cache backend when running several worker processes.
+LOGIN_THROTTLE = {
+    'CACHE': 'default',
+    'WINDOW': 300,
+    'EMAIL_LIMIT': 5,
+    'IP_LIMIT': 20,
+    'UNKNOWN_EMAIL_TIMEOUT': 60,
+}
+
+# Signed API tokens (see users.tokens), valid for MAX_AGE seconds unless the user is
+# deactivated or changes their password. Tokens are signed with the first of KEYS and accepted
+# with any of them; by default KEYS is SECRET_KEY followed by SECRET_KEY_FALLBACKS.
+TOKEN_AUTH = {
+    'MAX_AGE': 3600,
+    'SALT': 'users.tokens',
+    'KEYS': None,
+}
+
+# When ENABLED, a fraction SAMPLE_RATE of the requests is profiled (see
+# todo.middleware.RequestProfilingMiddleware): their query count and database, template and
+# view time are sent in a Server-Timing header and aggregated per URL name over the last
+# MAX_SAMPLES requests, readable by staff at /profiling/. Statements repeated
+# N_PLUS_ONE_THRESHOLD times in a request are logged. Profiling wraps every query, so it is
+# off by default and samples 1% of the requests once turned on; Server-Timing also exposes
+# timings to clients.
+REQUEST_PROFILING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.01,
+    'SERVER_TIMING': True,
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'MAX_SAMPLES': 1000,
+}
+
+# Live task list updates over Server-Sent Events (see tasks.events). Each stream buffers at
+# most QUEUE_SIZE events, sends a keep-alive comment every HEARTBEAT seconds and is closed
+# after MAX_AGE seconds, after which the browser reconnects in RETRY milliseconds. The
+# stream needs the ASGI application; BROKER must fan events out when running several workers.
+TASK_EVENTS = {
+    'BROKER': 'tasks.events.InProcessBroker',
+    'QUEUE_SIZE': 100,
+    'HEARTBEAT': 15,
+    'MAX_AGE': 300,
+    'RETRY': 3000,
+}
+
+# Deleted tasks (see tasks.models.Task) can be restored during UNDO_WINDOW seconds. The
+# purge_deleted_tasks command and the tasks.purge_deleted job then remove them PURGE_BATCH_SIZE
+# rows per transaction, pausing PURGE_PAUSE seconds between transactions.
+TASK_DELETION = {
+    'UNDO_WINDOW': 30,
+    'PURGE_BATCH_SIZE': 500,
+    'PURGE_PAUSE': 0.1,
+}
+
+# Completed tasks unchanged for AFTER_DAYS days are moved to the archive table by the
+# archive_tasks command and the tasks.archive job, BATCH_SIZE tasks per transaction with a
+# pause of PAUSE seconds between transactions.
+TASK_ARCHIVE = {
+    'AFTER_DAYS': 90,
+    'BATCH_SIZE': 500,
+    'PAUSE': 0.1,
+}
+
+# Background jobs (see jobs.registry), run by the run_jobs command. A failed job is retried
+# after BACKOFF_BASE seconds, doubling with every attempt up to BACKOFF_MAX seconds. Workers
+# renew the heartbeat of their running jobs every HEARTBEAT_INTERVAL seconds; jobs without a
+# heartbeat for STALE_TIMEOUT seconds are considered lost and queued again. Idle workers
+# poll the queue every POLL_INTERVAL seconds.
+JOBS = {
+    'BACKOFF_BASE': 5,
+    'BACKOFF_MAX': 3600,
+    'HEARTBEAT_INTERVAL': 10,
+    'STALE_TIMEOUT': 60,
+    'POLL_INTERVAL': 1,
+}
+
 AUTH_USER_MODEL = 'users.CustomUser'
 LOGIN_URL = 'login'
 # Internationalization
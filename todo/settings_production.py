@@ -0,0 +1,154 @@
+"""
+Production settings for todo project.
+
+Extends the development settings with a tuned SQLite profile. Use it with
+DJANGO_SETTINGS_MODULE=todo.settings_production and configure it with environment variables:
+
+    DJANGO_SECRET_KEY        The secret key (required).
+    DJANGO_ALLOWED_HOSTS     Comma-separated host names.
+    SQLITE_PATH              The database file, db.sqlite3 in the project directory by default.
+    SQLITE_REPLICA_PATHS     Comma-separated read-only copies of the database, e.g. kept up to
+                             date by Litestream or LiteFS. Reads are spread over them.
+    REDIS_URL                A Redis server for the shared caches (needs the redis package).
+    CACHE_DIR                The directory of the shared caches without REDIS_URL, cache in
+                             the project directory by default.
+"""
+import os
+from pathlib import Path
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+# Profile one request in twenty and keep the timings out of the responses.
+REQUEST_PROFILING = {
+    **REQUEST_PROFILING,  # noqa: F405
+    'ENABLED': True,
+    'SAMPLE_RATE': 0.05,
+    'SERVER_TIMING': False,
+}
+
+# Templates are located and parsed once per worker, explicitly rather than relying on the
+# default loaders, and compiled when the worker starts instead of on their first request.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],  # noqa: F405
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],  # noqa: F405
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+TEMPLATE_WARMUP = True
+
+
+# Database
+# https://docs.djangoproject.com/en/4.2/ref/databases/#sqlite-notes
+
+# Run on every new connection by todo.backends.sqlite3. WAL lets readers proceed while a write
+# is in progress; synchronous=NORMAL is durable across application crashes in WAL mode and
+# only syncs at checkpoints. busy_timeout makes a connection wait for a lock instead of
+# failing with "database is locked". cache_size is in KiB when negative.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'todo.backends.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        # Connections are kept open across requests and checked before reuse.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'PRAGMAS': SQLITE_PRAGMAS,
+        # Take the write lock when a transaction starts, so that concurrent writers wait for
+        # busy_timeout instead of failing when a read lock cannot be upgraded.
+        'TRANSACTION_MODE': 'IMMEDIATE',
+    },
+}
+
+DATABASE_REPLICAS = []
+for number, path in enumerate(filter(None, os.environ.get('SQLITE_REPLICA_PATHS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': path,
+        # The replication tool owns the journal mode; connections only read.
+        'PRAGMAS': {
+            **{name: value for name, value in SQLITE_PRAGMAS.items() if name != 'journal_mode'},
+            'query_only': 'ON',
+        },
+        'TRANSACTION_MODE': 'DEFERRED',
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Caches that hold state, such as the task list versions, must be shared by every worker
+# process: a LocMemCache is private to its process, so the other workers would miss its
+# changes. With REDIS_URL they live in Redis, which also serves several hosts; otherwise they
+# are files under CACHE_DIR, shared by the workers of this host (the SQLite database already
+# keeps writers on one host). A FileBasedCache lists its directory when it stores a value to
+# enforce MAX_ENTRIES, so prefer Redis under heavy write traffic.
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', BASE_DIR / 'cache'))
+
+
+def shared_cache(name, max_entries, **settings):
+    """Return the settings of a cache shared by the worker processes, stored under name."""
+    if REDIS_URL:
+        # Redis evicts according to its own maxmemory-policy; MAX_ENTRIES does not apply.
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': name,
+            **settings,
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / name,
+        'OPTIONS': {'MAX_ENTRIES': max_entries, 'CULL_FREQUENCY': 10},
+        **settings,
+    }
+
+
+CACHES = {
+    **CACHES,  # noqa: F405
+    'task_lists': shared_cache('task-lists', max_entries=5000, TIMEOUT=300),
+    # Failed sign-ins must be counted across workers, or every worker allows the full limit.
+    # A FileBasedCache increments by reading and rewriting a file, so concurrent failures may
+    # be undercounted slightly; Redis increments atomically.
+    'login_throttle': shared_cache('login-throttle', max_entries=20000),
+    # Sessions are read from the cache first (see users.sessions), so a per-process copy would
+    # keep serving a session another worker changed or deleted. Evicted sessions are reloaded
+    # from the database.
+    'sessions': shared_cache('sessions', max_entries=100000),
+}
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+LOGIN_THROTTLE = {
+    **LOGIN_THROTTLE,  # noqa: F405
+    'CACHE': 'login_throttle',
+}
@@ -0,0 +1,94 @@
+"""
+Template loading: warming the cached template loader and checking that it is used.
+
+With django.template.loaders.cached.Loader every template is located and parsed once per
+process and then served from memory. Compiled templates cannot be stored outside the
+process, so workers warm the cache when they start (see settings.TEMPLATE_WARMUP and the
+warm_templates command) instead of parsing every template on its first request.
+"""
+import os
+import time
+
+from django.core.checks import Error
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def get_django_engines():
+    return [engine for engine in engines.all() if isinstance(engine, DjangoTemplates)]
+
+
+def get_template_names(engine, app_dirs=False):
+    """
+    Return the names of the templates an engine can load.
+
+    Args:
+        engine (DjangoTemplates): The template engine.
+        app_dirs (bool): Include the templates directories of the installed apps, e.g. the
+                         admin templates, not only the DIRS of the engine.
+
+    Returns:
+        list: The template names, each once, in loader order.
+
+    """
+    directories = [str(directory) for directory in engine.engine.dirs]
+    if app_dirs:
+        for loader in engine.engine.template_loaders:
+            directories += [str(directory) for directory in loader.get_dirs()]
+    names = {}
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for file in sorted(files):
+                name = os.path.relpath(os.path.join(root, file), directory).replace(os.sep, '/')
+                names.setdefault(name, None)
+    return list(names)
+
+
+def warm_templates(app_dirs=False):
+    """
+    Load every template once, so that the cached loaders hold them compiled.
+
+    Args:
+        app_dirs (bool): Also load the templates of the installed apps.
+
+    Returns:
+        tuple: The number of templates loaded, the errors by template name and the duration
+               in seconds.
+
+    """
+    started = time.perf_counter()
+    loaded, errors = 0, {}
+    for engine in get_django_engines():
+        for name in get_template_names(engine, app_dirs=app_dirs):
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as error:
+                errors[name] = str(error)
+            else:
+                loaded += 1
+    return loaded, errors, time.perf_counter() - started
+
+
+def check_cached_template_loaders(app_configs, **kwargs):
+    """
+    Report the Django template engines that would parse templates on every render.
+
+    Registered by TasksConfig.ready().
+
+    Returns:
+        list: An error per loader not wrapped in the cached loader.
+
+    """
+    errors = []
+    for engine in get_django_engines():
+        for loader in engine.engine.template_loaders:
+            if not isinstance(loader, CachedLoader):
+                errors.append(Error(
+                    f'The {engine.name!r} template engine loads templates with '
+                    f'{type(loader).__module__}.{type(loader).__name__}, which parses them on every render.',
+                    hint="Wrap the loaders in 'django.template.loaders.cached.Loader' in OPTIONS['loaders'].",
+                    obj=engine.name,
+                    id='todo.E001',
+                ))
+    return errors
@@ -0,0 +1,264 @@
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.utils import load_backend
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+
+from .middleware import ReplicaPinningMiddleware, RequestProfilingMiddleware
+from .profiling import percentile, profile_stats
+from .routers import ReadReplicaRouter, begin_request, end_request
+from .templating import check_cached_template_loaders, warm_templates
+
+
+def create_connection(alias, **options):
+    """Register a connection to a database that is not in settings.DATABASES."""
+    settings_dict = connections.configure_settings({DEFAULT_DB_ALIAS: {}, alias: options})[alias]
+    connection = load_backend(settings_dict['ENGINE']).DatabaseWrapper(settings_dict, alias)
+    connections[alias] = connection
+    return connection
+
+
+def remove_connection(alias):
+    connections[alias].close()
+    del connections[alias]
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    """Tests of the PRAGMAs and the transaction mode of the tuned SQLite backend."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+
+    def connect(self, **options):
+        connection = create_connection('tuned', ENGINE='todo.backends.sqlite3', NAME=self.path, **options)
+        self.addCleanup(remove_connection, 'tuned')
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_run_on_every_connection(self):
+        connection = self.connect(PRAGMAS={'journal_mode': 'WAL', 'busy_timeout': 1234, 'foreign_keys': 'ON'})
+        self.assertEqual(self.pragma(connection, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 1234)
+        connection.close()
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 1234)
+
+    def test_immediate_transactions_take_the_write_lock(self):
+        connection = self.connect(PRAGMAS={'journal_mode': 'WAL'}, TRANSACTION_MODE='immediate')
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+        with transaction.atomic(using='tuned'):
+            # Only a read so far, but another writer already has to wait.
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM item')
+            with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                other.execute('BEGIN IMMEDIATE')
+        other.execute('BEGIN IMMEDIATE')
+        other.execute('ROLLBACK')
+
+    def test_deferred_transactions_by_default(self):
+        connection = self.connect(PRAGMAS={'journal_mode': 'WAL'})
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+        with transaction.atomic(using='tuned'):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM item')
+            other.execute('BEGIN IMMEDIATE')
+            other.execute('ROLLBACK')
+
+    def test_unknown_transaction_mode(self):
+        connection = self.connect(TRANSACTION_MODE='LAZY')
+        with self.assertRaises(ImproperlyConfigured):
+            connection.get_transaction_mode()
+
+
+class FileReplicaRouter(ReadReplicaRouter):
+    primary = 'primary'
+
+
+@override_settings(DATABASE_ROUTERS=['todo.tests.FileReplicaRouter'], DATABASE_REPLICAS=['replica'])
+class ReadReplicaRouterTests(SimpleTestCase):
+    """Tests of read routing and read-your-writes pinning over two SQLite files."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.paths = {}
+        for alias in ('primary', 'replica'):
+            self.paths[alias] = os.path.join(directory.name, f'{alias}.sqlite3')
+            connection = create_connection(alias, ENGINE='todo.backends.sqlite3', NAME=self.paths[alias])
+            self.addCleanup(remove_connection, alias)
+            with connection.schema_editor() as editor:
+                editor.create_model(Session)
+
+    def write(self, key):
+        Session.objects.create(session_key=key, session_data='', expire_date=timezone.now())
+
+    def read(self, key):
+        return Session.objects.filter(session_key=key).exists()
+
+    def replicate(self):
+        connections['replica'].close()
+        shutil.copyfile(self.paths['primary'], self.paths['replica'])
+
+    def test_reads_go_to_the_replica_and_writes_to_the_primary(self):
+        self.write('a')
+        self.assertFalse(self.read('a'))
+        self.replicate()
+        self.assertTrue(self.read('a'))
+
+    def test_request_reads_from_the_primary_after_writing(self):
+        state, token = begin_request()
+        try:
+            self.assertFalse(state.pinned)
+            self.write('a')
+            self.assertTrue(state.wrote)
+            self.assertTrue(self.read('a'))
+        finally:
+            end_request(token)
+        self.assertFalse(self.read('a'))
+
+    def test_writing_request_pins_the_client(self):
+        def view(request):
+            if request.method == 'POST':
+                self.write('a')
+            return HttpResponse(self.read('a'))
+
+        middleware = ReplicaPinningMiddleware(view)
+        factory = RequestFactory()
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.content, b'True')
+        cookie = response.cookies[ReplicaPinningMiddleware.cookie_name]
+        self.assertEqual(cookie['max-age'], settings.DATABASE_REPLICA_PIN_SECONDS)
+
+        # A reading request is only routed to the primary while the client sends the cookie.
+        self.assertEqual(middleware(factory.get('/')).content, b'False')
+        request = factory.get('/')
+        request.COOKIES[ReplicaPinningMiddleware.cookie_name] = cookie.value
+        response = middleware(request)
+        self.assertEqual(response.content, b'True')
+        self.assertNotIn(ReplicaPinningMiddleware.cookie_name, response.cookies)
+
+
+PROFILING = {**settings.REQUEST_PROFILING, 'ENABLED': True, 'SAMPLE_RATE': 1, 'SERVER_TIMING': True}
+
+
+class RequestProfilingTests(TestCase):
+    """Tests of the sampled request profiling and of its Server-Timing header."""
+
+    def setUp(self):
+        profile_stats.reset()
+        self.user = CustomUser(email='staff@example.com', is_staff=True)
+        self.user.set_password('Secret-pass-123')
+        self.user.save()
+        self.client.force_login(self.user)
+
+    @override_settings(REQUEST_PROFILING={**PROFILING, 'ENABLED': False})
+    def test_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('tasks')))
+        self.assertEqual(profile_stats.summary(), {})
+
+    @override_settings(REQUEST_PROFILING=PROFILING)
+    def test_sampled_request_is_profiled(self):
+        response = self.client.get(reverse('tasks'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, view;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        summary = self.client.get(reverse('profiling_stats')).json()
+        self.assertEqual(summary['tasks']['requests'], 1)
+        self.assertGreater(summary['tasks']['queries']['p50'], 0)
+
+    @override_settings(REQUEST_PROFILING={**PROFILING, 'SAMPLE_RATE': 0})
+    def test_request_outside_the_sample(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('tasks')))
+        self.assertEqual(profile_stats.summary(), {})
+
+    @override_settings(REQUEST_PROFILING={**PROFILING, 'SERVER_TIMING': False})
+    def test_timings_can_be_kept_out_of_the_response(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('tasks')))
+        self.assertEqual(profile_stats.summary()['tasks']['requests'], 1)
+
+    @override_settings(REQUEST_PROFILING={**PROFILING, 'N_PLUS_ONE_THRESHOLD': 3})
+    def test_repeated_statements_are_logged(self):
+        def view(request):
+            for pk in range(3):
+                CustomUser.objects.filter(pk=pk).exists()
+            return HttpResponse()
+
+        with self.assertLogs('todo.profiling', 'WARNING') as logs:
+            RequestProfilingMiddleware(view)(RequestFactory().get('/'))
+        self.assertIn('executed 3 times', logs.output[0])
+        self.assertEqual(profile_stats.summary()['<unresolved>']['n_plus_one'], 1)
+
+    @override_settings(REQUEST_PROFILING=PROFILING)
+    async def test_async_request_is_profiled(self):
+        self.async_client.cookies = self.client.cookies
+        response = await self.async_client.get(reverse('async_tasks'))
+        self.assertIn('queries', response['Server-Timing'])
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 0.5), 0)
+        self.assertEqual([percentile(list(range(1, 101)), p) for p in (0.5, 0.95, 0.99)], [50, 95, 99])
+
+
+class TemplateLoadingTests(SimpleTestCase):
+    """Tests of the cached template loader check and of warming the cache."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for name, source in (('good.html', '{{ value }}'), ('bad.html', '{% if %}')):
+            with open(os.path.join(self.directory, name), 'w') as file:
+                file.write(source)
+
+    def templates(self, **options):
+        return [{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'DIRS': [self.directory],
+            'OPTIONS': options,
+        }]
+
+    def test_cached_loaders_by_default(self):
+        self.assertEqual(check_cached_template_loaders(None), [])
+
+    def test_uncached_loaders_are_reported(self):
+        with override_settings(TEMPLATES=self.templates(loaders=['django.template.loaders.filesystem.Loader'])):
+            self.assertEqual([error.id for error in check_cached_template_loaders(None)], ['todo.E001'])
+
+    def test_warm_templates(self):
+        with override_settings(TEMPLATES=self.templates()):
+            loaded, errors, _ = warm_templates()
+            self.assertEqual((loaded, list(errors)), (1, ['bad.html']))
+            loader = engines['django'].engine.template_loaders[0]
+            self.assertIn('good.html', loader.get_template_cache)
+
+    def test_warm_templates_command_fails_on_errors(self):
+        with override_settings(TEMPLATES=self.templates()):
+            with self.assertRaisesMessage(CommandError, '1 templates could not be compiled.'):
+                call_command('warm_templates', stdout=io.StringIO(), stderr=io.StringIO())
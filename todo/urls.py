@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import ProfilingStatsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('tasks.urls')),
     path('users/', include('users.urls')),
+    path('profiling/', ProfilingStatsView.as_view(), name='profiling_stats'),
 ]
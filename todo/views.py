@@ -0,0 +1,44 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+
+from .profiling import profile_stats
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class ProfilingStatsView(View):
+    """View reporting the request profiling statistics to staff users.
+
+    Methods:
+        get(request, *args, **kwargs): Returns the statistics as JSON.
+        delete(request, *args, **kwargs): Drops the statistics.
+
+    """
+
+    def get(self, request, *args, **kwargs):
+        """Return the statistics as JSON.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: Per URL name, the number of profiled requests and the p50, p95 and p99
+                          of the query count and of the database, template, view and total time
+                          in milliseconds.
+
+        """
+        return JsonResponse(profile_stats.summary())
+
+    def delete(self, request, *args, **kwargs):
+        """Drop the statistics.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: An empty object.
+
+        """
+        profile_stats.reset()
+        return JsonResponse({})
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import receivers  # noqa: F401
+        from .sessions import check_session_cache
+        from .throttling import check_login_throttle_cache
+
+        checks.register(check_session_cache, checks.Tags.caches, deploy=True)
+        checks.register(check_login_throttle_cache, checks.Tags.caches, deploy=True)
@@ -1,5 +1,8 @@
 from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
 from .models import CustomUser
+from .throttling import get_client_ip, login_throttle
 
 
 class CustomUserBackend(ModelBackend):
@@ -9,6 +12,12 @@ class CustomUserBackend(ModelBackend):
     This backend allows authentication using the email field of the CustomUser model.
     It extends the ModelBackend provided by Django and overrides the authenticate method.
 
+    Failed attempts are counted per email and per client IP by the login throttle. Once a
+    limit is reached, further attempts are rejected before the user is looked up or the
+    password is hashed. Emails that do not belong to a user are remembered for a short time,
+    so repeated attempts with them skip the database; a dummy password hash is still computed
+    for them, so that their response time does not reveal whether an account exists.
+
     Methods:
         authenticate(request, username=None, password=None, **kwargs):
             Authenticate a user based on the provided username (email) and password.
@@ -32,12 +41,32 @@ class CustomUserBackend(ModelBackend):
                                 None if the authentication fails.
 
         Raises:
-            None.
+            PermissionDenied: If too many attempts failed for the email or the client IP.
+                              The request is marked with login_throttled = True.
 
         """
-        try:
-            user = CustomUser.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except CustomUser.DoesNotExist:
+        if username is None or password is None:
             return None
+
+        ip = get_client_ip(request)
+        if login_throttle.is_blocked(username, ip):
+            if request is not None:
+                request.login_throttled = True
+            raise PermissionDenied('Too many failed sign-in attempts.')
+
+        user = None
+        if not login_throttle.is_unknown_email(username):
+            try:
+                user = CustomUser.objects.get(email=username)
+            except CustomUser.DoesNotExist:
+                login_throttle.remember_unknown_email(username)
+
+        if user is None:
+            # Hash the password anyway to keep the response time of unknown emails the same.
+            CustomUser().set_password(password)
+        elif user.check_password(password) and self.user_can_authenticate(user):
+            login_throttle.reset(username)
+            return user
+
+        login_throttle.record_failure(username, ip)
+        return None
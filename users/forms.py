@@ -2,6 +2,7 @@ from django.contrib.auth import authenticate
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.models import User
 from django import forms
+from django.core.exceptions import ValidationError
 
 from .models import CustomUser
 
@@ -26,8 +27,14 @@ class UserLoginForm(AuthenticationForm):
     Methods:
         __init__(*args, **kwargs): Initializes the form and sets the 'auth__input' CSS class
             for all visible fields.
+        clean(): Authenticates the user and reports throttled attempts.
 
     """
+    error_messages = {
+        **AuthenticationForm.error_messages,
+        'throttled': 'Too many failed sign-in attempts. Please try again later.',
+    }
+
     email = forms.EmailField(
         widget=forms.EmailInput(
             attrs={
@@ -62,6 +69,28 @@ class UserLoginForm(AuthenticationForm):
         for visible in self.visible_fields():
             visible.field.widget.attrs['class'] = 'auth__input'
 
+    def clean(self):
+        """
+        Authenticates the user and reports throttled attempts.
+
+        This method overrides the clean() method of the parent class to replace the generic
+        invalid login error with a specific one when the authentication backend rejected the
+        attempt because too many attempts failed.
+
+        Returns:
+            dict: The cleaned form data.
+
+        Raises:
+            ValidationError: If the credentials are invalid or the attempt was throttled.
+
+        """
+        try:
+            return super().clean()
+        except ValidationError:
+            if getattr(self.request, 'login_throttled', False):
+                raise ValidationError(self.error_messages['throttled'], code='throttled')
+            raise
+
 
 class UserCreateForm(UserCreationForm):
     """
@@ -0,0 +1,39 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """
+    Management command that deletes expired sessions in small batches.
+
+    Unlike clearsessions, which deletes every expired session in one statement, this command
+    deletes at most --batch-size sessions per transaction and pauses between batches, so it
+    never holds the database write lock for long.
+
+    Example Usage:
+        python manage.py purge_sessions --batch-size 500 --pause 0.1
+
+    """
+    help = 'Delete expired sessions in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sessions deleted per batch.')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            count, _ = Session.objects.filter(session_key__in=keys).delete()
+            deleted += count
+            time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions.'))
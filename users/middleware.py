@@ -0,0 +1,65 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import JsonResponse
+
+from .tokens import token_signer
+
+
+class TokenAuthenticationMiddleware:
+    """
+    Middleware authenticating requests that carry a signed API token.
+
+    Requests with an 'Authorization: Bearer <token>' header are authenticated from the token:
+    request.user is set to the token's user, so the session is not read. Such requests are
+    exempt from CSRF checks, since the token is not sent by the browser automatically.
+    Requests with an invalid or expired token, or a token of a user who was deactivated or
+    changed their password, are rejected with 401; requests without the header are left to
+    the session authentication.
+
+    The middleware works in both sync and async mode, so it does not force async requests
+    through a thread. It must come after django.contrib.auth.middleware.AuthenticationMiddleware.
+
+    Methods:
+        __call__(request): Authenticates the request and calls the next middleware.
+
+    """
+    sync_capable = True
+    async_capable = True
+    keyword = 'Bearer'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def get_token(self, request):
+        keyword, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        return token.strip() if keyword == self.keyword else None
+
+    def authenticate(self, request, user):
+        if user is None:
+            response = JsonResponse({'error': 'Invalid or expired token.'}, status=401)
+            response['WWW-Authenticate'] = self.keyword
+            return response
+        request.user = user
+        request.token_authenticated = True
+        request._dont_enforce_csrf_checks = True
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self.get_token(request)
+        if token is not None:
+            response = self.authenticate(request, token_signer.get_user(token))
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        token = self.get_token(request)
+        if token is not None:
+            response = self.authenticate(request, await token_signer.aget_user(token))
+            if response is not None:
+                return response
+        return await self.get_response(request)
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import CustomUser
+from .throttling import login_throttle
+
+
+@receiver(post_save, sender=CustomUser)
+def forget_unknown_email(sender, instance, created, **kwargs):
+    """
+    Let a newly registered email sign in right away.
+
+    The login throttle remembers emails without a user for a short time. This receiver
+    forgets the email of a new user, so a failed attempt just before signing up does not
+    keep them from signing in.
+
+    Args:
+        sender (class): The CustomUser model.
+        instance (CustomUser): The saved user.
+        created (bool): Whether the user was just created.
+
+    """
+    if created:
+        login_throttle.forget_unknown_email(instance.email)
@@ -0,0 +1,190 @@
+"""
+Cached, database-backed sessions with coalesced database writes.
+
+Set SESSION_ENGINE = 'users.sessions' to use it. Sessions are read from the cache configured
+by SESSION_CACHE_ALIAS and fall back to the django_session table. How writes reach the
+database is controlled by settings.SESSION_WRITE_MODE:
+
+    'through' (default): every save is written to the database immediately, unless the
+        session data did not change and the stored expiry date is still recent enough.
+    'behind': saves only update the cache and are queued; a timer writes the queue to the
+        database with a single upsert SESSION_FLUSH_INTERVAL seconds after the first queued
+        save, and the queue is written when the process exits. Sessions saved since the last
+        flush are lost if the process crashes.
+
+New sessions are always written to the database immediately, so that session keys stay unique.
+
+The cache is the source of truth for reads, so with several worker processes it must be
+shared by all of them (e.g. Redis or Memcached): with a per-process cache such as
+LocMemCache a worker would keep serving its own copy of a session changed or deleted by
+another worker. check_session_cache() reports this in 'manage.py check --deploy'.
+"""
+import atexit
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning
+from django.db import connections
+from django.utils import timezone
+
+KEY_PREFIX = 'users.sessions'
+
+
+class SessionStore(cached_db.SessionStore):
+    """
+    Session store keeping sessions in the cache and coalescing their database writes.
+
+    Attributes:
+        cache_key_prefix (str): The prefix of the cache keys of the sessions.
+
+    Methods:
+        load(): Returns the session data from the cache, the write queue or the database.
+        save(must_create=False): Saves the session to the cache and, depending on the write mode,
+            to the database or the write queue.
+        delete(session_key=None): Deletes the session everywhere.
+        flush_pending(): Writes the queued sessions to the database.
+
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    _pending = {}
+    _pending_lock = threading.Lock()
+    _flush_timer = None
+
+    @property
+    def write_mode(self):
+        return getattr(settings, 'SESSION_WRITE_MODE', 'through')
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'SESSION_FLUSH_INTERVAL', 5)
+
+    @property
+    def persisted_key(self):
+        return f'{self.cache_key}:persisted'
+
+    def load(self):
+        if self.session_key is not None:
+            with self._pending_lock:
+                pending = self._pending.get(self.session_key)
+            if pending is not None and pending.expire_date > timezone.now():
+                return self.decode(pending.session_data)
+        return super().load()
+
+    def _is_persisted(self, instance):
+        """
+        Return whether the database already holds the session data with a recent expiry date.
+
+        The expiry date is considered recent if less than half of the session lifetime passed
+        since it was written, so skipping the write cannot make the stored session expire early
+        by more than that.
+
+        Args:
+            instance (Session): The session as it would be written.
+
+        Returns:
+            bool: True if the write can be skipped.
+        """
+        persisted = self._cache.get(self.persisted_key)
+        if persisted is None:
+            return False
+        digest, expire_date = persisted
+        if digest != hashlib.sha1(instance.session_data.encode()).hexdigest():
+            return False
+        return expire_date - instance.expire_date > -timedelta(seconds=self.get_expiry_age() / 2)
+
+    def _remember_persisted(self, instance):
+        digest = hashlib.sha1(instance.session_data.encode()).hexdigest()
+        self._cache.set(self.persisted_key, (digest, instance.expire_date), self.get_expiry_age())
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        instance = self.create_model_instance(data)
+
+        if must_create or self.write_mode != 'behind':
+            if must_create or not self._is_persisted(instance):
+                DBStore.save(self, must_create=must_create)
+                self._remember_persisted(instance)
+        else:
+            with self._pending_lock:
+                self._pending[self.session_key] = instance
+                if SessionStore._flush_timer is None:
+                    timer = SessionStore._flush_timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                    timer.daemon = True
+                    timer.start()
+
+        self._cache.set(self.cache_key, data, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        key = session_key or self.session_key
+        if key is not None:
+            with self._pending_lock:
+                self._pending.pop(key, None)
+            self._cache.delete(f'{self.cache_key_prefix}{key}:persisted')
+        super().delete(session_key)
+
+    @classmethod
+    def flush_pending(cls):
+        """
+        Write the queued sessions to the database with a single upsert.
+
+        Returns:
+            int: The number of sessions written.
+        """
+        with cls._pending_lock:
+            pending, SessionStore._pending = cls._pending, {}
+            timer, SessionStore._flush_timer = cls._flush_timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if pending:
+            Session.objects.bulk_create(
+                pending.values(),
+                update_conflicts=True,
+                unique_fields=['session_key'],
+                update_fields=['session_data', 'expire_date'],
+            )
+        return len(pending)
+
+    @classmethod
+    def _flush_on_timer(cls):
+        try:
+            cls.flush_pending()
+        finally:
+            connections.close_all()
+
+
+def check_session_cache(app_configs, **kwargs):
+    """
+    Report a session cache that is not shared between worker processes.
+
+    Registered by UsersConfig.ready() as a deployment check.
+
+    Returns:
+        list: A warning if the sessions are cached in a per-process LocMemCache.
+
+    """
+    if settings.SESSION_ENGINE != __name__:
+        return []
+    if not isinstance(caches[settings.SESSION_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        Warning(
+            f'The session cache {settings.SESSION_CACHE_ALIAS!r} is a LocMemCache, which is not shared '
+            'between processes.',
+            hint='Use a shared cache such as Redis or Memcached for SESSION_CACHE_ALIAS when running '
+                 'several worker processes.',
+            id='users.W001',
+        )
+    ]
+
+
+atexit.register(SessionStore.flush_pending)
@@ -1,3 +1,231 @@
-from django.test import TestCase
+import json
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from .backends import CustomUserBackend
+from .models import CustomUser
+from .sessions import SessionStore, check_session_cache
+from .throttling import LoginThrottle, check_login_throttle_cache, login_throttle
+from .tokens import TokenSigner, token_signer
+
+PASSWORD = 'Secret-pass-123'
+
+
+def create_user(email, password=PASSWORD, **fields):
+    user = CustomUser(email=email, **fields)
+    user.set_password(password)
+    user.save()
+    return user
+
+
+class LoginThrottleTests(TestCase):
+    """Tests of the sliding window counters of failed sign-ins."""
+
+    def setUp(self):
+        caches[login_throttle.cache_alias].clear()
+        self.throttle = LoginThrottle(EMAIL_LIMIT=3, IP_LIMIT=5)
+
+    def test_email_is_blocked_after_the_limit(self):
+        for _ in range(3):
+            self.assertFalse(self.throttle.is_blocked('user@example.com', '10.0.0.1'))
+            self.throttle.record_failure('user@example.com', '10.0.0.1')
+        self.assertTrue(self.throttle.is_blocked('User@Example.com ', '10.0.0.2'))
+        self.assertFalse(self.throttle.is_blocked('other@example.com', '10.0.0.2'))
+
+    def test_ip_is_blocked_after_the_limit(self):
+        for index in range(5):
+            self.throttle.record_failure(f'user{index}@example.com', '10.0.0.1')
+        self.assertTrue(self.throttle.is_blocked('new@example.com', '10.0.0.1'))
+
+    def test_reset(self):
+        for _ in range(3):
+            self.throttle.record_failure('user@example.com', None)
+        self.throttle.reset('user@example.com')
+        self.assertFalse(self.throttle.is_blocked('user@example.com', None))
+
+    def test_previous_window_is_weighted(self):
+        for _ in range(4):
+            self.throttle.record_failure('user@example.com', None)
+        now = time.time()
+        start = now - now % self.throttle.window
+        with mock.patch('users.throttling.time.time', return_value=start + self.throttle.window * 1.5):
+            self.assertFalse(self.throttle.is_blocked('user@example.com', None))
+        with mock.patch('users.throttling.time.time', return_value=start + self.throttle.window * 1.01):
+            self.assertTrue(self.throttle.is_blocked('user@example.com', None))
+
+    def test_values_that_are_not_strings(self):
+        self.throttle.record_failure(['user@example.com'], None)
+        self.assertFalse(self.throttle.is_blocked({'email': 1}, None))
+
+    def test_unshared_cache_is_reported(self):
+        backend = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(CACHES={**settings.CACHES, login_throttle.cache_alias: backend}):
+            self.assertEqual([error.id for error in check_login_throttle_cache(None)], ['users.W002'])
+        with tempfile.TemporaryDirectory() as directory:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+            with override_settings(CACHES={**settings.CACHES, login_throttle.cache_alias: backend}):
+                self.assertEqual(check_login_throttle_cache(None), [])
+
+
+class CustomUserBackendTests(TestCase):
+    """Tests of email authentication and its throttling."""
+
+    def setUp(self):
+        caches[login_throttle.cache_alias].clear()
+        self.user = create_user('user@example.com')
+        self.request = RequestFactory().post('/signin/', REMOTE_ADDR='10.0.0.1')
+
+    def test_authenticate(self):
+        self.assertEqual(authenticate(self.request, username='user@example.com', password=PASSWORD), self.user)
+        self.assertIsNone(authenticate(self.request, username='user@example.com', password='wrong'))
+
+    def test_throttled_after_too_many_failures(self):
+        for _ in range(settings.LOGIN_THROTTLE['EMAIL_LIMIT']):
+            authenticate(self.request, username='user@example.com', password='wrong')
+        # Rejected even with the right password, before the password is checked.
+        with self.assertRaises(PermissionDenied):
+            CustomUserBackend().authenticate(self.request, username='user@example.com', password=PASSWORD)
+        self.assertTrue(self.request.login_throttled)
+
+    def test_unknown_email_is_remembered_until_registered(self):
+        self.assertIsNone(authenticate(self.request, username='new@example.com', password=PASSWORD))
+        self.assertTrue(login_throttle.is_unknown_email('new@example.com'))
+        create_user('new@example.com')
+        self.assertFalse(login_throttle.is_unknown_email('new@example.com'))
+        self.assertIsNotNone(authenticate(self.request, username='new@example.com', password=PASSWORD))
+
+    def test_login_view_reports_throttling(self):
+        for _ in range(settings.LOGIN_THROTTLE['EMAIL_LIMIT']):
+            self.client.post(reverse('login'), {'username': 'user@example.com', 'password': 'wrong'})
+        response = self.client.post(reverse('login'), {'username': 'user@example.com', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['form'].errors.as_data()['__all__'][0].code, 'throttled')
+
+
+class TokenSignerTests(TestCase):
+    """Tests of issuing, verifying and revoking API tokens."""
+
+    def setUp(self):
+        self.user = create_user('user@example.com')
+
+    def test_valid_token(self):
+        self.assertEqual(token_signer.get_user(token_signer.issue(self.user)), self.user)
+
+    def test_tampered_and_malformed_tokens(self):
+        token = token_signer.issue(self.user)
+        for value in (token[:-1] + ('A' if token[-1] != 'A' else 'B'), '', 'garbage', token + ':x'):
+            self.assertIsNone(token_signer.get_user(value), value)
+
+    def test_token_signed_with_another_key(self):
+        token = TokenSigner(KEYS=['another key']).issue(self.user)
+        self.assertIsNone(token_signer.get_user(token))
+        self.assertEqual(TokenSigner(KEYS=['new key', 'another key']).get_user(token), self.user)
+
+    def test_expired_token(self):
+        self.assertIsNone(TokenSigner(MAX_AGE=-1).get_user(token_signer.issue(self.user)))
+
+    def test_password_change_revokes_tokens(self):
+        token = token_signer.issue(self.user)
+        self.user.set_password('Another-pass-456')
+        self.user.save()
+        self.assertIsNone(token_signer.get_user(token))
+
+    def test_deactivation_revokes_tokens(self):
+        token = token_signer.issue(self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(token_signer.get_user(token))
+
+
+class TokenAuthenticationTests(TestCase):
+    """Tests of the token endpoint and of the token authentication middleware."""
+
+    def setUp(self):
+        caches[login_throttle.cache_alias].clear()
+        self.user = create_user('user@example.com')
+
+    def obtain(self, data):
+        return self.client.post(reverse('token'), json.dumps(data), content_type='application/json')
+
+    def test_obtain_token(self):
+        response = self.obtain({'email': 'user@example.com', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(token_signer.get_user(response.json()['token']), self.user)
+        self.assertEqual(self.obtain({'email': 'user@example.com', 'password': 'wrong'}).status_code, 401)
+
+    def test_obtain_token_with_malformed_credentials(self):
+        for data in ({'email': ['user@example.com'], 'password': PASSWORD}, {'email': 'user@example.com'}, []):
+            self.assertEqual(self.obtain(data).status_code, 400, data)
+
+    def test_request_with_token(self):
+        headers = {'authorization': f'Bearer {token_signer.issue(self.user)}'}
+        response = self.client.get(reverse('tasks'), headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_request_with_invalid_token(self):
+        response = self.client.get(reverse('tasks'), headers={'authorization': 'Bearer garbage'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+
+    async def test_async_request_with_token(self):
+        token = token_signer.issue(self.user)
+        client = AsyncClient()
+        response = await client.get(reverse('async_tasks'), headers={'authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        response = await client.get(reverse('async_tasks'), headers={'authorization': 'Bearer garbage'})
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(SESSION_WRITE_MODE='behind', SESSION_FLUSH_INTERVAL=60)
+class SessionStoreTests(TestCase):
+    """Tests of the write-behind mode of the cached session store."""
+
+    def tearDown(self):
+        SessionStore.flush_pending()
+
+    def get_stored(self, session):
+        return Session.objects.get(pk=session.session_key).get_decoded()
+
+    def test_changes_are_queued_and_flushed(self):
+        session = SessionStore()
+        session['value'] = 1
+        session.save()
+        session['value'] = 2
+        session.save()
+        self.assertEqual(self.get_stored(session), {'value': 1})
+        self.assertEqual(SessionStore(session.session_key).load(), {'value': 2})
+        self.assertIsNotNone(SessionStore._flush_timer)
+
+        self.assertEqual(SessionStore.flush_pending(), 1)
+        self.assertEqual(self.get_stored(session), {'value': 2})
+        self.assertIsNone(SessionStore._flush_timer)
+
+    def test_deleted_session_is_not_flushed(self):
+        session = SessionStore()
+        session['value'] = 1
+        session.save()
+        session['value'] = 2
+        session.save()
+        session.delete()
+        self.assertEqual(SessionStore.flush_pending(), 0)
+        self.assertFalse(Session.objects.filter(pk=session.session_key).exists())
+
+    def test_unshared_cache_is_reported(self):
+        backend = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(CACHES={**settings.CACHES, settings.SESSION_CACHE_ALIAS: backend}):
+            self.assertEqual([error.id for error in check_session_cache(None)], ['users.W001'])
+        with tempfile.TemporaryDirectory() as directory:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}
+            with override_settings(CACHES={**settings.CACHES, settings.SESSION_CACHE_ALIAS: backend}):
+                self.assertEqual(check_session_cache(None), [])
 
-# Create your tests here.
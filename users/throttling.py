@@ -0,0 +1,208 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning
+
+DEFAULTS = {
+    'CACHE': 'default',
+    'WINDOW': 300,
+    'EMAIL_LIMIT': 5,
+    'IP_LIMIT': 20,
+    'UNKNOWN_EMAIL_TIMEOUT': 60,
+}
+
+
+class LoginThrottle:
+    """
+    Sliding window counters of failed sign-in attempts per email and per client IP.
+
+    Each counter is stored in two fixed windows of settings.LOGIN_THROTTLE['WINDOW'] seconds.
+    The number of failures in the sliding window is estimated as the failures of the current
+    window plus the failures of the previous window weighted by how much of it still overlaps
+    the sliding window. The counters live in a configurable cache, so they are shared between
+    workers when a shared backend is used; check_login_throttle_cache() reports a per-process
+    cache in 'manage.py check --deploy'.
+
+    The throttle also remembers emails that do not belong to any user for a short time, so
+    repeated attempts with unknown emails do not reach the database.
+
+    Attributes:
+        cache_alias (str): The alias of the cache in settings.CACHES.
+        window (int): The length of the sliding window in seconds.
+        email_limit (int): The number of failures per email allowed in the window.
+        ip_limit (int): The number of failures per client IP allowed in the window.
+        unknown_email_timeout (int): The number of seconds an unknown email is remembered.
+
+    Methods:
+        is_blocked(email, ip): Returns whether attempts for the email or from the IP are throttled.
+        record_failure(email, ip): Counts a failed attempt.
+        reset(email): Forgets the failures of an email after a successful sign-in.
+        is_unknown_email(email): Returns whether the email is known not to belong to a user.
+        remember_unknown_email(email): Remembers that the email does not belong to a user.
+        forget_unknown_email(email): Forgets that the email did not belong to a user.
+
+    """
+
+    def __init__(self, **options):
+        config = {**DEFAULTS, **getattr(settings, 'LOGIN_THROTTLE', {}), **options}
+        self.cache_alias = config['CACHE']
+        self.window = config['WINDOW']
+        self.email_limit = config['EMAIL_LIMIT']
+        self.ip_limit = config['IP_LIMIT']
+        self.unknown_email_timeout = config['UNKNOWN_EMAIL_TIMEOUT']
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.sha256(str(value).strip().lower().encode()).hexdigest()[:32]
+
+    def _keys(self, kind, value, window_index):
+        prefix = f'login:{kind}:{self._digest(value)}'
+        return f'{prefix}:{window_index}', f'{prefix}:{window_index - 1}'
+
+    def _subjects(self, email, ip):
+        subjects = []
+        if email:
+            subjects.append(('email', email, self.email_limit))
+        if ip:
+            subjects.append(('ip', ip, self.ip_limit))
+        return subjects
+
+    def is_blocked(self, email, ip):
+        """
+        Return whether attempts for the email or from the IP are throttled.
+
+        Args:
+            email (str): The email the attempt is made for.
+            ip (str): The IP address of the client.
+
+        Returns:
+            bool: True if either counter reached its limit in the sliding window.
+        """
+        now = time.time()
+        window_index, elapsed = divmod(now, self.window)
+        previous_weight = 1 - elapsed / self.window
+        # A list rather than a dict keyed by subject, since the values need not be hashable.
+        keys = [
+            (limit, self._keys(kind, value, int(window_index)))
+            for kind, value, limit in self._subjects(email, ip)
+        ]
+        values = self.cache.get_many([key for _, pair in keys for key in pair])
+        for limit, (current_key, previous_key) in keys:
+            failures = values.get(current_key, 0) + values.get(previous_key, 0) * previous_weight
+            if failures >= limit:
+                return True
+        return False
+
+    def record_failure(self, email, ip):
+        """
+        Count a failed attempt for the email and the IP.
+
+        Args:
+            email (str): The email the attempt was made for.
+            ip (str): The IP address of the client.
+
+        """
+        window_index = int(time.time() // self.window)
+        for kind, value, _ in self._subjects(email, ip):
+            key, _ = self._keys(kind, value, window_index)
+            if not self.cache.add(key, 1, self.window * 2):
+                try:
+                    self.cache.incr(key)
+                except ValueError:
+                    self.cache.set(key, 1, self.window * 2)
+
+    def reset(self, email):
+        """
+        Forget the failures of an email after a successful sign-in.
+
+        Args:
+            email (str): The email that signed in.
+
+        """
+        window_index = int(time.time() // self.window)
+        self.cache.delete_many(self._keys('email', email, window_index))
+
+    def is_unknown_email(self, email):
+        """
+        Return whether the email is known not to belong to a user.
+
+        Args:
+            email (str): The email to check.
+
+        Returns:
+            bool: True if a recent lookup found no user with this email.
+        """
+        return self.cache.get(f'login:unknown:{self._digest(email)}') is not None
+
+    def remember_unknown_email(self, email):
+        """
+        Remember that the email does not belong to a user.
+
+        Args:
+            email (str): The email that was not found.
+
+        """
+        self.cache.set(f'login:unknown:{self._digest(email)}', True, self.unknown_email_timeout)
+
+    def forget_unknown_email(self, email):
+        """
+        Forget that the email did not belong to a user, e.g. because it was just registered.
+
+        Args:
+            email (str): The email of the new user.
+
+        """
+        self.cache.delete(f'login:unknown:{self._digest(email)}')
+
+
+def get_client_ip(request):
+    """
+    Return the IP address of the client that sent the request.
+
+    Only REMOTE_ADDR is used, since forwarding headers can be set by the client. Deployments
+    behind a proxy should have the proxy or a middleware set REMOTE_ADDR.
+
+    Args:
+        request (HttpRequest): The current HTTP request object, may be None.
+
+    Returns:
+        str or None: The IP address, None without a request.
+    """
+    if request is None:
+        return None
+    return request.META.get('REMOTE_ADDR')
+
+
+login_throttle = LoginThrottle()
+
+
+def check_login_throttle_cache(app_configs, **kwargs):
+    """
+    Report a login throttle cache that is not shared between worker processes.
+
+    Registered by UsersConfig.ready() as a deployment check. With a per-process LocMemCache
+    every worker counts failures on its own, so a client spreading attempts over the workers
+    gets the limits multiplied by their number.
+
+    Returns:
+        list: A warning if the failures are counted in a per-process LocMemCache.
+
+    """
+    if not isinstance(login_throttle.cache, LocMemCache):
+        return []
+    return [
+        Warning(
+            f'The login throttle cache {login_throttle.cache_alias!r} is a LocMemCache, which is not '
+            'shared between processes.',
+            hint="Use a shared cache such as Redis or a FileBasedCache for LOGIN_THROTTLE['CACHE'] "
+                 'when running several worker processes.',
+            id='users.W002',
+        )
+    ]
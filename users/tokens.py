@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import CustomUser
+
+DEFAULTS = {
+    'MAX_AGE': 3600,
+    'SALT': 'users.tokens',
+    'KEYS': None,
+}
+
+
+class TokenSigner:
+    """
+    Issues and verifies signed API tokens.
+
+    A token carries the user's id, a digest of the user's password hash and the time it was
+    issued, signed with HMAC. Verifying it costs one primary key lookup of the user, the same
+    as session authentication: the token is rejected once the user is deactivated or deleted
+    or changes their password, which also revokes every token of the user.
+
+    Tokens are signed with the first key of settings.TOKEN_AUTH['KEYS'] (SECRET_KEY by default)
+    and accepted if signed with any of the keys (SECRET_KEY_FALLBACKS by default), so keys can
+    be rotated without invalidating every token at once.
+
+    Attributes:
+        max_age (int): The number of seconds a token is valid.
+        signer (TimestampSigner): The signer used for the tokens.
+
+    Methods:
+        get_user_hash(user): Returns the digest tying a token to the user's current password.
+        issue(user): Returns a new token for a user.
+        get_user(token): Returns the user a valid token was issued for.
+        aget_user(token): Asynchronous version of get_user().
+
+    """
+
+    def __init__(self, **options):
+        config = {**DEFAULTS, **getattr(settings, 'TOKEN_AUTH', {}), **options}
+        keys = config['KEYS'] or [settings.SECRET_KEY, *settings.SECRET_KEY_FALLBACKS]
+        self.max_age = config['MAX_AGE']
+        self.salt = config['SALT']
+        self.signer = signing.TimestampSigner(key=keys[0], fallback_keys=keys[1:], salt=self.salt)
+
+    def get_user_hash(self, user):
+        """
+        Return the digest tying a token to the user's current password.
+
+        Args:
+            user (CustomUser): The user.
+
+        Returns:
+            str: A digest of the user's password hash, which changes with the password.
+        """
+        return salted_hmac(f'{self.salt}.user', user.password, algorithm='sha256').hexdigest()[:32]
+
+    def issue(self, user):
+        """
+        Return a new token for a user.
+
+        Args:
+            user (CustomUser): The authenticated user.
+
+        Returns:
+            str: The signed token.
+        """
+        return self.signer.sign_object({'id': user.pk, 'hash': self.get_user_hash(user)}, compress=True)
+
+    def _unsign(self, token):
+        try:
+            payload = self.signer.unsign_object(token, max_age=self.max_age)
+        except (signing.BadSignature, ValueError):
+            return None
+        if not isinstance(payload, dict) or not isinstance(payload.get('id'), int):
+            return None
+        return payload
+
+    def _verify(self, user, payload):
+        if user is None or not constant_time_compare(payload.get('hash', ''), self.get_user_hash(user)):
+            return None
+        return user
+
+    def get_user(self, token):
+        """
+        Return the user a valid token was issued for.
+
+        Args:
+            token (str): The token sent by the client.
+
+        Returns:
+            CustomUser or None: The user, None if the token is invalid or expired, or if the
+                                user is inactive, deleted or changed their password since.
+        """
+        payload = self._unsign(token)
+        if payload is None:
+            return None
+        return self._verify(CustomUser.objects.filter(pk=payload['id'], is_active=True).first(), payload)
+
+    async def aget_user(self, token):
+        """
+        Asynchronous version of get_user().
+
+        Args:
+            token (str): The token sent by the client.
+
+        Returns:
+            CustomUser or None: The user, None if the token is not valid for an active user.
+        """
+        payload = self._unsign(token)
+        if payload is None:
+            return None
+        return self._verify(await CustomUser.objects.filter(pk=payload['id'], is_active=True).afirst(), payload)
+
+
+token_signer = TokenSigner()
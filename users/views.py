@@ -1,11 +1,17 @@
-from django.contrib.auth import login, logout
+import json
+
+from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.views import LoginView
+from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView, CreateView
 
 from .forms import UserLoginForm, UserCreateForm
+from .tokens import token_signer
 
 
 class UserLoginView(LoginView):
@@ -34,7 +40,7 @@ class UserLoginView(LoginView):
         Returns:
             dict: The context dictionary with 'title' set to 'Sign In'.
         """
-        context = super().get_context_data()
+        context = super().get_context_data(**kwargs)
         context.update({
             'title': 'Sign In'
         })
@@ -78,7 +84,7 @@ class UserCreateView(CreateView):
         Returns:
             dict: The context dictionary with 'title' set to 'Sign Up'.
         """
-        context = super().get_context_data()
+        context = super().get_context_data(**kwargs)
         context.update({
             'title': 'Sign Up'
         })
@@ -121,3 +127,50 @@ class UserLogout(View):
         """
         logout(request)
         return redirect('index_page')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class TokenObtainView(View):
+    """
+    View issuing signed API tokens for API clients.
+
+    API clients exchange an email and password for a token, then send it in an
+    'Authorization: Bearer <token>' header instead of using a session cookie. The credentials
+    are checked by the authentication backend, so sign-in throttling applies here too.
+
+    Methods:
+        post(request, *args, **kwargs): Authenticates the credentials and returns a token.
+
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        """
+        Authenticates the credentials and returns a token.
+
+        The credentials are read from a JSON body ({"email": ..., "password": ...}) or from
+        form data.
+
+        Args:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            JsonResponse: The token and its lifetime in seconds, or an error with status 400/401.
+        """
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body)
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                return JsonResponse({'error': 'Expected a JSON object.'}, status=400)
+        else:
+            data = request.POST
+
+        email, password = data.get('email'), data.get('password')
+        if not isinstance(email, str) or not isinstance(password, str):
+            return JsonResponse({'error': 'Expected an email and a password.'}, status=400)
+        user = authenticate(request, username=email, password=password)
+        if user is None:
+            return JsonResponse({'error': 'Invalid email or password.'}, status=401)
+        return JsonResponse({'token': token_signer.issue(user), 'expires_in': token_signer.max_age})